@@ -0,0 +1,59 @@
+"""Per-host fleet agent exposing local GPU telemetry and claim state."""
+import argparse
+import logging
+from flask import Flask, jsonify
+from config import AGENT_PORT, NODE_NAME
+from utils.gpu_sampler import get_sampler
+from utils.status_manager import get_status
+from utils.telemetry import snapshot_to_dict
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+app = Flask(__name__)
+app.config['NODE_NAME'] = NODE_NAME
+
+
+@app.route('/node', methods=['GET'])
+def node_state():
+    """
+    Return this node's latest telemetry snapshot and local claim state.
+    
+    Telemetry comes from the background sampler, so the response never
+    waits on nvidia-smi once the sampler is warm. Claim state is this
+    host's own status store, if it has one.
+    """
+    try:
+        claims = get_status()
+    except Exception as e:
+        logger.warning(f"Local claim state unavailable: {e}")
+        claims = {}
+    return jsonify({
+        "node": app.config['NODE_NAME'],
+        "telemetry": snapshot_to_dict(get_sampler().latest()),
+        "claims": claims
+    })
+
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint for monitoring."""
+    return jsonify({"status": "healthy", "node": app.config['NODE_NAME']}), 200
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="GPU tracker fleet agent")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=AGENT_PORT)
+    parser.add_argument('--name', default=NODE_NAME, help="node name used in GPU IDs (node:index)")
+    args = parser.parse_args()
+
+    app.config['NODE_NAME'] = args.name
+    get_sampler()  # start sampling before the first request arrives
+    logger.info(f"Fleet agent for node {args.name} starting...")
+    # Example production use: gunicorn -w 1 -b 0.0.0.0:5001 agent:app
+    app.run(host=args.host, port=args.port)
@@ -0,0 +1,122 @@
+"""ASGI (Starlette) entry point for the GPU status tracker Slack bot.
+
+Serves the same command endpoint as bot.py, but many requests can be in
+flight per process: blocking handlers run in a thread pool and telemetry
+is sampled with asyncio subprocesses instead of a sampler thread.
+
+Example: uvicorn asgi:app --workers 4 --port 5000
+"""
+import time
+import asyncio
+import logging
+import contextlib
+from urllib.parse import parse_qs
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from config import LIVE_BOARD_CHANNELS, TELEMETRY_INTERVAL_SECONDS
+from handlers import dispatch_command
+from handlers.status_handler import render_board
+from utils.expiry_scheduler import ExpiryScheduler
+from utils.gpu_sampler import get_sampler
+from utils.idempotency import command_keys, get_idempotency_cache
+from utils.live_board import LiveBoard
+from utils.slack_blocks import create_unexpected_error_response
+from utils.metrics import render_metrics
+from utils.status_manager import initialize_status, record_state_metrics
+from utils.telemetry import TelemetryError, TelemetrySnapshot, collect_snapshot_async
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def _sample_telemetry() -> None:
+    """Publish telemetry snapshots to the shared sampler from the event loop."""
+    sampler = get_sampler(start=False)
+    while True:
+        try:
+            snapshot = await collect_snapshot_async()
+        except TelemetryError as e:
+            snapshot = TelemetrySnapshot(taken_at=time.time(), gpus=(), processes=(), error=e)
+        except Exception as e:
+            logger.error(f"Telemetry sampling failed: {e}", exc_info=True)
+            snapshot = None
+        if snapshot is not None:
+            sampler.publish(snapshot)
+        await asyncio.sleep(TELEMETRY_INTERVAL_SECONDS)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette):
+    """Initialize state and run background jobs for the app's lifetime."""
+    await run_in_threadpool(initialize_status)
+    # Create the sampler this loop publishes to before the scheduler can
+    # create one with its own sampling thread
+    get_sampler(start=False)
+    scheduler = ExpiryScheduler(board=LiveBoard(render_board) if LIVE_BOARD_CHANNELS else None)
+    scheduler.start()
+    sampling = asyncio.create_task(_sample_telemetry())
+    logger.info("GPU status tracker bot (ASGI) starting...")
+    try:
+        yield
+    finally:
+        sampling.cancel()
+        await run_in_threadpool(scheduler.stop)
+
+
+async def slack_command(request: Request) -> JSONResponse:
+    """Handle Slack slash command requests (see bot.slack_command)."""
+    try:
+        form = parse_qs((await request.body()).decode())
+        user_id = form.get('user_id', ['unknown'])[0]
+        user_name = form.get('user_name', ['Unknown User'])[0]
+        command_text = form.get('text', [''])[0].strip()
+
+        logger.info(f"Received command from {user_name} ({user_id}): {command_text}")
+        retry = request.headers.get('x-slack-retry-num')
+        if retry:
+            logger.info(f"Slack retry #{retry} ({request.headers.get('x-slack-retry-reason', 'unknown reason')})")
+
+        def run() -> dict:
+            action, response_blocks = dispatch_command(command_text, user_id, user_name)
+            logger.debug(f"Returning {len(response_blocks)} blocks for action: {action}")
+            return {
+                "response_type": "in_channel",
+                "blocks": response_blocks
+            }
+
+        keys = command_keys(form.get('trigger_id', [None])[0], user_id, command_text)
+        return JSONResponse(await run_in_threadpool(get_idempotency_cache().run_once, keys, run))
+    except Exception as e:
+        logger.error(f"Error processing command: {e}", exc_info=True)
+        return JSONResponse(create_unexpected_error_response(e), status_code=500)
+
+
+async def health_check(request: Request) -> JSONResponse:
+    """Health check endpoint for monitoring."""
+    return JSONResponse({"status": "healthy"})
+
+
+async def metrics(request: Request) -> Response:
+    """Prometheus scrape endpoint (see bot.metrics)."""
+    try:
+        await run_in_threadpool(record_state_metrics)
+    except Exception as e:
+        logger.error(f"Failed to read state for metrics: {e}")
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+
+app = Starlette(
+    routes=[
+        Route('/', slack_command, methods=['POST']),
+        Route('/health', health_check, methods=['GET']),
+        Route('/metrics', metrics, methods=['GET']),
+    ],
+    lifespan=lifespan
+)
@@ -0,0 +1,82 @@
+"""
+Benchmark claim/release throughput under contention: global lock vs. per-GPU locks.
+
+Each worker process claims and releases its own GPU in a loop, so with
+per-GPU locking ("striped") the workers never wait for each other, while
+the "json" store serializes every write behind one flock.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_lock_striping [--seconds S] [--gpus N]
+"""
+import os
+import sys
+import argparse
+import multiprocessing
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.json_store import JsonStatusStore  # noqa: E402
+from utils.striped_store import StripedStatusStore  # noqa: E402
+
+WORKERS = (1, 2, 4, 8)
+
+RECORD = {"status": "in_use", "user_id": "U0", "user_name": "bench", "purpose": "bench",
+          "claim_time": "2025-01-01T00:00:00+00:00", "release_time": "2025-01-01T01:00:00+00:00"}
+
+
+def _make_store(backend: str, directory: str):
+    if backend == "json":
+        return JsonStatusStore(os.path.join(directory, "gpu_status.json"))
+    return StripedStatusStore(os.path.join(directory, "gpu_status.d"))
+
+
+def _worker(backend: str, directory: str, gpu_id: str, deadline: float, counts, slot: int) -> None:
+    """Claim and release one GPU until the deadline; record completed cycles."""
+    store = _make_store(backend, directory)
+    cycles = 0
+    while time.time() < deadline:
+        assert store.claim_if_available(gpu_id, RECORD)
+        with store.gpu_transaction([gpu_id]) as records:
+            records[gpu_id] = {"status": "available"}
+        cycles += 1
+    counts[slot] = cycles
+
+
+def _run(backend: str, workers: int, gpus: int, seconds: float) -> float:
+    """Return claim+release cycles per second across all workers."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _make_store(backend, tmp)
+        if backend == "striped":
+            os.makedirs(store.lock_dir)
+        store.save({str(i): {"status": "available"} for i in range(gpus)})
+        context = multiprocessing.get_context("fork")
+        counts = context.Array('l', workers)
+        deadline = time.time() + seconds
+        processes = [
+            context.Process(target=_worker, args=(backend, tmp, str(i), deadline, counts, i))
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        return sum(counts) / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--gpus', type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'json (ops/s)':>13} {'striped (ops/s)':>16} {'speedup':>8}")
+    for workers in WORKERS:
+        single = _run("json", workers, args.gpus, args.seconds)
+        striped = _run("striped", workers, args.gpus, args.seconds)
+        print(f"{workers:>8} {single:>13.0f} {striped:>16.0f} {striped / single:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
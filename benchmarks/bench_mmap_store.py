@@ -0,0 +1,75 @@
+"""
+Benchmark status reads: JSON file vs. the memory-mapped slot table.
+
+For each table size this measures, per read:
+  load      full table read after another process changed one GPU
+            (JSON: flock + json.load; mmap: seqlock copy + decode of the
+            changed slot)
+  version   the cache-validity check get_status() makes on every call
+            (JSON: os.stat; mmap: one read of the generation counter)
+
+Usage (from the repository root):
+    python -m benchmarks.bench_mmap_store [--iterations N]
+"""
+import os
+import sys
+import argparse
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_status_cache import _synthetic_status  # noqa: E402
+from utils.json_store import JsonStatusStore  # noqa: E402
+from utils.mmap_store import MmapStatusStore  # noqa: E402
+
+SIZES = (2, 100, 1000, 10000)
+
+
+def _time_reads(store, writer, num_gpus: int, iterations: int) -> float:
+    """Mean latency in microseconds of load() following a one-GPU write."""
+    total = 0.0
+    for i in range(iterations):
+        gpu_id = str(i % num_gpus)
+        with writer.gpu_transaction([gpu_id]) as records:
+            records[gpu_id]["purpose"] = f"run {i}"
+        start = time.perf_counter()
+        store.load()
+        total += time.perf_counter() - start
+    return total / iterations * 1e6
+
+
+def _time_per_call(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'GPUs':>6} {'json load (us)':>15} {'mmap load (us)':>15} {'json version (us)':>18} "
+          f"{'mmap version (us)':>18}")
+    for num_gpus in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            status = _synthetic_status(num_gpus)
+            json_path = os.path.join(tmp, "gpu_status.json")
+            mmap_path = os.path.join(tmp, "gpu_status.tab")
+            JsonStatusStore(json_path).save(status)
+            MmapStatusStore(mmap_path).save(status)
+            # Separate instances stand in for the reading and writing workers
+            json_reader, mmap_reader = JsonStatusStore(json_path), MmapStatusStore(mmap_path)
+            mmap_reader.load()
+
+            json_load = _time_reads(json_reader, JsonStatusStore(json_path), num_gpus, args.iterations)
+            mmap_load = _time_reads(mmap_reader, MmapStatusStore(mmap_path), num_gpus, args.iterations)
+            json_version = _time_per_call(json_reader.version, args.iterations * 10)
+            mmap_version = _time_per_call(mmap_reader.version, args.iterations * 10)
+        print(f"{num_gpus:>6} {json_load:>15.1f} {mmap_load:>15.1f} {json_version:>18.2f} {mmap_version:>18.2f}")
+
+
+if __name__ == '__main__':
+    main()
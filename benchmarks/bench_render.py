@@ -0,0 +1,83 @@
+"""
+Benchmark /gpu status rendering time and block counts for large fleets.
+
+Cold renders clear the per-GPU fragment cache first; warm renders reuse it.
+Before timing, the free-GPU summary is checked on a fleet whose node lines
+fill a section just before one very long line of scattered free GPUs.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_render [--iterations N]
+"""
+import os
+import sys
+import argparse
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_status_cache import _synthetic_status  # noqa: E402
+from handlers import status_handler  # noqa: E402
+from utils.slack_blocks import MAX_BLOCKS  # noqa: E402
+from utils.status_manager import get_status, get_store  # noqa: E402
+
+SIZES = (8, 128, 1024)
+
+
+def check_scattered_summary() -> None:
+    """
+    Summarize 221 nodes with one free GPU each plus a node whose free GPUs
+    are 0, 2, ..., 3998; every section must fit and list each GPU once.
+    """
+    available = [f"node{i:03d}:0" for i in range(221)] + [f"zz:{i}" for i in range(0, 4000, 2)]
+    available.sort(key=status_handler.gpu_sort_key)
+    chunks = [block["text"]["text"] for block in status_handler._available_summary(available)]
+    assert all(0 < len(chunk) <= status_handler._MAX_SECTION_TEXT for chunk in chunks), "section too long"
+    listed = []
+    for line in "\n".join(chunks).splitlines()[1:]:
+        node, _, ranges = line.rpartition("* ")
+        node = node.strip("*:") or "zz"
+        listed.extend(f"{node}:{index.strip()}" for index in ranges.rstrip(",").split(","))
+    assert sorted(listed) == sorted(available), "free GPUs lost or repeated"
+
+
+def _clear_fragments() -> None:
+    status_handler._available_section.cache_clear()
+    status_handler._in_use_section.cache_clear()
+
+
+def _time_render(args, iterations: int, cold: bool) -> float:
+    """Return the mean render time in milliseconds."""
+    total = 0.0
+    for _ in range(iterations):
+        if cold:
+            _clear_fragments()
+        start = time.perf_counter()
+        status_handler.handle_status(args, "U0", "bench")
+        total += time.perf_counter() - start
+    return total / iterations * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    check_scattered_summary()
+    print(f"{'GPUs':>6} {'view':>8} {'blocks':>7} {'cold (ms)':>10} {'warm (ms)':>10}")
+    for num_gpus in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            get_store().save(_synthetic_status(num_gpus))
+            get_status()  # warm the status cache so only rendering is timed
+            for view in ([], ["free"], ["used", "page", "2"]):
+                blocks = len(status_handler.handle_status(view, "U0", "bench"))
+                assert blocks <= MAX_BLOCKS, f"{blocks} blocks for {num_gpus} GPUs"
+                cold = _time_render(view, args.iterations, cold=True)
+                warm = _time_render(view, args.iterations, cold=False)
+                label = " ".join(view) or "all"
+                print(f"{num_gpus:>6} {label:>8} {blocks:>7} {cold:>10.3f} {warm:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
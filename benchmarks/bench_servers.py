@@ -0,0 +1,56 @@
+"""
+Compare throughput and tail latency of the Flask (gunicorn) and ASGI
+(uvicorn) servers under concurrent /gpu traffic.
+
+Requires gunicorn and uvicorn/starlette. nvidia-smi is replaced by
+tools/fake_nvidia_smi.py; FAKE_GPU_DELAY makes it artificially slow.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_servers [--workers 2] [--concurrency 64] [--requests 2000]
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.loadgen import Server, run_load, slack_form, summarize  # noqa: E402
+
+# Read-heavy mix: the dashboard dominates real traffic
+MIX = ["status"] * 6 + ["realtime"] * 3 + ["help"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--output', help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    requests = [
+        (MIX[i % len(MIX)], slack_form(MIX[i % len(MIX)], f"U{i % 50:05d}", f"user{i % 50}"))
+        for i in range(args.requests)
+    ]
+    report = {"workers": args.workers, "concurrency": args.concurrency, "servers": {}}
+    for kind in ("flask", "asgi"):
+        with tempfile.TemporaryDirectory() as workdir:
+            with Server(kind, args.port, args.workers, workdir) as server:
+                run_load(server.base_url + "/", requests[:50], args.concurrency)  # warm up
+                results, wall = run_load(server.base_url + "/", requests, args.concurrency)
+        summary = summarize(results, wall)
+        report["servers"][kind] = summary
+        print(f"{kind:>6}: {summary['throughput_rps']:>8.1f} req/s  "
+              f"p50 {summary['p50_ms']:>7.1f} ms  p99 {summary['p99_ms']:>7.1f} ms  "
+              f"errors {summary['errors']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark best-fit placement of fractional (--mem) claims.
+
+For each fleet size this measures:
+  rebuild   building MemoryFitIndex from the whole table, as claim_share()
+            does after any write or a new telemetry snapshot
+  indexed   one placement from a current index: bisect + update of the
+            chosen GPU's options
+  scan      the same placement by computing every GPU's options (the
+            approach without an index)
+
+The table mixes free, shared and fully claimed 80 GB GPUs; budgets are
+5-40 GB.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_share_placement [--claims N]
+"""
+import os
+import sys
+import argparse
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.allocator import MemoryFitIndex, share_slots  # noqa: E402
+from utils.shares import add_share  # noqa: E402
+
+SIZES = (100, 1000, 10000, 50000)
+
+GPU_MB = 81920
+
+SHARE = {"user_id": "U0", "user_name": "bench", "purpose": "bench",
+         "claim_time": "2025-01-01T00:00:00+00:00", "release_time": "2025-01-01T01:00:00+00:00"}
+
+
+def _synthetic_fleet(num_gpus: int, rng: random.Random):
+    """Status table and memory capacity with a quarter each of shared and claimed GPUs."""
+    status, capacity = {}, {}
+    for i in range(num_gpus):
+        gpu_id = str(i)
+        kind = i % 4
+        if kind == 0:
+            status[gpu_id] = {"status": "in_use", **SHARE}
+        elif kind == 1:
+            info = {"status": "available"}
+            for _ in range(rng.randint(1, 3)):
+                info = add_share(info, {**SHARE, "memory_mb": rng.choice((5, 10, 20)) * 1024}, GPU_MB)
+            status[gpu_id] = info
+        else:
+            status[gpu_id] = {"status": "available"}
+        capacity[gpu_id] = (GPU_MB, rng.randint(0, 30) * 1024)
+    return status, capacity
+
+
+def _budgets(rng: random.Random, count: int):
+    return [rng.choice((5, 10, 20, 40)) * 1024 for _ in range(count)]
+
+
+def _scan(status, capacity, memory_mb: int):
+    best = None
+    for gpu_id, info in status.items():
+        for free, instance in share_slots(gpu_id, info, capacity):
+            if free >= memory_mb and (best is None or free < best[0]):
+                best = (free, gpu_id, instance)
+    return best
+
+
+def _place(status, capacity, index: MemoryFitIndex, memory_mb: int) -> None:
+    choice = index.best_fit(memory_mb)
+    if choice is None:
+        return
+    gpu_id = choice[0]
+    status[gpu_id] = add_share(status[gpu_id], {**SHARE, "memory_mb": memory_mb}, GPU_MB)
+    index.set_gpu(gpu_id, share_slots(gpu_id, status[gpu_id], capacity))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--claims', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'GPUs':>6} {'rebuild (ms)':>13} {'indexed (us)':>13} {'scan (us)':>11}")
+    for num_gpus in SIZES:
+        rng = random.Random(num_gpus)
+        status, capacity = _synthetic_fleet(num_gpus, rng)
+        budgets = _budgets(rng, args.claims)
+
+        start = time.perf_counter()
+        index = MemoryFitIndex.from_status(status, capacity)
+        rebuild = (time.perf_counter() - start) * 1e3
+
+        scan_claims = budgets[:max(1, args.claims // 10)]
+        start = time.perf_counter()
+        for memory_mb in scan_claims:
+            _scan(status, capacity, memory_mb)
+        scan = (time.perf_counter() - start) / len(scan_claims) * 1e6
+
+        start = time.perf_counter()
+        for memory_mb in budgets:
+            _place(status, capacity, index, memory_mb)
+        indexed = (time.perf_counter() - start) / len(budgets) * 1e6
+        print(f"{num_gpus:>6} {rebuild:>13.2f} {indexed:>13.1f} {scan:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
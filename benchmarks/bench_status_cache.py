@@ -0,0 +1,68 @@
+"""
+Benchmark status-read latency with and without the process-local cache.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_status_cache [--iterations N]
+"""
+import os
+import sys
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.status_manager import get_status, get_store, get_cache_stats  # noqa: E402
+
+SIZES = (2, 64, 1024)
+
+
+def _synthetic_status(num_gpus: int) -> Dict[str, Any]:
+    """Build a status table with every other GPU claimed."""
+    now = datetime.now(timezone.utc)
+    status = {}
+    for i in range(num_gpus):
+        if i % 2:
+            status[str(i)] = {
+                "status": "in_use",
+                "user_id": f"U{i:09d}",
+                "user_name": f"user{i}",
+                "purpose": "benchmark run",
+                "claim_time": now.isoformat(),
+                "release_time": (now + timedelta(hours=2)).isoformat()
+            }
+        else:
+            status[str(i)] = {"status": "available"}
+    return status
+
+
+def _time_per_call(func, iterations: int) -> float:
+    """Return the mean latency of func() in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'GPUs':>6} {'uncached (us)':>14} {'cached (us)':>12} {'speedup':>8}")
+    for num_gpus in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            store = get_store()
+            store.save(_synthetic_status(num_gpus))
+            uncached = _time_per_call(store.load, args.iterations)
+            get_status()  # warm the cache
+            cached = _time_per_call(get_status, args.iterations)
+        print(f"{num_gpus:>6} {uncached:>14.1f} {cached:>12.1f} {uncached / cached:>7.1f}x")
+    print(f"cache stats: {get_cache_stats()}")
+
+
+if __name__ == '__main__':
+    main()
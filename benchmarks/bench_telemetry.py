@@ -0,0 +1,52 @@
+"""
+Benchmark telemetry collection: NVML provider vs. nvidia-smi subprocesses.
+
+Runs without a GPU by using tools/mock_pynvml.py for NVML and
+tools/fake_nvidia_smi.py for the subprocess provider.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_telemetry [--gpus N] [--iterations N]
+"""
+import os
+import sys
+import argparse
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('NVIDIA_SMI', os.path.join(ROOT, 'tools', 'fake_nvidia_smi.py'))
+
+from tools import mock_pynvml  # noqa: E402
+from utils.telemetry import NvidiaSmiProvider, NvmlProvider  # noqa: E402
+
+
+def _time_per_call(func, iterations: int) -> float:
+    """Return the mean latency of func() in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--gpus', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ['FAKE_GPU_COUNT'] = os.environ['MOCK_NVML_GPU_COUNT'] = str(args.gpus)
+    nvml = NvmlProvider(nvml=mock_pynvml)
+    smi = NvidiaSmiProvider()
+    assert len(nvml.collect().gpus) == len(smi.collect().gpus) == args.gpus
+
+    nvml_us = _time_per_call(nvml.collect, args.iterations * 20)
+    smi_us = _time_per_call(smi.collect, args.iterations)
+    print(f"{'provider':>12} {'per snapshot (us)':>18}")
+    print(f"{'nvml (mock)':>12} {nvml_us:>18.1f}")
+    print(f"{'nvidia-smi':>12} {smi_us:>18.1f}")
+    print("(mock NVML and fake nvidia-smi both exclude real driver time)")
+    nvml.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark /gpu report aggregation over a synthetic year of usage history.
+
+Builds claim intervals and 5-minute utilization samples for a fleet,
+writes them through UsageLog, then times the cold load (parse, column
+conversion and sample sort) and warm summaries for a week, a month and
+the whole year.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_usage [--gpus N] [--iterations N]
+"""
+import os
+import sys
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.usage import UsageLog, summarize  # noqa: E402
+
+DAYS = 365
+USERS = 60
+PROJECTS = 25
+SAMPLE_SECONDS = 300
+
+
+def _synthetic_history(log: UsageLog, num_gpus: int, seed: int = 0) -> int:
+    """Fill `log` with back-to-back claims on every GPU; returns the interval count."""
+    rng = np.random.default_rng(seed)
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=DAYS)
+    intervals = []
+    for gpu in range(num_gpus):
+        t = start
+        while t < end:
+            length = timedelta(minutes=int(rng.integers(30, 12 * 60)))
+            user = int(rng.integers(USERS))
+            intervals.append({
+                "gpu_id": str(gpu),
+                "user_id": f"U{user:09d}",
+                "user_name": f"user{user}",
+                "purpose": f"project-{int(rng.integers(PROJECTS))}",
+                "start": t.isoformat(),
+                "end": (t + length).isoformat(),
+            })
+            t += length + timedelta(minutes=int(rng.integers(0, 120)))
+    log.append(intervals)
+
+    times = np.arange(start.timestamp(), end.timestamp(), SAMPLE_SECONDS)
+    dtype = np.dtype([('time', '<f8'), ('gpu', '<u4'), ('util', '<f4')])
+    samples = np.empty(len(times) * num_gpus, dtype=dtype)
+    samples['time'] = np.tile(times, num_gpus)
+    samples['gpu'] = np.repeat(np.arange(num_gpus), len(times))
+    samples['util'] = rng.uniform(0, 100, len(samples))
+    samples.tofile(log.samples_path)
+    return len(intervals)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--gpus', type=int, default=64)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = UsageLog(os.path.join(tmp, "usage.jsonl"), os.path.join(tmp, "samples.bin"))
+        count = _synthetic_history(log, args.gpus)
+
+        start = time.perf_counter()
+        columns = log.columns()
+        samples = log.samples()
+        sample_index = log.sample_index()
+        load_ms = (time.perf_counter() - start) * 1e3
+        print(f"{args.gpus} GPUs, {DAYS} days: {count} intervals, {len(samples)} samples")
+        print(f"cold load: {load_ms:.1f} ms")
+
+        now = time.time()
+        print(f"{'window':>8} {'GPU-h':>10} {'weighted':>10} {'summary (ms)':>13}")
+        for label, days in (("week", 7), ("month", 30), ("year", DAYS)):
+            begin = time.perf_counter()
+            for _ in range(args.iterations):
+                report = summarize(columns, now - days * 86400, now, sample_index)
+            elapsed = (time.perf_counter() - begin) / args.iterations * 1e3
+            print(f"{label:>8} {report.hours:>10.0f} {report.weighted_hours:>10.0f} {elapsed:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+End-to-end load and concurrency suite for the /gpu endpoint.
+
+Drives realistic form-encoded Slack payloads (mixed claim, release, status
+and realtime traffic) at a fixed concurrency, either in-process against
+bot.app or against multi-worker servers, then checks invariants:
+
+- every GPU's successful claims and releases balance with its final state
+  (no double claims, no lost claims)
+- the state is readable, well-formed and lists every GPU
+
+nvidia-smi is replaced by tools/fake_nvidia_smi.py. Results are written as
+JSON so runs can be compared between commits.
+
+Usage (from the repository root):
+    python -m benchmarks.load_suite [--mode inprocess|flask|asgi] [--workers 4]
+        [--gpus 8] [--users 40] [--requests 4000] [--concurrency 32]
+        [--output load_results.json]
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import tempfile
+import subprocess
+import time
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.loadgen import (  # noqa: E402
+    FAKE_NVIDIA_SMI, ROOT, Result, Server, run_load, slack_form, summarize
+)
+
+# Relative weights of each command in the traffic mix
+MIX = {"status": 50, "claim": 20, "release": 15, "realtime": 15}
+
+
+def build_requests(count: int, gpus: int, users: int, seed: int) -> List[Tuple[str, bytes]]:
+    """Generate a reproducible mixed workload."""
+    rng = random.Random(seed)
+    labels = list(MIX)
+    weights = [MIX[label] for label in labels]
+    requests = []
+    for _ in range(count):
+        label = rng.choices(labels, weights)[0]
+        user = rng.randrange(users)
+        gpu = rng.randrange(gpus)
+        if label == "claim":
+            # 12h claims so nothing expires during the run
+            text = f"claim {gpu} load-test job 12h"
+        elif label == "release":
+            text = f"release {gpu}"
+        else:
+            text = label
+        requests.append((label, slack_form(text, f"U{user:05d}", f"user{user}")))
+    return requests
+
+
+def _outcome(result: Result) -> Tuple[str, str]:
+    """Classify a claim/release response as (kind, gpu_id) if it succeeded."""
+    if result.status != 200 or result.label not in ("claim", "release"):
+        return "", ""
+    try:
+        text = json.loads(result.body)["blocks"][0]["text"]["text"]
+    except (ValueError, KeyError, IndexError):
+        return "", ""
+    for kind, marker in (("claim", "Successfully Claimed"), ("release", "Successfully Released")):
+        if marker in text:
+            return kind, text.split("*GPU ", 1)[1].split(" ", 1)[0]
+    return "", ""
+
+
+def read_final_state(workdir: str) -> Dict[str, Any]:
+    """Read the final status through the bot's own storage layer."""
+    output = subprocess.run(
+        [sys.executable, "-c", "import json; from utils.status_manager import get_status; print(json.dumps(get_status()))"],
+        cwd=workdir, env={**os.environ, "PYTHONPATH": ROOT}, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def check_invariants(results: List[Result], state: Dict[str, Any], gpus: int) -> Dict[str, Any]:
+    """
+    Verify the run left a consistent state.
+    
+    Returns:
+        Dict[str, Any]: {"ok": bool, "violations": [...], "claims": n, "releases": n}
+    """
+    violations = []
+    claims, releases = Counter(), Counter()
+    for result in results:
+        kind, gpu_id = _outcome(result)
+        if kind == "claim":
+            claims[gpu_id] += 1
+        elif kind == "release":
+            releases[gpu_id] += 1
+
+    expected_ids = {str(i) for i in range(gpus)}
+    if set(state) != expected_ids:
+        violations.append(f"state lists GPUs {sorted(state)}, expected {sorted(expected_ids)}")
+    for gpu_id in sorted(expected_ids):
+        info = state.get(gpu_id, {})
+        if info.get("status") not in ("available", "in_use"):
+            violations.append(f"GPU {gpu_id} has malformed record {info}")
+            continue
+        held = 1 if info["status"] == "in_use" else 0
+        if claims[gpu_id] - releases[gpu_id] != held:
+            violations.append(
+                f"GPU {gpu_id}: {claims[gpu_id]} successful claims, {releases[gpu_id]} releases, "
+                f"final status {info['status']} (double or lost claim)"
+            )
+        if held and not info.get("user_id"):
+            violations.append(f"GPU {gpu_id} is in use without an owner")
+    return {
+        "ok": not violations,
+        "violations": violations,
+        "claims": sum(claims.values()),
+        "releases": sum(releases.values()),
+    }
+
+
+def run_inprocess(workdir: str, requests: List[Tuple[str, bytes]], concurrency: int) -> Tuple[List[Result], float]:
+    """Drive bot.app through Flask's test client from many threads."""
+    os.chdir(workdir)
+    import bot
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.status_manager import initialize_status
+    initialize_status()
+
+    def send(item: Tuple[str, bytes]) -> Result:
+        label, body = item
+        start = time.perf_counter()
+        response = bot.app.test_client().post(
+            "/", data=body, content_type="application/x-www-form-urlencoded"
+        )
+        return Result(label, time.perf_counter() - start, response.status_code, response.get_data())
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, requests))
+    wall = time.perf_counter() - start
+    bot.expiry_scheduler.stop()
+    return results, wall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mode', choices=("inprocess", "flask", "asgi"), default="inprocess")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--gpus', type=int, default=8)
+    parser.add_argument('--users', type=int, default=40)
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--output', default="load_results.json")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+
+    # Each generated request is a separate submission, so repeats must not be
+    # answered as double-submits or the claim/release invariants break
+    os.environ.update({"NVIDIA_SMI": FAKE_NVIDIA_SMI, "TOTAL_GPUS": str(args.gpus), "FAKE_GPU_COUNT": str(args.gpus),
+                       "GPU_DOUBLE_SUBMIT_SECONDS": "0"})
+    requests = build_requests(args.requests, args.gpus, args.users, args.seed)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.mode == "inprocess":
+            results, wall = run_inprocess(workdir, requests, args.concurrency)
+        else:
+            with Server(args.mode, args.port, args.workers, workdir) as server:
+                results, wall = run_load(server.base_url + "/", requests, args.concurrency)
+        state = read_final_state(workdir)
+
+    report = {
+        "mode": args.mode,
+        "workers": 1 if args.mode == "inprocess" else args.workers,
+        "gpus": args.gpus,
+        "concurrency": args.concurrency,
+        "commit": subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                 capture_output=True, text=True).stdout.strip(),
+        "summary": summarize(results, wall),
+        "invariants": check_invariants(results, state, args.gpus),
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    summary = report["summary"]
+    print(f"{args.mode}: {summary['throughput_rps']} req/s over {summary['requests']} requests "
+          f"({summary['errors']} errors)")
+    for label, stats in summary["by_command"].items():
+        print(f"  {label:>9}: p50 {stats['p50_ms']:>7.1f} ms  p95 {stats['p95_ms']:>7.1f} ms  p99 {stats['p99_ms']:>7.1f} ms")
+    invariants = report["invariants"]
+    print(f"invariants: {'OK' if invariants['ok'] else 'VIOLATED'} "
+          f"({invariants['claims']} claims, {invariants['releases']} releases)")
+    for violation in invariants["violations"]:
+        print(f"  - {violation}")
+    print(f"results written to {output}")
+    sys.exit(0 if invariants["ok"] else 1)
+
+
+if __name__ == '__main__':
+    main()
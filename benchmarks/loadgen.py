@@ -0,0 +1,195 @@
+"""Shared helpers for driving the /gpu endpoint under concurrent load."""
+import os
+import sys
+import time
+import random
+import importlib.util
+import subprocess
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, NamedTuple, Optional, Sequence, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_NVIDIA_SMI = os.path.join(ROOT, 'tools', 'fake_nvidia_smi.py')
+
+
+class Result(NamedTuple):
+    """One request's outcome."""
+    label: str
+    latency: float  # seconds
+    status: int  # HTTP status, 0 on connection failure
+    body: bytes
+
+
+def slack_form(text: str, user_id: str, user_name: str, **extra: str) -> bytes:
+    """
+    Build a form-encoded body shaped like a Slack slash command request.
+    
+    Args:
+        text: Command text after `/gpu`
+        user_id: Slack user ID
+        user_name: Slack user name
+        **extra: Additional or overriding form fields
+        
+    Returns:
+        bytes: application/x-www-form-urlencoded request body
+    """
+    fields = {
+        "token": "benchmark",
+        "team_id": "T0BENCH",
+        "team_domain": "bench",
+        "channel_id": "C0BENCH",
+        "channel_name": "gpu",
+        "user_id": user_id,
+        "user_name": user_name,
+        "command": "/gpu",
+        "text": text,
+        "api_app_id": "A0BENCH",
+        "response_url": "http://127.0.0.1:9/unused",
+        "trigger_id": f"{random.getrandbits(48)}.{random.getrandbits(32)}",
+    }
+    fields.update(extra)
+    return urllib.parse.urlencode(fields).encode()
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of a sequence of samples."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def post(url: str, label: str, body: bytes, timeout: float = 30) -> Result:
+    """POST one form body and time it."""
+    start = time.perf_counter()
+    request = urllib.request.Request(
+        url, data=body, headers={"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            data = response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        data, status = e.read(), e.code
+    except (urllib.error.URLError, OSError):
+        data, status = b'', 0
+    return Result(label, time.perf_counter() - start, status, data)
+
+
+def run_load(url: str, requests: List[Tuple[str, bytes]], concurrency: int) -> Tuple[List[Result], float]:
+    """
+    Send requests with a fixed number of concurrent clients.
+    
+    Args:
+        url: Endpoint to POST to
+        requests: (label, body) pairs, sent in order
+        concurrency: Number of requests in flight at once
+        
+    Returns:
+        Tuple of (results in completion order, wall-clock seconds)
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda item: post(url, *item), requests))
+    return results, time.perf_counter() - start
+
+
+def summarize(results: List[Result], wall: float) -> Dict[str, Any]:
+    """
+    Compute throughput and latency percentiles, overall and per label.
+    
+    Args:
+        results: Request outcomes
+        wall: Wall-clock duration of the run in seconds
+        
+    Returns:
+        Dict[str, Any]: JSON-serializable summary (latencies in ms)
+    """
+    def stats(subset: List[Result]) -> Dict[str, Any]:
+        latencies = [r.latency * 1000 for r in subset]
+        return {
+            "requests": len(subset),
+            "errors": sum(1 for r in subset if r.status != 200),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+        }
+
+    summary = {"throughput_rps": round(len(results) / wall, 1), "wall_s": round(wall, 3), **stats(results)}
+    summary["by_command"] = {
+        label: stats([r for r in results if r.label == label])
+        for label in sorted({r.label for r in results})
+    }
+    return summary
+
+
+def wait_for_health(base_url: str, timeout: float = 30) -> None:
+    """Block until GET /health answers, or raise RuntimeError."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=1):
+                return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not become healthy")
+
+
+def server_command(kind: str, port: int, workers: int) -> List[str]:
+    """
+    Command line that serves the bot on a port.
+    
+    Args:
+        kind: "flask" (gunicorn, sync workers) or "asgi" (uvicorn)
+        port: TCP port to bind on 127.0.0.1
+        workers: Number of worker processes
+        
+    Returns:
+        List[str]: argv for subprocess
+    """
+    if kind == "flask":
+        return [sys.executable, "-m", "gunicorn", "--pythonpath", ROOT, "-w", str(workers),
+                "-b", f"127.0.0.1:{port}", "--log-level", "warning", "bot:app"]
+    if kind == "asgi":
+        return [sys.executable, "-m", "uvicorn", "--app-dir", ROOT, "--workers", str(workers),
+                "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "asgi:app"]
+    raise ValueError(f"Unknown server kind: {kind}")
+
+
+class Server:
+    """
+    Runs the bot in a subprocess with its state in a scratch directory.
+    
+    nvidia-smi is replaced by tools/fake_nvidia_smi.py.
+    """
+
+    def __init__(self, kind: str, port: int, workers: int, workdir: str,
+                 env: Optional[Dict[str, str]] = None):
+        self.kind = kind
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.workdir = workdir
+        self._argv = server_command(kind, port, workers)
+        self._env = {**os.environ, "NVIDIA_SMI": FAKE_NVIDIA_SMI, "PYTHONPATH": ROOT, **(env or {})}
+        self._process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "Server":
+        module = self._argv[2]
+        if importlib.util.find_spec(module) is None:
+            raise RuntimeError(f"{module} is not installed")
+        self._process = subprocess.Popen(self._argv, cwd=self.workdir, env=self._env)
+        try:
+            wait_for_health(self.base_url)
+        except RuntimeError:
+            self.__exit__()
+            raise
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
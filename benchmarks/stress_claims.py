@@ -0,0 +1,137 @@
+"""
+Concurrency stress check: parallel claims from several processes on every backend.
+
+For each storage backend, worker processes wait on a barrier and then
+fire claims at the same small set of GPUs. Half the attempts use the
+store's atomic claim_if_available() (what /gpu claim <id> uses), the other
+half a check-and-set inside gpu_transaction() (what multi-GPU claims use).
+The check passes when every GPU has exactly one winner and the stored
+record names that winner.
+
+Usage (from the repository root):
+    python -m benchmarks.stress_claims [--processes 8] [--claims 400] [--gpus 8]
+        [--backends json,sqlite,journal,striped,mmap]
+
+Exits non-zero if any backend lets two claims win the same GPU.
+"""
+import os
+import sys
+import random
+import argparse
+import multiprocessing
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.journal_store import JournalStatusStore  # noqa: E402
+from utils.json_store import JsonStatusStore  # noqa: E402
+from utils.mmap_store import MmapStatusStore  # noqa: E402
+from utils.sqlite_store import SqliteStatusStore  # noqa: E402
+from utils.striped_store import StripedStatusStore  # noqa: E402
+
+BACKENDS = ("json", "sqlite", "journal", "striped", "mmap")
+
+
+def _make_store(backend: str, directory: str):
+    if backend == "json":
+        return JsonStatusStore(os.path.join(directory, "gpu_status.json"))
+    if backend == "sqlite":
+        return SqliteStatusStore(os.path.join(directory, "gpu_status.db"))
+    if backend == "journal":
+        return JournalStatusStore(os.path.join(directory, "gpu_events.jsonl"),
+                                  os.path.join(directory, "gpu_snapshot.json"))
+    if backend == "striped":
+        return StripedStatusStore(os.path.join(directory, "gpu_status.d"))
+    return MmapStatusStore(os.path.join(directory, "gpu_status.tab"))
+
+
+def _record(user_id: str) -> Dict[str, str]:
+    return {"status": "in_use", "user_id": user_id, "user_name": user_id, "purpose": "stress",
+            "claim_time": "2025-01-01T00:00:00+00:00", "release_time": "2025-01-01T01:00:00+00:00"}
+
+
+def _worker(backend: str, directory: str, gpus: int, claims: int, worker: int, barrier, results) -> None:
+    """Attempt `claims` claims on random GPUs; report the ones that won."""
+    store = _make_store(backend, directory)
+    rng = random.Random(worker)
+    wins: List[Tuple[str, str]] = []
+    barrier.wait()
+    for attempt in range(claims):
+        gpu_id = str(rng.randrange(gpus))
+        user_id = f"W{worker}-{attempt}"
+        if attempt % 2:
+            won = store.claim_if_available(gpu_id, _record(user_id))
+        else:
+            with store.gpu_transaction([gpu_id]) as records:
+                won = records.get(gpu_id, {}).get('status') == 'available'
+                if won:
+                    records[gpu_id] = _record(user_id)
+        if won:
+            wins.append((gpu_id, user_id))
+    results.put(wins)
+
+
+def check_backend(backend: str, processes: int, claims: int, gpus: int) -> Tuple[bool, str]:
+    """
+    Run the stress check on one backend.
+
+    Returns:
+        Tuple of (passed, summary line)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _make_store(backend, tmp)
+        store.initialize()
+        store.save({str(i): {"status": "available"} for i in range(gpus)})
+
+        barrier = multiprocessing.Barrier(processes)
+        results = multiprocessing.Queue()
+        started = time.perf_counter()
+        workers = [
+            multiprocessing.Process(target=_worker, args=(backend, tmp, gpus, claims // processes, n, barrier, results))
+            for n in range(processes)
+        ]
+        for process in workers:
+            process.start()
+        winners: Dict[str, List[str]] = defaultdict(list)
+        for _ in workers:
+            for gpu_id, user_id in results.get():
+                winners[gpu_id].append(user_id)
+        for process in workers:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        final = _make_store(backend, tmp).load()
+        problems = []
+        for i in range(gpus):
+            gpu_id = str(i)
+            won = winners.get(gpu_id, [])
+            if len(won) != 1:
+                problems.append(f"GPU {gpu_id}: {len(won)} winners")
+            elif final.get(gpu_id, {}).get('user_id') != won[0]:
+                problems.append(f"GPU {gpu_id}: stored holder is not the winner")
+    summary = (f"{backend:>8}: {processes} processes x {claims // processes} claims on {gpus} GPUs "
+               f"in {elapsed:.2f}s - " + ("; ".join(problems) if problems else "one winner per GPU"))
+    return not problems, summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--claims', type=int, default=400, help="total claims across all processes")
+    parser.add_argument('--gpus', type=int, default=8)
+    parser.add_argument('--backends', default=",".join(BACKENDS))
+    args = parser.parse_args()
+
+    passed = True
+    for backend in args.backends.split(','):
+        ok, summary = check_backend(backend.strip(), args.processes, args.claims, args.gpus)
+        print(summary)
+        passed = passed and ok
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,17 @@
 """Main Flask application for GPU status tracker Slack bot."""
+import time
 import logging
-from flask import Flask, request, jsonify
-from utils.status_manager import initialize_status
-from handlers import command_handlers, handle_help
+from flask import Flask, Response, request, jsonify
+from config import DEFERRED_RESPONSES, LIVE_BOARD_CHANNELS
+from utils.status_manager import initialize_status, record_state_metrics
+from utils.expiry_scheduler import ExpiryScheduler
+from utils.deferred import DeferredResponder
+from utils.idempotency import command_keys, get_idempotency_cache
+from utils.live_board import LiveBoard
+from utils.slack_blocks import create_unexpected_error_response
+from utils.metrics import render_metrics
+from handlers import dispatch_command
+from handlers.status_handler import render_board
 
 # Configure logging
 logging.basicConfig(
@@ -13,6 +22,47 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+# Auto-release expired claims in the background. Every worker starts one,
+# but only the process holding the scheduler lock actually runs it (and
+# keeps the live board, if any, up to date).
+expiry_scheduler = ExpiryScheduler(board=LiveBoard(render_board) if LIVE_BOARD_CHANNELS else None)
+expiry_scheduler.start()
+
+deferred_responder = DeferredResponder() if DEFERRED_RESPONSES else None
+
+
+def _run_command(command_text: str, user_id: str, user_name: str):
+    """Run a command and build the JSON body for Slack."""
+    action, response_blocks = dispatch_command(command_text, user_id, user_name)
+    logger.debug(f"Returning {len(response_blocks)} blocks for action: {action}")
+    return {
+        "response_type": "in_channel",
+        "blocks": response_blocks
+    }
+
+
+def _deferred_payload(command_text: str, user_id: str, user_name: str):
+    """Run a command in the background, turning failures into an error message."""
+    try:
+        return _run_command(command_text, user_id, user_name)
+    except Exception as e:
+        logger.error(f"Error processing deferred command: {e}", exc_info=True)
+        return create_unexpected_error_response(e)
+
+
+def _respond(command_text: str, user_id: str, user_name: str, response_url, received_at: float):
+    """Run a command inline, or queue it and build the acknowledgement."""
+    if deferred_responder is not None and response_url:
+        queued = deferred_responder.submit(
+            lambda: _deferred_payload(command_text, user_id, user_name),
+            response_url,
+            received_at
+        )
+        if queued:
+            deferred_responder.record_ack(received_at)
+            return {"response_type": "ephemeral", "text": "⏳ Working on it..."}
+    return _run_command(command_text, user_id, user_name)
+
 
 @app.route('/', methods=['POST'])
 def slack_command():
@@ -23,56 +73,57 @@ def slack_command():
     - user_id: Slack user ID
     - user_name: Slack user name
     - text: Command text (e.g., "claim 0 training 2h")
+    - response_url: Used to deliver the result when deferred responses are enabled
+    - trigger_id: Identifies the request; Slack retries reuse it
+    
+    Retries and double-submits get the original response without running
+    the command again (see utils.idempotency).
     
     Returns:
-        JSON response with Slack Block Kit blocks
+        JSON response with Slack Block Kit blocks, or an immediate
+        acknowledgement when the result is delivered via response_url
     """
+    received_at = time.perf_counter()
     try:
         data = request.form
         user_id = data.get('user_id', 'unknown')
         user_name = data.get('user_name', 'Unknown User')
         command_text = data.get('text', '').strip()
+        response_url = data.get('response_url')
         
         logger.info(f"Received command from {user_name} ({user_id}): {command_text}")
+        retry = request.headers.get('X-Slack-Retry-Num')
+        if retry:
+            logger.info(f"Slack retry #{retry} ({request.headers.get('X-Slack-Retry-Reason', 'unknown reason')})")
         
-        parts = command_text.split() if command_text else []
-        action = parts[0].lower() if parts else "status"
-        args = parts[1:]
-
-        # Find the correct handler function using the action string.
-        # If the command is unknown, default to the help handler.
-        handler = command_handlers.get(action, handle_help)
-        
-        # Execute the handler to get the response blocks
-        response_blocks = handler(args, user_id, user_name)
-        
-        logger.debug(f"Returning {len(response_blocks)} blocks for action: {action}")
-
-        return jsonify({
-            "response_type": "in_channel",
-            "blocks": response_blocks
-        })
+        keys = command_keys(data.get('trigger_id'), user_id, command_text)
+        return jsonify(get_idempotency_cache().run_once(
+            keys, lambda: _respond(command_text, user_id, user_name, response_url, received_at)
+        ))
         
     except Exception as e:
         logger.error(f"Error processing command: {e}", exc_info=True)
-        return jsonify({
-            "response_type": "ephemeral",
-            "blocks": [
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"❌ *Error*\nAn unexpected error occurred: {str(e)}"
-                    }
-                }
-            ]
-        }), 500
+        return jsonify(create_unexpected_error_response(e)), 500
 
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for monitoring."""
-    return jsonify({"status": "healthy"}), 200
+    body = {"status": "healthy"}
+    if deferred_responder is not None:
+        body["deferred_latency"] = deferred_responder.latency_summary()
+    return jsonify(body), 200
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint (aggregated across workers in multiprocess mode)."""
+    try:
+        record_state_metrics()
+    except Exception as e:
+        logger.error(f"Failed to read state for metrics: {e}")
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
 
 
 if __name__ == '__main__':
@@ -86,4 +137,4 @@ if __name__ == '__main__':
     
     # To run in production, you would use a proper WSGI server like Gunicorn
     # Example: gunicorn -w 4 -b 0.0.0.0:5000 bot:app
-    app.run(port=5000, debug=True)
\ No newline at end of file
+    app.run(port=5000, debug=True)
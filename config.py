@@ -1,6 +1,145 @@
+import os
 from zoneinfo import ZoneInfo
 
 # --- Bot Configuration ---
-TOTAL_GPUS = 2
-STATUS_FILE = 'gpu_status.json'
-INDIA_TZ = ZoneInfo("Asia/Kolkata")
\ No newline at end of file
+TOTAL_GPUS = int(os.environ.get('TOTAL_GPUS', 2))
+STATUS_FILE = os.environ.get('GPU_STATUS_FILE', 'gpu_status.json')
+INDIA_TZ = ZoneInfo("Asia/Kolkata")
+
+# --- Dashboard ---
+# Slack rejects messages with more than 50 blocks; larger fleets are paginated
+STATUS_PAGE_SIZE = 20  # in-use GPUs per /gpu status page
+REALTIME_PAGE_SIZE = 10  # GPUs per /gpu realtime page
+
+# --- Allocation ---
+# Optional GPU topology used by "/gpu claim any N": per node ("" for this
+# host), groups of indexes that share a fast interconnect, e.g.
+# {"": [[0, 1, 2, 3], [4, 5, 6, 7]], "nodeA": [[0, 1], [2, 3]]}
+GPU_TOPOLOGY = {}
+
+# --- Fractional Claims ---
+# "/gpu claim any --mem 20G ..." packs memory-budgeted claims onto shared
+# GPUs, best fit by free memory (total minus the larger of reserved and
+# live-used memory). Memory sizes come from telemetry; GPUs without it
+# (fleet nodes, telemetry down) count as SHARE_DEFAULT_MEMORY_GB, where 0
+# keeps them out of fractional claims.
+SHARE_DEFAULT_MEMORY_GB = 0
+SHARE_MAX_PER_GPU = 4  # concurrent shares on one GPU
+# GPUs partitioned with MIG: instance memory sizes in GB per GPU ID, e.g.
+# {"0": [10, 10, 20, 40]}. Each share then takes one whole free instance,
+# the smallest that fits its budget.
+MIG_INSTANCES = {}
+
+# --- Waitlist & Notifications ---
+QUEUE_FILE = 'gpu_queue.json'
+# Direct messages (e.g. queue hand-offs) are sent with chat.postMessage;
+# without a bot token they are only logged.
+SLACK_API_URL = os.environ.get('SLACK_API_URL', 'https://slack.com/api')
+SLACK_BOT_TOKEN = os.environ.get('SLACK_BOT_TOKEN')
+NOTIFY_WORKERS = 2
+
+# --- Reservations ---
+RESERVATIONS_FILE = 'gpu_reservations.json'
+RESERVATION_MAX_HOURS = 72  # longest single booking
+RESERVATION_HORIZON_DAYS = 30  # how far ahead GPUs can be booked
+
+# --- Idle Claim Reclamation ---
+# "off", "warn" (DM the holder) or "release" (also release after the grace period)
+IDLE_RECLAIM = "warn"
+IDLE_UTILIZATION_PERCENT = 5  # at or below this, with no processes, a GPU is idle
+IDLE_WARN_MINUTES = 30  # idle time before the holder is warned
+IDLE_GRACE_MINUTES = 30  # time after the warning before the claim is released
+RECONCILE_INTERVAL_SECONDS = 60
+
+# --- Usage Accounting ---
+# Finished claims are appended to USAGE_FILE; utilization of claimed local
+# GPUs is sampled into USAGE_SAMPLES_FILE for utilization-weighted hours.
+USAGE_FILE = 'gpu_usage.jsonl'
+USAGE_SAMPLES_FILE = 'gpu_usage_samples.bin'
+USAGE_SAMPLE_SECONDS = 300
+USAGE_REPORT_TOP = 10  # users/projects listed per report section
+
+# --- Fleet Configuration ---
+# Remote GPU hosts running agent.py, e.g. {"nodeA": "http://10.0.0.11:5001"}
+FLEET_NODES = {}
+# GPUs per remote host; claimable as node-qualified IDs such as "nodeA:3"
+FLEET_NODE_GPUS = {}
+FLEET_TIMEOUT_SECONDS = 2.0  # per-node deadline for a fleet query
+FLEET_CACHE_SECONDS = 5  # how long a node's response is reused
+NODE_NAME = os.environ.get('GPU_NODE_NAME', os.uname().nodename)
+AGENT_PORT = 5001
+
+# --- Storage Configuration ---
+# "json" keeps the whole table in STATUS_FILE; "sqlite" stores one row
+# per GPU in SQLITE_STATUS_FILE (run `python -m utils.sqlite_store migrate`
+# once to import an existing STATUS_FILE); "journal" appends every change
+# to JOURNAL_FILE and periodically compacts it into SNAPSHOT_FILE;
+# "striped" keeps one file and one lock per GPU in STRIPED_STATUS_DIR so
+# claims and releases on different GPUs don't wait for each other;
+# "mmap" keeps fixed-width slots in MMAP_STATUS_FILE that every worker maps
+# and reads without locks or JSON parsing.
+STATUS_BACKEND = "json"
+SQLITE_STATUS_FILE = 'gpu_status.db'
+JOURNAL_FILE = 'gpu_events.jsonl'
+SNAPSHOT_FILE = 'gpu_snapshot.json'
+STRIPED_STATUS_DIR = 'gpu_status.d'
+MMAP_STATUS_FILE = 'gpu_status.tab'
+MMAP_CAPACITY = 16384  # GPU slots; fixed when the file is created
+MMAP_SLOT_SIZE = 512  # bytes per GPU record, including user name and purpose (shares need ~2048)
+JOURNAL_COMPACT_EVERY = 500  # events between snapshots
+
+# --- Background Jobs ---
+EXPIRY_POLL_SECONDS = 15  # max delay before noticing claims made by other workers
+SCHEDULER_LOCK_FILE = 'gpu_scheduler.lock'
+
+# --- Telemetry ---
+# "auto" uses NVML (pip install nvidia-ml-py) when available and falls back
+# to running nvidia-smi; "nvml" or "nvidia-smi" force one provider.
+TELEMETRY_BACKEND = "auto"
+# Point NVIDIA_SMI at tools/fake_nvidia_smi.py to run without a GPU.
+NVIDIA_SMI = os.environ.get('NVIDIA_SMI', 'nvidia-smi')
+TELEMETRY_INTERVAL_SECONDS = 5
+TELEMETRY_TIMEOUT_SECONDS = 10
+# History per GPU for /gpu history: (seconds per slot, slots), here 1 hour
+# at the sampling interval and 24 hours at 1 minute. It lives in
+# HISTORY_FILE, mapped by every worker and written by the scheduler leader.
+HISTORY_TIERS = ((TELEMETRY_INTERVAL_SECONDS, 3600 // TELEMETRY_INTERVAL_SECONDS), (60, 24 * 60))
+HISTORY_FILE = 'gpu_history.bin'
+HISTORY_MAX_GPUS = 16  # local GPU indexes with history (~220 KiB each)
+
+# --- Deferred Responses ---
+# When enabled, commands are acknowledged immediately and their result is
+# posted to Slack's response_url, so slow handlers never hit the 3 s timeout.
+DEFERRED_RESPONSES = False
+DEFERRED_WORKERS = 8
+DEFERRED_MAX_QUEUE = 64  # commands beyond this run inline instead
+DEFERRED_RETRIES = 3
+DEFERRED_BACKOFF_SECONDS = 0.5
+
+# --- Live Board ---
+# Channel IDs (comma-separated in GPU_LIVE_BOARD_CHANNELS) that get a pinned
+# board message, edited in place whenever claims or rounded utilization
+# change. Needs SLACK_BOT_TOKEN with the chat:write and pins:write scopes.
+LIVE_BOARD_CHANNELS = [c.strip() for c in os.environ.get('GPU_LIVE_BOARD_CHANNELS', '').split(',') if c.strip()]
+LIVE_BOARD_FILE = 'gpu_boards.json'
+LIVE_BOARD_POLL_SECONDS = 1  # how often the store version and telemetry are checked
+LIVE_BOARD_DEBOUNCE_SECONDS = 2  # quiet time that ends a burst of changes
+LIVE_BOARD_MAX_DELAY_SECONDS = 10  # longest a change is held back by a continuing burst
+LIVE_BOARD_MIN_INTERVAL_SECONDS = 5  # between updates of the boards
+LIVE_BOARD_MAX_CALLS_PER_MINUTE = 40  # all channels; chat.update is Slack Tier 3 (~50/min)
+LIVE_BOARD_BACKOFF_SECONDS = 30  # after a failed or rate-limited call
+LIVE_BOARD_UTIL_STEP = 10  # utilization is shown rounded to this many percent
+LIVE_BOARD_MAX_SECTIONS = 44  # free + claimed GPU sections, under Slack's 50-block limit
+
+# --- Duplicate Commands ---
+# Slack retries (same trigger_id) get the original response for
+# IDEMPOTENCY_TTL_SECONDS; identical claim/release/extend/queue/reserve
+# commands from one user within IDEMPOTENCY_DOUBLE_SUBMIT_SECONDS are
+# treated as double-submits (0 disables that check). Read-only commands
+# are not deduplicated.
+IDEMPOTENCY_FILE = 'gpu_idempotency.db'  # SQLite, one row per key
+IDEMPOTENCY_TTL_SECONDS = 300
+IDEMPOTENCY_DOUBLE_SUBMIT_SECONDS = float(os.environ.get('GPU_DOUBLE_SUBMIT_SECONDS', 5))
+IDEMPOTENCY_PENDING_SECONDS = 60  # a running command's claim on its keys
+IDEMPOTENCY_WAIT_SECONDS = 2.5  # how long a duplicate waits for the original's response
+IDEMPOTENCY_MAX_ENTRIES = 1000
@@ -0,0 +1,18 @@
+"""Gunicorn settings for the Flask app (gunicorn -c gunicorn.conf.py bot:app).
+
+With PROMETHEUS_MULTIPROC_DIR set, /metrics merges samples from every
+worker; dead workers' live gauges are cleaned up here.
+"""
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        try:
+            from prometheus_client import multiprocess
+        except ImportError:
+            return
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,13 +1,59 @@
+from typing import Any, Dict, List, Tuple
 from .claim_handler import handle_claim
 from .release_handler import handle_release
+from .extend_handler import handle_extend
+from .mine_handler import handle_mine
+from .queue_handler import handle_queue
+from .reserve_handler import handle_reserve
 from .status_handler import handle_status
 from .realtime_handler import handle_realtime_status
+from .fleet_handler import handle_fleet_status
+from .history_handler import handle_history
+from .idle_handler import handle_idle
+from .report_handler import handle_report
 from .help_handler import handle_help
+from utils.metrics import COMMAND_ERRORS, COMMAND_LATENCY, observe_duration
 
 command_handlers = {
     "claim": handle_claim,
     "release": handle_release,
+    "extend": handle_extend,
+    "mine": handle_mine,
+    "queue": handle_queue,
+    "reserve": handle_reserve,
     "status": handle_status,
     "realtime": handle_realtime_status,
+    "fleet": handle_fleet_status,
+    "history": handle_history,
+    "idle": handle_idle,
+    "report": handle_report,
     "help": handle_help
-}
\ No newline at end of file
+}
+
+def dispatch_command(command_text: str, user_id: str, user_name: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Parse a slash command and run the matching handler.
+    
+    Args:
+        command_text: Command text (e.g., "claim 0 training 2h")
+        user_id: Slack user ID
+        user_name: Slack user name
+        
+    Returns:
+        Tuple of (action, Slack block elements from the handler)
+    """
+    parts = command_text.split() if command_text else []
+    action = parts[0].lower() if parts else "status"
+    args = parts[1:]
+
+    # Find the correct handler function using the action string.
+    # If the command is unknown, default to the help handler.
+    handler = command_handlers.get(action, handle_help)
+    # Unknown actions are labelled "help" to keep metric cardinality bounded
+    label = action if action in command_handlers else "help"
+    try:
+        with observe_duration(COMMAND_LATENCY.labels(action=label)):
+            return action, handler(args, user_id, user_name)
+    except Exception:
+        COMMAND_ERRORS.labels(action=label).inc()
+        raise
@@ -1,108 +1,347 @@
 """Handler for GPU claim commands."""
 import logging
-from datetime import datetime, timezone
-from typing import List, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
 from config import INDIA_TZ
-from utils.status_manager import get_status, save_status, validate_gpu_id
+from utils.allocator import memory_capacity, parse_gpu_selector
+from utils.gpu_sampler import get_sampler
+from utils.status_manager import (
+    claim_any, claim_gpu, claim_gpus, claim_share, get_status, validate_gpu_id, gpu_sort_key
+)
+from utils.reservations import get_reservation_book
+from utils.shares import SHARED, format_memory, parse_memory, share_summary
 from utils.slack_blocks import create_error_block
 from utils.time_parser import parse_duration
 
 logger = logging.getLogger(__name__)
 
 
+def parse_purpose_and_duration(args: List[str]) -> Tuple[str, str, timedelta]:
+    """
+    Split trailing claim arguments into purpose and duration.
+    
+    Args:
+        args: Words after the GPU selector, e.g. ["training", "model", "2h"]
+        
+    Returns:
+        Tuple of (purpose, duration string, duration); invalid or missing
+        durations default to 1h
+    """
+    # Parse duration - check if last arg is a duration string
+    duration_str = "1h"
+    if args and args[-1].lower().endswith(('h', 'm')):
+        duration_str = args[-1].lower()
+        purpose = " ".join(args[:-1]) if len(args) > 1 else "No purpose specified"
+    else:
+        purpose = " ".join(args)
+    
+    if not purpose or not purpose.strip():
+        purpose = "No purpose specified"
+
+    try:
+        duration = parse_duration(duration_str)
+    except ValueError as e:
+        logger.warning(f"Invalid duration format: {duration_str}, using default 1h")
+        duration_str = "1h"
+        duration = parse_duration(duration_str)
+    return purpose, duration_str, duration
+
+
+def _format_ids(gpu_ids: List[str]) -> str:
+    """Format GPU IDs as inline code for messages."""
+    return ", ".join(f"`{gpu_id}`" for gpu_id in gpu_ids)
+
+
+def reservation_warning(gpu_ids: List[str], start: datetime, end: datetime, user_id: str) -> List[Dict[str, Any]]:
+    """
+    Warn when a new claim runs into someone else's reservation.
+    
+    Args:
+        gpu_ids: Claimed GPUs
+        start: Claim start
+        end: Claim release time
+        user_id: Slack user ID of the claimer
+        
+    Returns:
+        A context block to append, or an empty list
+    """
+    try:
+        index = get_reservation_book().index()
+        conflicts = [(gpu_id, index.conflict(gpu_id, start, end)) for gpu_id in gpu_ids]
+    except Exception as e:
+        logger.warning(f"Failed to check reservations: {e}")
+        return []
+    notes = [
+        f"GPU {gpu_id} is reserved by {booking['user_name']} from "
+        f"{datetime.fromisoformat(booking['start']).astimezone(INDIA_TZ).strftime('%I:%M %p IST')}"
+        for gpu_id, booking in conflicts if booking is not None and booking['user_id'] != user_id
+    ]
+    if not notes:
+        return []
+    return [{"type": "context", "elements": [{"type": "mrkdwn", "text": "⚠️ _" + "; ".join(notes) + " - please release it by then_"}]}]
+
+
+def split_memory_option(args: List[str]) -> Tuple[List[str], Optional[int]]:
+    """
+    Remove a "--mem <size>" option from claim arguments.
+    
+    Args:
+        args: Command arguments
+        
+    Returns:
+        Tuple of (remaining arguments, budget in MiB or None)
+        
+    Raises:
+        ValueError: If the size is missing or malformed
+    """
+    lowered = [arg.lower() for arg in args]
+    if "--mem" not in lowered:
+        return args, None
+    position = lowered.index("--mem")
+    if position + 1 >= len(args):
+        raise ValueError("missing memory budget")
+    return args[:position] + args[position + 2:], parse_memory(args[position + 1])
+
+
 def handle_claim(args: List[str], user_id: str, user_name: str) -> List[Dict[str, Any]]:
     """
     Handle GPU claim command.
     
+    Accepts a single GPU ("0"), a range ("0-3"), a list ("0,2,5") or
+    "any N". Multi-GPU claims are all-or-nothing. With "--mem <size>" the
+    claim reserves only that much memory of one GPU ("any" or a single
+    ID), which other fractional claims can share.
+    
     Args:
-        args: Command arguments [gpu_id, purpose, ...duration]
+        args: Command arguments [gpu_selector, purpose, ...duration]
+            or ["any", count, purpose, ...duration], optionally with
+            "--mem", size
         user_id: Slack user ID
         user_name: Slack user name
         
     Returns:
         List of Slack block elements for the response
     """
+    try:
+        args, memory_mb = split_memory_option(args)
+    except ValueError:
+        return create_error_block(
+            "Invalid Memory Budget",
+            "Please give the memory as e.g. `--mem 20G` or `--mem 512M`.\n\n*Example:* `/gpu claim any --mem 20G data prep 2h`"
+        )
+    if memory_mb is not None:
+        return _claim_share(args, memory_mb, user_id, user_name)
+
     if len(args) < 2:
         return create_error_block(
             "Invalid Command Format",
-            "Please use: `/gpu claim <number> <purpose> [duration]`\n\n*Example:* `/gpu claim 0 training model 2h`"
+            "Please use: `/gpu claim <number> <purpose> [duration]`\n\n*Example:* `/gpu claim 0 training model 2h`\n"
+            "Multiple GPUs: `/gpu claim 0-3 ...`, `/gpu claim 0,2,5 ...` or `/gpu claim any 4 ...`"
         )
 
-    gpu_id = args[0].strip()
-    
+    count = None
+    gpu_ids: List[str] = []
+    if args[0].lower() == "any":
+        if len(args) < 3 or not args[1].isdigit() or int(args[1]) < 1:
+            return create_error_block(
+                "Invalid Command Format",
+                "Please use: `/gpu claim any <count> <purpose> [duration]`\n\n*Example:* `/gpu claim any 4 ddp training 8h`"
+            )
+        count = int(args[1])
+        purpose, duration_str, duration = parse_purpose_and_duration(args[2:])
+    else:
+        try:
+            gpu_ids = parse_gpu_selector(args[0].strip())
+        except ValueError:
+            # Reported as an unknown GPU below
+            gpu_ids = [args[0].strip()]
+        purpose, duration_str, duration = parse_purpose_and_duration(args[1:])
+
+    claim_time = datetime.now(timezone.utc)
+    release_time = claim_time + duration
+    release_time_ist = release_time.astimezone(INDIA_TZ).strftime('%I:%M %p IST')
+
+    record = {
+        "status": "in_use",
+        "user_id": user_id,
+        "user_name": user_name,
+        "purpose": purpose,
+        "claim_time": claim_time.isoformat(),
+        "release_time": release_time.isoformat()
+    }
+
+    if count is not None or len(gpu_ids) > 1:
+        return _claim_many(gpu_ids, count, record, duration_str, release_time_ist)
+
+    gpu_id = gpu_ids[0]
+
+    # The availability check and the write happen atomically in the store,
+    # so concurrent claims on the same GPU cannot both succeed.
     try:
-        status = get_status()
+        claimed = claim_gpu(gpu_id, record)
+        if not claimed:
+            status = get_status()
     except Exception as e:
-        logger.error(f"Failed to get status: {e}")
+        logger.error(f"Failed to claim GPU {gpu_id}: {e}")
         return create_error_block(
             "System Error",
-            "Failed to retrieve GPU status. Please try again later."
+            "Failed to save GPU claim. Please try again later."
         )
 
-    if not validate_gpu_id(gpu_id, status):
-        available_gpus = ", ".join(f"`{k}`" for k in sorted(status.keys(), key=int))
-        return create_error_block(
-            "GPU Not Found",
-            f"GPU `{gpu_id}` does not exist.\n*Available GPUs:* {available_gpus}"
-        )
-    
-    if status[gpu_id]['status'] != 'available':
+    if not claimed:
+        if not validate_gpu_id(gpu_id, status):
+            available_gpus = ", ".join(f"`{k}`" for k in sorted(status.keys(), key=gpu_sort_key))
+            return create_error_block(
+                "GPU Not Found",
+                f"GPU `{gpu_id}` does not exist.\n*Available GPUs:* {available_gpus}"
+            )
+        if status[gpu_id].get('status') == SHARED:
+            return create_error_block(
+                "GPU Is Shared",
+                f"GPU `{gpu_id}` is split into fractional claims ({share_summary(status[gpu_id])}).\n"
+                f"Use `/gpu claim {gpu_id} --mem <size> <purpose>` to take a share of it."
+            )
         current_user = status[gpu_id].get('user_name', 'Unknown')
         return create_error_block(
             "GPU Already in Use",
             f"GPU `{gpu_id}` is currently being used by *{current_user}*."
         )
 
-    # Parse duration - check if last arg is a duration string
-    duration_str = "1h"
-    if args[-1].lower().endswith(('h', 'm')):
-        duration_str = args[-1].lower()
-        purpose = " ".join(args[1:-1]) if len(args) > 2 else "No purpose specified"
-    else:
-        purpose = " ".join(args[1:])
+    logger.info(f"GPU {gpu_id} claimed by {user_name} ({user_id}) for {duration_str}")
     
-    if not purpose or not purpose.strip():
-        purpose = "No purpose specified"
+    return [
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"🎉 *GPU {gpu_id} Successfully Claimed!*\n\n👤 *User:* {user_name}\n📝 *Purpose:* `{record['purpose']}`\n⏰ *Duration:* {duration_str}\n🕒 *Release Time:* ~{release_time_ist}"
+            }
+        },
+        {
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": f"💡 _Remember to use `/gpu release {gpu_id}` when you're done!_"}]}
+    ] + reservation_warning([gpu_id], claim_time, release_time, user_id)
+
 
+def _claim_many(gpu_ids: List[str], count: Optional[int], record: Dict[str, Any],
+                duration_str: str, release_time_ist: str) -> List[Dict[str, Any]]:
+    """Claim an explicit GPU set, or `count` allocator-chosen GPUs, all-or-nothing."""
     try:
-        duration = parse_duration(duration_str)
-    except ValueError as e:
-        logger.warning(f"Invalid duration format: {duration_str}, using default 1h")
-        duration_str = "1h"
-        duration = parse_duration(duration_str)
+        if count is not None:
+            claimed = claim_any(count, record)
+            missing, busy = [], []
+        else:
+            missing, busy = claim_gpus(gpu_ids, record)
+            claimed = gpu_ids if not (missing or busy) else None
+        if claimed is None:
+            status = get_status()
+    except Exception as e:
+        logger.error(f"Failed to claim GPUs {gpu_ids or count}: {e}")
+        return create_error_block(
+            "System Error",
+            "Failed to save GPU claim. Please try again later."
+        )
 
+    if claimed is None:
+        if count is not None:
+            free = sum(1 for info in status.values() if info.get('status') == 'available')
+            return create_error_block(
+                "Not Enough GPUs",
+                f"You asked for {count} GPUs but only {free} are free. No GPUs were claimed."
+            )
+        if missing:
+            return create_error_block(
+                "GPU Not Found",
+                f"GPU(s) {_format_ids(missing)} do not exist. No GPUs were claimed."
+            )
+        holders = ", ".join(f"`{gpu_id}` ({status.get(gpu_id, {}).get('user_name', 'Unknown')})" for gpu_id in busy)
+        return create_error_block(
+            "GPUs Already in Use",
+            f"Some requested GPUs are taken: {holders}. No GPUs were claimed."
+        )
+
+    logger.info(f"GPUs {claimed} claimed by {record['user_name']} ({record['user_id']}) for {duration_str}")
+    title = f"GPU {claimed[0]} Successfully Claimed!" if len(claimed) == 1 else f"{len(claimed)} GPUs Successfully Claimed!"
+
+    return [
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"🎉 *{title}*\n\n🎯 *{'GPU' if len(claimed) == 1 else 'GPUs'}:* {_format_ids(claimed)}\n👤 *User:* {record['user_name']}\n📝 *Purpose:* `{record['purpose']}`\n⏰ *Duration:* {duration_str}\n🕒 *Release Time:* ~{release_time_ist}"
+            }
+        },
+        {
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": "💡 _Remember to use `/gpu release <id>` for each GPU when you're done!_"}]}
+    ] + reservation_warning(claimed, datetime.fromisoformat(record['claim_time']),
+                            datetime.fromisoformat(record['release_time']), record['user_id'])
+
+
+def _claim_share(args: List[str], memory_mb: int, user_id: str, user_name: str) -> List[Dict[str, Any]]:
+    """Place a fractional claim of `memory_mb` on the given GPU or, for "any", the best-fitting one."""
+    if len(args) < 2 or len(args[0].split(',')) > 1 or '-' in args[0].rpartition(':')[2]:
+        return create_error_block(
+            "Invalid Command Format",
+            "Please use: `/gpu claim <id|any> --mem <size> <purpose> [duration]`\n\n"
+            "*Example:* `/gpu claim any --mem 20G data prep 2h`\nA fractional claim takes part of one GPU."
+        )
+    gpu_id = None if args[0].lower() == "any" else args[0].strip()
+    purpose, duration_str, duration = parse_purpose_and_duration(args[1:])
     claim_time = datetime.now(timezone.utc)
     release_time = claim_time + duration
-    release_time_ist = release_time.astimezone(INDIA_TZ).strftime('%I:%M %p IST')
-
-    status[gpu_id] = {
-        "status": "in_use",
+    share = {
         "user_id": user_id,
         "user_name": user_name,
         "purpose": purpose,
         "claim_time": claim_time.isoformat(),
         "release_time": release_time.isoformat()
     }
-    
+
     try:
-        save_status(status)
-        logger.info(f"GPU {gpu_id} claimed by {user_name} ({user_id}) for {duration_str}")
+        snapshot = get_sampler().latest()
+        status = get_status()
+        if gpu_id is not None and not validate_gpu_id(gpu_id, status):
+            available_gpus = ", ".join(f"`{k}`" for k in sorted(status.keys(), key=gpu_sort_key))
+            return create_error_block(
+                "GPU Not Found",
+                f"GPU `{gpu_id}` does not exist.\n*Available GPUs:* {available_gpus}"
+            )
+        placed = claim_share(memory_mb, share, memory_capacity(snapshot),
+                             None if snapshot is None else snapshot.taken_at, gpu_id)
     except Exception as e:
-        logger.error(f"Failed to save status: {e}")
+        logger.error(f"Failed to claim {memory_mb} MiB on GPU {gpu_id or 'any'}: {e}")
         return create_error_block(
             "System Error",
             "Failed to save GPU claim. Please try again later."
         )
-    
+
+    if placed is None and gpu_id is not None and status[gpu_id].get('status') == 'in_use':
+        return create_error_block(
+            "GPU Already in Use",
+            f"GPU `{gpu_id}` is currently being used by *{status[gpu_id].get('user_name', 'Unknown')}*."
+        )
+    if placed is None:
+        where = f"GPU `{gpu_id}`" if gpu_id is not None else "any GPU"
+        return create_error_block(
+            "Not Enough GPU Memory",
+            f"There is no room for another {format_memory(memory_mb)} share on {where} right now. No GPU was claimed.\n"
+            "Try a smaller `--mem`, or `/gpu queue any` for a whole GPU."
+        )
+
+    gpu_id, stored = placed
+    instance = f" (MIG instance {stored['mig_instance']})" if 'mig_instance' in stored else ""
+    logger.info(f"{format_memory(stored['memory_mb'])} of GPU {gpu_id}{instance} claimed by {user_name} ({user_id}) for {duration_str}")
+    release_time_ist = release_time.astimezone(INDIA_TZ).strftime('%I:%M %p IST')
     return [
         {
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": f"🎉 *GPU {gpu_id} Successfully Claimed!*\n\n👤 *User:* {user_name}\n📝 *Purpose:* `{purpose}`\n⏰ *Duration:* {duration_str}\n🕒 *Release Time:* ~{release_time_ist}"
+                "text": f"🎉 *{format_memory(stored['memory_mb'])} of GPU {gpu_id}{instance} Successfully Claimed!*\n\n👤 *User:* {user_name}\n📝 *Purpose:* `{purpose}`\n⏰ *Duration:* {duration_str}\n🕒 *Release Time:* ~{release_time_ist}"
             }
         },
         {
             "type": "context",
-            "elements": [{"type": "mrkdwn", "text": f"💡 _Remember to use `/gpu release {gpu_id}` when you're done!_"}]}
-    ]
\ No newline at end of file
+            "elements": [{"type": "mrkdwn", "text": f"💡 _The GPU is shared: keep your job within its memory budget, and use `/gpu release {gpu_id}` when you're done!_"}]}
+    ] + reservation_warning([gpu_id], claim_time, release_time, user_id)
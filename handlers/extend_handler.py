@@ -0,0 +1,108 @@
+"""Handler for extending GPU claims."""
+import re
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any
+from config import INDIA_TZ
+from handlers.claim_handler import reservation_warning
+from handlers.release_handler import resolve_selector, select_own_gpus
+from utils.shares import SHARED
+from utils.slack_blocks import create_error_block, create_info_block
+from utils.status_manager import gpu_transaction
+from utils.time_parser import parse_duration
+
+logger = logging.getLogger(__name__)
+
+USAGE = "Please use: `/gpu extend <id|all> <duration>`\n\n*Example:* `/gpu extend 0 2h` or `/gpu extend all 1h`"
+
+# Same bounds as a claim's duration (see utils.time_parser.parse_duration)
+_MIN_MINUTES, _MAX_HOURS = 30, 12
+
+
+def _release_time(claim: Dict[str, Any], now: datetime) -> datetime:
+    """A claim's release time, or `now` if it is missing or malformed."""
+    try:
+        return datetime.fromisoformat(claim['release_time']).replace(tzinfo=timezone.utc)
+    except (KeyError, ValueError, TypeError):
+        return now
+
+
+def _extended(claim: Dict[str, Any], now: datetime, extension: timedelta) -> Dict[str, Any]:
+    """Copy of a claim (or share) whose release time is pushed out by `extension`."""
+    return {**claim, 'release_time': (max(_release_time(claim, now), now) + extension).isoformat()}
+
+
+def handle_extend(args: List[str], user_id: str, user_name: str) -> List[Dict[str, Any]]:
+    """
+    Handle the claim extension command.
+
+    Pushes out the release time of one or more of the caller's claims
+    without releasing them. The extension counts from the current release
+    time, or from now if that has already passed. On shared GPUs only the
+    caller's shares are extended. All selected claims are
+    updated in one transaction that locks only those GPUs.
+
+    Args:
+        args: Command arguments [gpu_selector | "all", duration]
+        user_id: Slack user ID
+        user_name: Slack user name
+
+    Returns:
+        List of Slack block elements for the response
+    """
+    if len(args) < 2 or not re.match(r'^\d+[hm]$', args[-1].lower()):
+        return create_error_block("Invalid Command Format", USAGE)
+
+    selector = args[0].strip()
+    duration_str = args[-1].lower()
+    minutes = int(duration_str[:-1]) * (60 if duration_str.endswith('h') else 1)
+    if not _MIN_MINUTES <= minutes <= _MAX_HOURS * 60:
+        return create_error_block("Invalid Duration", f"Extensions must be between {_MIN_MINUTES}m and {_MAX_HOURS}h.")
+    extension = parse_duration(duration_str, max_hours=_MAX_HOURS)
+    now = datetime.now(timezone.utc)
+    new_times: Dict[str, datetime] = {}
+
+    try:
+        gpu_ids, error = resolve_selector(selector, user_id)
+        if error is not None:
+            return error
+        with gpu_transaction(gpu_ids, "extend") as status:
+            gpu_ids, error = select_own_gpus(gpu_ids, user_id, status, selector.lower() == "all")
+            if error is not None:
+                return error
+            if not gpu_ids:
+                return create_info_block("Nothing to Extend", "You don't hold any of the selected GPUs.")
+            for gpu_id in gpu_ids:
+                record = dict(status[gpu_id])
+                if record.get('status') == SHARED:
+                    shares = [_extended(share, now, extension) if share.get('user_id') == user_id else share
+                              for share in record['shares']]
+                    new_times[gpu_id] = max(_release_time(share, now) for share in shares
+                                            if share.get('user_id') == user_id)
+                    record['shares'] = shares
+                else:
+                    record = _extended(record, now, extension)
+                    new_times[gpu_id] = _release_time(record, now)
+                status[gpu_id] = record
+    except Exception as e:
+        logger.error(f"Failed to extend GPU {selector}: {e}")
+        return create_error_block(
+            "System Error",
+            "Failed to save the extension. Please try again later."
+        )
+
+    logger.info(f"GPUs {gpu_ids} extended by {duration_str} for {user_name} ({user_id})")
+    lines = "\n".join(
+        f"• GPU {gpu_id} until ~{release.astimezone(INDIA_TZ).strftime('%I:%M %p IST')}"
+        for gpu_id, release in new_times.items()
+    )
+    latest = max(new_times.values())
+    return [
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"⏰ *Extended by {duration_str}*\n{lines}"
+            }
+        }
+    ] + reservation_warning(gpu_ids, now, latest, user_id)
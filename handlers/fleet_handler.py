@@ -0,0 +1,132 @@
+"""Handler for the merged multi-node fleet dashboard."""
+import time
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from config import INDIA_TZ, NODE_NAME, TOTAL_GPUS
+from handlers.realtime_handler import format_age, format_number, gpu_load_status
+from utils.fleet import NodeResult, get_fleet_client
+from utils.gpu_sampler import get_sampler
+from utils.shares import SHARED, share_summary
+from utils.slack_blocks import MAX_BLOCKS, create_page_footer, parse_page_args
+from utils.status_manager import get_status
+from utils.telemetry import GpuSample
+
+logger = logging.getLogger(__name__)
+
+
+def _claim_text(info: Optional[Dict[str, Any]]) -> str:
+    """Describe the claim state of one GPU."""
+    if not info or info.get('status') == 'available':
+        return "✅ Available"
+    if info.get('status') == SHARED:
+        return f"🟡 Shared: {share_summary(info)}"
+    return f"🔴 {info.get('user_name', 'Unknown')} - `{info.get('purpose', 'No purpose specified')}`"
+
+
+def _gpu_section(gpu_id: str, gpu: GpuSample, claim: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a compact one-block summary for a GPU."""
+    emoji, _ = gpu_load_status(gpu)
+    return {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": (
+                f"{emoji} *{gpu_id}* · {gpu.name}\n"
+                f"⚡ {format_number(gpu.utilization)}% · 🌡️ {format_number(gpu.temperature)}°C · "
+                f"💾 {format_number(gpu.memory_used)}/{format_number(gpu.memory_total)} MiB\n"
+                f"{_claim_text(claim)}"
+            )
+        }
+    }
+
+
+def _node_blocks(result: NodeResult, status: Dict[str, Any], qualify: bool) -> List[Dict[str, Any]]:
+    """Build the blocks for one node's GPUs."""
+    if result.fetched_at is None:
+        header = f"⚠️ *{result.node}* - unreachable ({result.error})"
+    elif result.is_partial:
+        header = f"⚠️ *{result.node}* - stale, data from {format_age(max(0.0, time.time() - result.fetched_at))} ({result.error})"
+    else:
+        header = f"🖥️ *{result.node}*"
+    blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": header}}]
+
+    telemetry = result.telemetry
+    if telemetry is not None and telemetry.error is not None:
+        blocks.append({"type": "context", "elements": [{"type": "mrkdwn", "text": f"❌ {telemetry.error.title}"}]})
+    elif telemetry is not None:
+        for gpu in telemetry.gpus:
+            gpu_id = f"{result.node}:{gpu.index}" if qualify else gpu.index
+            # The central store is authoritative; fall back to the node's own claims
+            claim = status.get(gpu_id) or result.claims.get(gpu.index)
+            blocks.append(_gpu_section(gpu_id, gpu, claim))
+    blocks.append({"type": "divider"})
+    return blocks
+
+
+def handle_fleet_status(args: List[str], user_id: str, user_name: str) -> List[Dict[str, Any]]:
+    """
+    Handle the fleet dashboard command.
+    
+    Shows this host's GPUs and every configured fleet node. Nodes that are
+    slow or down are marked instead of failing the whole command. Large
+    fleets are split into pages of whole nodes (`/gpu fleet page 2`).
+    
+    Args:
+        args: Optional `page N`
+        user_id: Slack user ID
+        user_name: Slack user name
+        
+    Returns:
+        List of Slack block elements for the response
+    """
+    page, _ = parse_page_args(args)
+    try:
+        status = get_status()
+    except Exception as e:
+        logger.error(f"Failed to get status: {e}")
+        status = {}
+
+    results = []
+    if TOTAL_GPUS > 0:
+        local = get_sampler().latest()
+        results.append((NodeResult(NODE_NAME, local, {}, local.taken_at, None), False))
+    results.extend((result, True) for result in get_fleet_client().fetch_all())
+
+    responding = sum(1 for result, _ in results if not result.is_partial)
+    partial = [result.node for result, _ in results if result.is_partial]
+    current_time = datetime.now(INDIA_TZ).strftime('%I:%M %p IST, %B %d')
+    blocks = [
+        {"type": "header", "text": {"type": "plain_text", "text": "🌐 GPU Fleet Dashboard"}},
+        {
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": f"📅 Updated: {current_time} | Nodes responding: {responding}/{len(results)}"}]
+        },
+        {"type": "divider"}
+    ]
+    if partial:
+        blocks.insert(2, {
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": f"⚠️ _Partial results - no fresh data from: {', '.join(partial)}_"}]
+        })
+
+    # Fill pages with whole nodes while staying under Slack's block limit
+    budget = MAX_BLOCKS - len(blocks) - 2
+    pages = [[]]
+    for result, qualify in results:
+        node_blocks = _node_blocks(result, status, qualify)[:budget]
+        if pages[-1] and sum(map(len, pages[-1])) + len(node_blocks) > budget:
+            pages.append([])
+        pages[-1].append(node_blocks)
+    page = min(max(1, page), len(pages))
+    for node_blocks in pages[page - 1]:
+        blocks.extend(node_blocks)
+    footer = create_page_footer(page, len(pages), "/gpu fleet")
+    if footer is not None:
+        blocks.append(footer)
+
+    blocks.append({
+        "type": "context",
+        "elements": [{"type": "mrkdwn", "text": "💡 Fleet GPUs are claimed by node-qualified ID, e.g. `/gpu claim nodeA:3 <purpose>`"}]
+    })
+    return blocks
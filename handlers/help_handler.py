@@ -21,14 +21,14 @@ def handle_help(args: List[str], user_id: str, user_name: str) -> List[Dict[str,
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": "📊 *Status Commands*\n• `/gpu status` or `/gpu` - Check allocation status\n• `/gpu realtime` - View real-time GPU performance"
+                "text": "📊 *Status Commands*\n• `/gpu status` or `/gpu` - Check allocation status\n• `/gpu status free|used [page N]` - Filter or page through large fleets\n• `/gpu realtime` - View real-time GPU performance\n• `/gpu fleet` - View GPUs across all nodes\n• `/gpu history <id> [1h|24h]` - Utilization, memory and temperature trends\n• `/gpu idle` - List idle claims and unclaimed busy GPUs\n• `/gpu report [week|month] [user|me]` - GPU-hours per user and project"
             }
         },
         {
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": "🎯 *Management Commands*\n• `/gpu claim <id> <purpose> [duration]` - Reserve a GPU\n• `/gpu release <id>` - Release your claimed GPU"
+                "text": "🎯 *Management Commands*\n• `/gpu claim <id> <purpose> [duration]` - Reserve a GPU\n• `/gpu claim 0-3|0,2,5|any 4 <purpose> [duration]` - Reserve several GPUs at once\n• `/gpu claim <id|any> --mem 20G <purpose> [duration]` - Share a GPU: claim only part of its memory\n• `/gpu release <id>|0-3|all` - Release your claimed GPUs\n• `/gpu extend <id|all> <duration>` - Push out your release time\n• `/gpu mine` - List the GPUs you hold\n• `/gpu queue <id|any> <purpose> [duration]` - Wait for a busy GPU\n• `/gpu queue` / `/gpu queue cancel [#id|all]` - View or leave the waitlist\n• `/gpu reserve <id|any> [tomorrow] <HH:MM> <duration> <purpose>` - Book a GPU ahead\n• `/gpu reserve` / `/gpu reserve cancel #id` - View or cancel bookings"
             }
         },
         {"type": "divider"},
@@ -36,7 +36,7 @@ def handle_help(args: List[str], user_id: str, user_name: str) -> List[Dict[str,
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": "💡 *Examples*\n```\n/gpu claim 0 training model 3h\n/gpu release 1\n/gpu realtime\n/gpu status\n```"
+                "text": "💡 *Examples*\n```\n/gpu claim 0 training model 3h\n/gpu claim any 4 ddp run 8h\n/gpu claim any --mem 20G data prep 2h\n/gpu release 1\n/gpu extend all 2h\n/gpu realtime\n/gpu status\n```"
             }
         },
         {
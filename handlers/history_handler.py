@@ -0,0 +1,91 @@
+"""Handler for GPU telemetry history sparklines."""
+import re
+import time
+import logging
+from typing import List, Dict, Any, Optional
+from utils.slack_blocks import create_error_block, create_info_block
+from utils.telemetry_history import get_history, sparkline
+
+logger = logging.getLogger(__name__)
+
+# (metric, label, unit) rows shown per GPU
+_ROWS = (
+    ("utilization", "⚡ Util", "%"),
+    ("memory", "💾 Mem", "%"),
+    ("temperature", "🌡️ Temp", "°C"),
+)
+
+
+def parse_window(text: str) -> Optional[int]:
+    """Parse a window such as "30m", "1h" or "24h" into seconds."""
+    match = re.match(r'^(\d+)([mh])$', text.lower())
+    if not match or int(match.group(1)) == 0:
+        return None
+    return int(match.group(1)) * (60 if match.group(2) == 'm' else 3600)
+
+
+def _format_value(value: Optional[float], unit: str) -> str:
+    return "N/A" if value is None else f"{value:.0f}{unit}"
+
+
+def handle_history(args: List[str], user_id: str, user_name: str) -> List[Dict[str, Any]]:
+    """
+    Handle the telemetry history command.
+
+    Renders utilization, memory and temperature sparklines with
+    min/avg/max for one local GPU over the last hour (default) or any
+    window up to the longest history tier.
+
+    Args:
+        args: Command arguments [gpu_id, window]
+        user_id: Slack user ID
+        user_name: Slack user name
+
+    Returns:
+        List of Slack block elements for the response
+    """
+    if not args:
+        return create_error_block(
+            "Invalid Command Format",
+            "Please use: `/gpu history <id> [1h|24h]`\n\n*Example:* `/gpu history 0 24h`"
+        )
+
+    gpu_id = args[0].strip()
+    window_str = args[1].lower() if len(args) > 1 else "1h"
+    history = get_history()
+    window = parse_window(window_str)
+    if window is None or window > history.max_span:
+        return create_error_block(
+            "Invalid Window",
+            f"`{window_str}` is not a valid window. Use minutes or hours up to {history.max_span // 3600}h, e.g. `1h` or `24h`."
+        )
+
+    end = time.time()
+    series = {metric: history.series(gpu_id, metric, window, end) for metric, _, _ in _ROWS}
+    if series["utilization"] is None:
+        known = ", ".join(f"`{g}`" for g in sorted(history.gpu_ids(), key=int)) or "none yet"
+        return create_info_block(
+            "No History",
+            f"No telemetry has been recorded for GPU `{gpu_id}` on this host.\n*GPUs with history:* {known}"
+        )
+
+    lines = []
+    for metric, label, unit in _ROWS:
+        stats = series[metric]
+        high = 100.0 if unit == "%" else max(100.0, stats.maximum or 0.0)
+        lines.append(
+            f"*{label}*  min {_format_value(stats.minimum, unit)} · avg {_format_value(stats.average, unit)} · "
+            f"max {_format_value(stats.maximum, unit)}\n`{sparkline(stats.points, high=high)}`"
+        )
+    resolution = series["utilization"].resolution
+    step = f"{resolution}s" if resolution < 60 else f"{resolution // 60}m"
+    return [
+        {
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": f"📉 *GPU {gpu_id} · last {window_str}*\n\n" + "\n".join(lines)}
+        },
+        {
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": f"🕒 {step} per point, oldest on the left · gaps are periods without samples"}]
+        }
+    ]
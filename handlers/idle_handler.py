@@ -0,0 +1,67 @@
+"""Handler for listing idle claims and unclaimed busy GPUs."""
+import logging
+from datetime import datetime, timezone
+from typing import List, Dict, Any
+from config import IDLE_RECLAIM, IDLE_UTILIZATION_PERCENT
+from utils.gpu_sampler import get_sampler
+from utils.reconciler import idle_for, join_activity
+from utils.slack_blocks import create_error_block, create_info_block
+from utils.status_manager import get_status
+
+logger = logging.getLogger(__name__)
+
+
+def handle_idle(args: List[str], user_id: str, user_name: str) -> List[Dict[str, Any]]:
+    """
+    Handle the idle report command.
+
+    Joins the current claims with the latest local telemetry and lists
+    claimed GPUs doing no work, plus unclaimed GPUs that are running
+    processes.
+
+    Args:
+        args: Command arguments (unused)
+        user_id: Slack user ID
+        user_name: Slack user name
+
+    Returns:
+        List of Slack block elements for the response
+    """
+    try:
+        snapshot = get_sampler().latest()
+        if snapshot.error is not None:
+            return create_error_block(snapshot.error.title, snapshot.error.message)
+        activities = join_activity(get_status(), snapshot)
+    except Exception as e:
+        logger.error(f"Failed to build idle report: {e}", exc_info=True)
+        return create_error_block("System Error", "Failed to read GPU activity. Please try again later.")
+
+    now = datetime.now(timezone.utc)
+    idle_lines, orphan_lines = [], []
+    for activity in activities:
+        if activity.claimed and activity.idle:
+            idle = idle_for(activity.claim, now)
+            since = f"idle {int(idle.total_seconds() // 60)}m" if idle is not None else "idle"
+            warned = " · warned" if 'idle_warned_at' in activity.claim else ""
+            idle_lines.append(f"• GPU {activity.gpu_id} · *{activity.claim.get('user_name', 'Unknown')}* · "
+                              f"`{activity.claim.get('purpose', 'No purpose specified')}` · {since}{warned}")
+        elif not activity.claimed and activity.processes:
+            pids = ", ".join(process.pid for process in activity.processes)
+            orphan_lines.append(f"• GPU {activity.gpu_id} · PIDs {pids}")
+
+    if not idle_lines and not orphan_lines:
+        return create_info_block("No Idle Claims", "Every claimed GPU is busy and no unclaimed GPU is running processes.")
+
+    blocks = []
+    if idle_lines:
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": "💤 *Idle Claims*\n" + "\n".join(idle_lines)}})
+    if orphan_lines:
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": "👻 *Unclaimed but Busy*\n" + "\n".join(orphan_lines)}})
+    blocks.append({
+        "type": "context",
+        "elements": [{
+            "type": "mrkdwn",
+            "text": f"💡 Idle means ≤{IDLE_UTILIZATION_PERCENT}% utilization and no processes · reclaim mode: `{IDLE_RECLAIM}`"
+        }]
+    })
+    return blocks
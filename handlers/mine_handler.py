@@ -0,0 +1,80 @@
+"""Handler for listing the GPUs a user holds."""
+import logging
+from datetime import datetime, timezone
+from typing import List, Dict, Any
+from config import INDIA_TZ
+from utils.shares import format_memory, gpu_claims
+from utils.slack_blocks import create_error_block, create_info_block
+from utils.status_manager import get_status, get_user_gpus
+
+logger = logging.getLogger(__name__)
+
+
+def format_remaining(release_time: str, now: datetime) -> str:
+    """
+    Describe a claim's release time and how long is left.
+
+    Args:
+        release_time: ISO release time from the claim record
+        now: Current time (aware)
+
+    Returns:
+        str: e.g. "until ~04:30 PM IST (1h 20m left)"
+    """
+    try:
+        release = datetime.fromisoformat(release_time).replace(tzinfo=timezone.utc)
+    except (ValueError, TypeError):
+        return "until unknown"
+    seconds = (release - now).total_seconds()
+    until = release.astimezone(INDIA_TZ).strftime('%I:%M %p IST')
+    if seconds <= 0:
+        return f"until ~{until} (expired)"
+    hours, minutes = int(seconds // 3600), int((seconds % 3600) // 60)
+    left = f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
+    return f"until ~{until} ({left} left)"
+
+
+def handle_mine(args: List[str], user_id: str, user_name: str) -> List[Dict[str, Any]]:
+    """
+    Handle the command listing the caller's claimed GPUs.
+
+    Args:
+        args: Command arguments (unused)
+        user_id: Slack user ID
+        user_name: Slack user name
+
+    Returns:
+        List of Slack block elements for the response
+    """
+    try:
+        gpu_ids = get_user_gpus(user_id)
+        status = get_status()
+    except Exception as e:
+        logger.error(f"Failed to read GPUs for {user_id}: {e}")
+        return create_error_block("System Error", "Failed to read GPU status. Please try again later.")
+
+    if not gpu_ids:
+        return create_info_block("No GPUs Claimed", "You don't have any GPUs claimed right now.")
+
+    now = datetime.now(timezone.utc)
+    lines = []
+    for gpu_id in gpu_ids:
+        for claim in gpu_claims(status.get(gpu_id, {})):
+            if claim.get('user_id') != user_id:
+                continue
+            memory = f" · {format_memory(claim['memory_mb'])}" if 'memory_mb' in claim else ""
+            lines.append(f"• GPU {gpu_id}{memory} · `{claim.get('purpose', 'No purpose specified')}` · "
+                         f"{format_remaining(claim.get('release_time'), now)}")
+    return [
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"🧑‍💻 *Your GPUs ({len(lines)})*\n" + "\n".join(lines)
+            }
+        },
+        {
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": "💡 _Use `/gpu extend <id|all> 2h` for more time or `/gpu release all` when you're done_"}]
+        }
+    ]
@@ -0,0 +1,128 @@
+"""Handler for the GPU waitlist commands."""
+import logging
+from datetime import datetime
+from typing import List, Dict, Any
+from config import INDIA_TZ
+from handlers.claim_handler import parse_purpose_and_duration
+from utils.slack_blocks import create_error_block, create_info_block, create_success_block
+from utils.status_manager import gpu_sort_key, validate_gpu_id
+from utils.waitlist import ANY_GPU, claim_record, enqueue, get_waitlist, waitlist_transaction
+
+logger = logging.getLogger(__name__)
+
+# Entries shown by `/gpu queue` (Slack limits a section to 3000 characters)
+_MAX_LISTED = 40
+
+
+def _list_queue() -> List[Dict[str, Any]]:
+    """Show everyone waiting, in hand-off order."""
+    entries = get_waitlist().entries()
+    if not entries:
+        return create_info_block("Waitlist Empty", "Nobody is waiting for a GPU.\nUse `/gpu queue <id|any> <purpose> [duration]` to join.")
+    lines = []
+    for position, entry in enumerate(entries[:_MAX_LISTED], start=1):
+        target = "any GPU" if entry["gpu_id"] == ANY_GPU else f"GPU {entry['gpu_id']}"
+        queued_at = datetime.fromisoformat(entry["queued_at"]).astimezone(INDIA_TZ).strftime('%I:%M %p')
+        lines.append(f"{position}. *{entry['user_name']}* → {target} · `{entry['purpose']}` ({entry['duration']}) · #{entry['id']} since {queued_at}")
+    if len(entries) > _MAX_LISTED:
+        lines.append(f"_...and {len(entries) - _MAX_LISTED} more_")
+    return [
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"📋 *GPU Waitlist ({len(entries)})*\n" + "\n".join(lines)}},
+        {
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": "💡 Use `/gpu queue cancel [#id|all]` to leave the waitlist"}]
+        }
+    ]
+
+
+def _cancel(args: List[str], user_id: str) -> List[Dict[str, Any]]:
+    """Remove one (`#id`) or all of the user's entries."""
+    target = args[0].lstrip('#') if args else "all"
+    if target != "all" and not target.isdigit():
+        return create_error_block(
+            "Invalid Command Format",
+            "Please use: `/gpu queue cancel [#id|all]`\n\n*Example:* `/gpu queue cancel #12`"
+        )
+    with get_waitlist().transaction() as queue:
+        mine = [entry for entry in queue["entries"] if entry["user_id"] == user_id
+                and (target == "all" or entry["id"] == int(target))]
+        queue["entries"] = [entry for entry in queue["entries"] if entry not in mine]
+    if not mine:
+        return create_info_block("Nothing to Cancel", "You have no matching waitlist entries.")
+    ids = ", ".join(f"#{entry['id']}" for entry in mine)
+    return create_success_block("Left the Waitlist", f"Cancelled {ids}.")
+
+
+def handle_queue(args: List[str], user_id: str, user_name: str) -> List[Dict[str, Any]]:
+    """
+    Handle waitlist commands.
+
+    `/gpu queue` lists the waitlist, `/gpu queue cancel [#id|all]` leaves
+    it, and `/gpu queue <id|any> <purpose> [duration]` joins it. If the
+    requested GPU is free right now it is claimed immediately instead.
+
+    Args:
+        args: Command arguments
+        user_id: Slack user ID
+        user_name: Slack user name
+
+    Returns:
+        List of Slack block elements for the response
+    """
+    try:
+        if not args:
+            return _list_queue()
+        if args[0].lower() == "cancel":
+            return _cancel(args[1:], user_id)
+
+        target = args[0].strip()
+        if target.lower() == ANY_GPU:
+            target = ANY_GPU
+        purpose, duration_str, _ = parse_purpose_and_duration(args[1:])
+
+        with waitlist_transaction() as (queue, status):
+            if target != ANY_GPU and not validate_gpu_id(target, status):
+                available_gpus = ", ".join(f"`{k}`" for k in sorted(status.keys(), key=gpu_sort_key))
+                return create_error_block(
+                    "GPU Not Found",
+                    f"GPU `{target}` does not exist.\n*Available GPUs:* {available_gpus}"
+                )
+            if target != ANY_GPU and status[target].get('user_id') == user_id:
+                return create_info_block("Already Yours", f"You already hold GPU `{target}`.")
+            for entry in queue["entries"]:
+                if entry["user_id"] == user_id and entry["gpu_id"] == target:
+                    return create_info_block("Already Queued", f"You are already waiting for this GPU (entry #{entry['id']}).")
+
+            candidates = [target] if target != ANY_GPU else sorted(status.keys(), key=gpu_sort_key)
+            free = next((gpu_id for gpu_id in candidates if status[gpu_id].get('status') == 'available'), None)
+            if free is not None:
+                record = claim_record({"user_id": user_id, "user_name": user_name,
+                                       "purpose": purpose, "duration": duration_str})
+                status[free] = record
+            else:
+                entry = enqueue(queue, user_id, user_name, target, purpose, duration_str)
+                position = len(queue["entries"])
+    except Exception as e:
+        logger.error(f"Waitlist command failed: {e}", exc_info=True)
+        return create_error_block(
+            "System Error",
+            "Failed to update the waitlist. Please try again later."
+        )
+
+    if free is not None:
+        logger.info(f"GPU {free} was free; claimed directly for {user_name} ({user_id})")
+        return create_success_block(
+            f"GPU {free} Was Free - Claimed!",
+            f"No need to wait: GPU `{free}` is yours for {duration_str}.\n📝 *Purpose:* `{purpose}`\n"
+            f"💡 _Remember to use `/gpu release {free}` when you're done!_",
+            emoji="🎉"
+        )
+
+    logger.info(f"{user_name} ({user_id}) queued for {target} as entry #{entry['id']}")
+    what = "the next free GPU" if target == ANY_GPU else f"GPU `{target}`"
+    return create_success_block(
+        "Added to the Waitlist",
+        f"You are #{position} on the waitlist for {what} (entry #{entry['id']}).\n"
+        "You'll get a direct message when it's handed to you.",
+        emoji="📋"
+    )
@@ -1,20 +1,118 @@
 """Handler for real-time GPU performance monitoring."""
-import subprocess
 import logging
 from datetime import datetime
-from typing import List, Dict, Any
-from config import INDIA_TZ
-from utils.slack_blocks import create_error_block
+from typing import List, Dict, Any, Optional, Tuple
+from config import INDIA_TZ, REALTIME_PAGE_SIZE
+from utils.gpu_sampler import get_sampler
+from utils.slack_blocks import create_error_block, create_page_footer, paginate, parse_page_args
+from utils.telemetry import GpuSample, TelemetrySnapshot
 
 logger = logging.getLogger(__name__)
 
 
+def format_number(value: Optional[float]) -> str:
+    """Format a telemetry value the way nvidia-smi prints it."""
+    if value is None:
+        return "N/A"
+    return f"{value:g}"
+
+
+def gpu_load_status(gpu: GpuSample) -> Tuple[str, str]:
+    """
+    Classify a GPU's load for display.
+    
+    Args:
+        gpu: Telemetry sample for the GPU
+        
+    Returns:
+        Tuple[str, str]: (emoji, label) such as ("🔥", "High Load")
+    """
+    if gpu.utilization is None or gpu.temperature is None:
+        return "⚡", "Active"
+    if gpu.utilization > 80 or gpu.temperature > 80:
+        return "🔥", "High Load"
+    if gpu.utilization > 0:
+        return "⚡", "Active"
+    return "💤", "Idle"
+
+
+def format_age(seconds: float) -> str:
+    """Describe how old a snapshot is."""
+    if seconds < 1:
+        return "just now"
+    if seconds < 60:
+        return f"{int(seconds)}s ago"
+    return f"{int(seconds // 60)}m ago"
+
+
+def _gpu_blocks(gpu: GpuSample, snapshot: TelemetrySnapshot) -> List[Dict[str, Any]]:
+    """Build the Block Kit elements for one GPU."""
+    # Calculate memory percentage
+    if gpu.memory_used is not None and gpu.memory_total:
+        mem_percent_str = f"{gpu.memory_used / gpu.memory_total * 100:.1f}%"
+    else:
+        mem_percent_str = "N/A"
+    
+    status_emoji, status_text = gpu_load_status(gpu)
+    
+    temp = format_number(gpu.temperature)
+    util = format_number(gpu.utilization)
+    mem_used = format_number(gpu.memory_used)
+    mem_total = format_number(gpu.memory_total)
+    blocks = [
+        {"type": "divider"},
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"{status_emoji} *GPU {gpu.index}: {gpu.name}*\nStatus: {status_text}"
+            }
+        },
+        {
+            "type": "section",
+            "fields": [
+                {"type": "mrkdwn", "text": f"🌡️ *Temperature:*\n{temp}°C"},
+                {"type": "mrkdwn", "text": f"⚡ *GPU Utilization:*\n{util}%"},
+                {"type": "mrkdwn", "text": f"💾 *Memory Usage:*\n{mem_used}MiB / {mem_total}MiB"},
+                {"type": "mrkdwn", "text": f"📊 *Memory %:*\n{mem_percent_str}"}
+            ]
+        }
+    ]
+    
+    process_list = snapshot.processes_for(gpu.uuid)
+    if process_list:
+        process_text = "\n".join([
+            f"• `{p.name}` (PID: {p.pid}) - {format_number(p.used_memory)}MiB"
+            for p in process_list
+        ])
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"🔄 *Active Processes ({len(process_list)}):*\n{process_text}"
+            }
+        })
+    else:
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "🔄 *Active Processes:*\nNo processes running"
+            }
+        })
+    return blocks
+
+
 def handle_realtime_status(args: List[str], user_id: str, user_name: str) -> List[Dict[str, Any]]:
     """
-    Handle real-time GPU status command using nvidia-smi.
+    Handle real-time GPU status command.
+    
+    Renders the latest snapshot from the background telemetry sampler, so
+    the request never waits on nvidia-smi unless no recent snapshot exists.
+    Large hosts are split into pages (`/gpu realtime page 2`).
     
     Args:
-        args: Command arguments (unused)
+        args: Optional `page N`
         user_id: Slack user ID
         user_name: Slack user name
         
@@ -22,185 +120,40 @@ def handle_realtime_status(args: List[str], user_id: str, user_name: str) -> Lis
         List of Slack block elements for the response
     """
     try:
-        # Query GPU information
-        gpu_query = "index,name,temperature.gpu,utilization.gpu,memory.used,memory.total,uuid"
-        gpu_cmd = [
-            "nvidia-smi",
-            f"--query-gpu={gpu_query}",
-            "--format=csv,noheader,nounits"
-        ]
+        snapshot = get_sampler().latest()
         
-        gpu_result = subprocess.run(
-            gpu_cmd,
-            capture_output=True,
-            text=True,
-            check=True,
-            timeout=10  # 10 second timeout
-        )
+        if snapshot.error is not None:
+            return create_error_block(snapshot.error.title, snapshot.error.message)
         
-        if not gpu_result.stdout.strip():
-            logger.warning("nvidia-smi returned empty output")
+        if not snapshot.gpus:
+            logger.warning("nvidia-smi returned no GPU data")
             return create_error_block(
                 "No GPU Data",
                 "No GPU information was returned. Please check your NVIDIA drivers."
             )
-        
-        gpus = [line.split(", ") for line in gpu_result.stdout.strip().split('\n') if line.strip()]
 
-        # Query process information
-        process_query = "gpu_uuid,pid,process_name,used_gpu_memory"
-        process_cmd = [
-            "nvidia-smi",
-            f"--query-compute-apps={process_query}",
-            "--format=csv,noheader,nounits"
-        ]
-        
-        processes_by_gpu = {}
-        try:
-            process_result = subprocess.run(
-                process_cmd,
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=10
-            )
-            
-            if process_result.stdout.strip():
-                for line in process_result.stdout.strip().split('\n'):
-                    if line.strip():
-                        parts = line.split(", ")
-                        if len(parts) >= 4:
-                            uuid, pid, name, mem = parts[0], parts[1], parts[2], parts[3]
-                            if uuid not in processes_by_gpu:
-                                processes_by_gpu[uuid] = []
-                            processes_by_gpu[uuid].append({
-                                "pid": pid.strip(),
-                                "name": name.strip(),
-                                "mem": mem.strip()
-                            })
-        except subprocess.CalledProcessError:
-            # No processes running is not an error
-            logger.debug("No GPU processes found or query failed")
-        except Exception as e:
-            logger.warning(f"Error querying GPU processes: {e}")
-
-        current_time = datetime.now(INDIA_TZ).strftime('%I:%M %p IST, %B %d')
+        sampled_at = datetime.fromtimestamp(snapshot.taken_at, INDIA_TZ).strftime('%I:%M:%S %p IST, %B %d')
         blocks = [
             {"type": "header", "text": {"type": "plain_text", "text": "🚀 GPU Real-Time Status Dashboard"}},
-            {"type": "context", "elements": [{"type": "mrkdwn", "text": f"📅 Last updated: {current_time}"}]}
+            {
+                "type": "context",
+                "elements": [{"type": "mrkdwn", "text": f"📅 Last updated: {sampled_at} ({format_age(snapshot.age)})"}]
+            }
         ]
 
-        if not gpus:
-            return blocks + [
-                {"type": "section", "text": {"type": "mrkdwn", "text": "⚠️ *No NVIDIA GPUs detected*"}}
-            ]
-
-        for gpu_data in gpus:
-            if len(gpu_data) < 7:
-                logger.warning(f"Invalid GPU data format: {gpu_data}")
-                continue
-                
-            index, name, temp, util, mem_used, mem_total, uuid = (
-                gpu_data[0].strip(),
-                gpu_data[1].strip(),
-                gpu_data[2].strip(),
-                gpu_data[3].strip(),
-                gpu_data[4].strip(),
-                gpu_data[5].strip(),
-                gpu_data[6].strip()
-            )
-            
-            # Calculate memory percentage
-            try:
-                mem_used_float = float(mem_used)
-                mem_total_float = float(mem_total)
-                mem_percent = (mem_used_float / mem_total_float * 100) if mem_total_float > 0 else 0
-                mem_percent_str = f"{mem_percent:.1f}%"
-            except (ValueError, ZeroDivisionError):
-                mem_percent_str = "N/A"
-            
-            # Determine status emoji
-            try:
-                util_int = int(util)
-                temp_int = int(temp)
-                if util_int > 80 or temp_int > 80:
-                    status_emoji = "🔥"
-                    status_text = "High Load"
-                elif util_int > 0:
-                    status_emoji = "⚡"
-                    status_text = "Active"
-                else:
-                    status_emoji = "💤"
-                    status_text = "Idle"
-            except ValueError:
-                status_emoji = "⚡"
-                status_text = "Active"
-            
-            blocks.extend([
-                {"type": "divider"},
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"{status_emoji} *GPU {index}: {name}*\nStatus: {status_text}"
-                    }
-                },
-                {
-                    "type": "section",
-                    "fields": [
-                        {"type": "mrkdwn", "text": f"🌡️ *Temperature:*\n{temp}°C"},
-                        {"type": "mrkdwn", "text": f"⚡ *GPU Utilization:*\n{util}%"},
-                        {"type": "mrkdwn", "text": f"💾 *Memory Usage:*\n{mem_used}MiB / {mem_total}MiB"},
-                        {"type": "mrkdwn", "text": f"📊 *Memory %:*\n{mem_percent_str}"}
-                    ]
-                }
-            ])
-            
-            process_list = processes_by_gpu.get(uuid)
-            if process_list:
-                process_text = "\n".join([
-                    f"• `{p['name']}` (PID: {p['pid']}) - {p['mem']}MiB"
-                    for p in process_list
-                ])
-                blocks.append({
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"🔄 *Active Processes ({len(process_list)}):*\n{process_text}"
-                    }
-                })
-            else:
-                blocks.append({
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": "🔄 *Active Processes:*\nNo processes running"
-                    }
-                })
+        page, _ = parse_page_args(args)
+        page_gpus, page, pages = paginate(snapshot.gpus, page, REALTIME_PAGE_SIZE)
+        for gpu in page_gpus:
+            blocks.extend(_gpu_blocks(gpu, snapshot))
         
+        footer = create_page_footer(page, pages, "/gpu realtime")
+        if footer is not None:
+            blocks.append(footer)
         return blocks
         
-    except FileNotFoundError:
-        logger.error("nvidia-smi command not found")
-        return create_error_block(
-            "NVIDIA Driver Error",
-            "The `nvidia-smi` command was not found. Please ensure NVIDIA drivers are installed."
-        )
-    except subprocess.TimeoutExpired:
-        logger.error("nvidia-smi command timed out")
-        return create_error_block(
-            "Timeout Error",
-            "The GPU query timed out. Please try again later."
-        )
-    except subprocess.CalledProcessError as e:
-        logger.error(f"nvidia-smi command failed: {e.stderr}")
-        return create_error_block(
-            "NVIDIA Driver Error",
-            f"The `nvidia-smi` command failed to execute.\n*Error:* {e.stderr[:200] if e.stderr else 'Unknown error'}"
-        )
     except Exception as e:
         logger.error(f"Unexpected error in realtime handler: {e}")
         return create_error_block(
             "Unexpected Error",
             f"An unexpected error occurred: {str(e)}"
-        )
\ No newline at end of file
+        )
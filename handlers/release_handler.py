@@ -1,81 +1,160 @@
 """Handler for GPU release commands."""
 import logging
-from typing import List, Dict, Any
-from utils.status_manager import get_status, save_status, validate_gpu_id
+from typing import List, Dict, Any, Optional, Tuple
+from utils.allocator import parse_gpu_selector
+from utils.shares import gpu_claims, release_user
+from utils.status_manager import get_status, get_user_gpus, validate_gpu_id, gpu_sort_key
 from utils.slack_blocks import create_error_block, create_info_block
+from utils.waitlist import hand_off, notify_hand_offs, release_transaction
 
 logger = logging.getLogger(__name__)
 
 
+def resolve_selector(selector: str, user_id: str) -> Tuple[List[str], Optional[List[Dict[str, Any]]]]:
+    """
+    Expand a selector into the GPU IDs to lock, from a lock-free snapshot.
+
+    "all" means every GPU the user holds, according to the per-user index.
+    Otherwise the selector is a single ID, a range ("0-3") or a list
+    ("0,2,5"), and unknown GPUs are reported as an error.
+
+    Args:
+        selector: "all" or a GPU selector
+        user_id: Slack user ID
+
+    Returns:
+        Tuple of (GPU IDs, error blocks or None)
+    """
+    if selector.lower() == "all":
+        return get_user_gpus(user_id), None
+    try:
+        gpu_ids = parse_gpu_selector(selector)
+    except ValueError:
+        gpu_ids = [selector]
+    status = get_status()
+    missing = [gpu_id for gpu_id in gpu_ids if not validate_gpu_id(gpu_id, status)]
+    if missing:
+        available_gpus = ", ".join(f"`{k}`" for k in sorted(status.keys(), key=gpu_sort_key))
+        return [], create_error_block(
+            "GPU Not Found",
+            f"GPU(s) {', '.join(f'`{gpu_id}`' for gpu_id in missing)} do not exist in the system.\n"
+            f"*Available GPUs:* {available_gpus}"
+        )
+    return gpu_ids, None
+
+
+def select_own_gpus(gpu_ids: List[str], user_id: str, status: Dict[str, Any],
+                    select_all: bool = False) -> Tuple[List[str], Optional[List[Dict[str, Any]]]]:
+    """
+    Check the locked records of resolve_selector()'s GPUs for ownership.
+
+    For "all", GPUs the user no longer holds are dropped. Otherwise the
+    selection is rejected as a whole if any GPU is held by someone else,
+    and GPUs that are already available are skipped. A shared GPU counts
+    as the user's if they hold one of its shares.
+
+    Args:
+        gpu_ids: GPU IDs from resolve_selector()
+        user_id: Slack user ID
+        status: Locked records of `gpu_ids`
+        select_all: Whether the selector was "all"
+
+    Returns:
+        Tuple of (GPU IDs held by the user, error blocks or None)
+    """
+    held = {gpu_id: gpu_claims(status.get(gpu_id, {})) for gpu_id in gpu_ids}
+    own = [gpu_id for gpu_id, claims in held.items() if any(c.get('user_id') == user_id for c in claims)]
+    others = [gpu_id for gpu_id, claims in held.items() if claims and gpu_id not in own]
+    if select_all:
+        # The index is a hint; ownership is confirmed against the locked records
+        return own, None
+    if others:
+        holders = ", ".join(
+            f"`{gpu_id}` ({', '.join(dict.fromkeys(c.get('user_name', 'Unknown') for c in held[gpu_id]))})"
+            for gpu_id in others
+        )
+        return [], create_error_block(
+            "Permission Denied",
+            f"You cannot change GPU(s) claimed by someone else: {holders}. No GPUs were changed."
+        )
+    return own, None
+
+
 def handle_release(args: List[str], user_id: str, user_name: str) -> List[Dict[str, Any]]:
     """
     Handle GPU release command.
-    
+
+    Accepts a single GPU ("0"), a range ("0-3"), a list ("0,2,5") or
+    "all". Every selected GPU is released in one transaction that locks
+    only those GPUs; on shared GPUs only the caller's shares end. If
+    someone is on the waitlist for a released GPU, it is handed to them in
+    the same transaction.
+
     Args:
-        args: Command arguments [gpu_id]
+        args: Command arguments [gpu_selector | "all"]
         user_id: Slack user ID
         user_name: Slack user name
-        
+
     Returns:
         List of Slack block elements for the response
     """
     if len(args) < 1:
         return create_error_block(
             "Invalid Command Format",
-            "Please use: `/gpu release <number>`\n\n*Example:* `/gpu release 0`"
-        )
-
-    gpu_id = args[0].strip()
-    
-    try:
-        status = get_status()
-    except Exception as e:
-        logger.error(f"Failed to get status: {e}")
-        return create_error_block(
-            "System Error",
-            "Failed to retrieve GPU status. Please try again later."
+            "Please use: `/gpu release <number>`\n\n*Example:* `/gpu release 0`\n"
+            "Multiple GPUs: `/gpu release 0-3`, `/gpu release 0,2,5` or `/gpu release all`"
         )
 
-    if not validate_gpu_id(gpu_id, status):
-        available_gpus = ", ".join(f"`{k}`" for k in sorted(status.keys(), key=int))
-        return create_error_block(
-            "GPU Not Found",
-            f"GPU `{gpu_id}` does not exist in the system.\n*Available GPUs:* {available_gpus}"
-        )
-    
-    if status[gpu_id]['status'] == 'available':
-        return create_info_block(
-            "GPU Already Available",
-            f"GPU `{gpu_id}` is already available. No action needed!"
-        )
-    
-    current_user_id = status[gpu_id].get('user_id')
-    current_user_name = status[gpu_id].get('user_name', 'Unknown')
-    
-    if current_user_id != user_id:
-        return create_error_block(
-            "Permission Denied",
-            f"You cannot release GPU `{gpu_id}`. It was claimed by *{current_user_name}*."
-        )
+    selector = args[0].strip()
+    select_all = selector.lower() == "all"
 
-    status[gpu_id] = {"status": "available"}
-    
     try:
-        save_status(status)
-        logger.info(f"GPU {gpu_id} released by {user_name} ({user_id})")
+        gpu_ids, error = resolve_selector(selector, user_id)
+        if error is not None:
+            return error
+        with release_transaction(gpu_ids) as (queue, status):
+            gpu_ids, error = select_own_gpus(gpu_ids, user_id, status, select_all)
+            if error is not None:
+                return error
+            if not gpu_ids:
+                if select_all:
+                    return create_info_block("No GPUs to Release", "You don't have any GPUs claimed right now.")
+                return create_info_block(
+                    "GPU Already Available",
+                    f"GPU `{selector}` is already available. No action needed!"
+                )
+
+            for gpu_id in gpu_ids:
+                status[gpu_id] = release_user(status[gpu_id], user_id)
+            hand_offs = hand_off(queue, status, gpu_ids)
+        logger.info(f"GPUs {gpu_ids} released by {user_name} ({user_id})")
     except Exception as e:
-        logger.error(f"Failed to save status: {e}")
+        logger.error(f"Failed to release GPU {selector}: {e}")
         return create_error_block(
             "System Error",
             "Failed to save GPU release. Please try again later."
         )
-    
-    return [
+
+    notify_hand_offs(hand_offs)
+    if len(gpu_ids) == 1:
+        title = f"GPU {gpu_ids[0]} Successfully Released by {user_name}!"
+    else:
+        title = f"{len(gpu_ids)} GPUs Successfully Released by {user_name}!"
+    blocks = [
         {
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": f"✅ *GPU {gpu_id} Successfully Released by {user_name}!*\nThank you for freeing it up! 🙏"
+                "text": f"✅ *{title}*\nThank you for freeing {'it' if len(gpu_ids) == 1 else 'them'} up! 🙏"
             }
         }
     ]
+    if len(gpu_ids) > 1:
+        blocks[0]["text"]["text"] += "\n🎯 *GPUs:* " + ", ".join(f"`{gpu_id}`" for gpu_id in gpu_ids)
+    if hand_offs:
+        names = ", ".join(dict.fromkeys(f"*{h['entry']['user_name']}*" for h in hand_offs))
+        blocks.append({
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": f"📋 Handed to {names} from the waitlist"}]
+        })
+    return blocks
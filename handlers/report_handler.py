@@ -0,0 +1,96 @@
+"""Handler for GPU-hour usage reports."""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Tuple
+from config import INDIA_TZ, USAGE_REPORT_TOP
+from utils.slack_blocks import create_error_block, create_info_block
+from utils.status_manager import get_status
+from utils.usage import NUMPY_AVAILABLE, concat_columns, get_usage_log, open_intervals, summarize, to_columns
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = {"week": timedelta(days=7), "month": timedelta(days=30)}
+
+
+def parse_user_arg(word: str) -> str:
+    """
+    Normalize a user argument to a user ID or name.
+
+    Accepts escaped mentions ("<@U123|alice>"), "@alice" or a plain name.
+    """
+    if word.startswith("<@") and word.endswith(">"):
+        return word[2:-1].split("|")[0]
+    return word.lstrip("@")
+
+
+def _format_rows(rows: List[Tuple[str, float, float]], weighted: bool) -> str:
+    """Format (label, hours, weighted hours) rows as a bulleted list."""
+    lines = []
+    for label, hours, weighted_hours in rows[:USAGE_REPORT_TOP]:
+        line = f"• *{label}* · {hours:.1f} GPU-h"
+        if weighted:
+            line += f" · {weighted_hours:.1f} util-weighted"
+        lines.append(line)
+    if len(rows) > USAGE_REPORT_TOP:
+        lines.append(f"_…and {len(rows) - USAGE_REPORT_TOP} more_")
+    return "\n".join(lines)
+
+
+def handle_report(args: List[str], user_id: str, user_name: str) -> List[Dict[str, Any]]:
+    """
+    Handle the GPU-hour usage report command.
+
+    Sums finished and still-running claims over the last 7 (week) or 30
+    (month) days, per user and per purpose. Utilization-weighted hours are
+    shown when utilization samples cover the window.
+
+    Args:
+        args: Command arguments [week|month] [user]; "me" selects the caller
+        user_id: Slack user ID
+        user_name: Slack user name
+
+    Returns:
+        List of Slack block elements for the response
+    """
+    window = "week"
+    if args and args[0].lower() in WINDOWS:
+        window = args[0].lower()
+        args = args[1:]
+    user = None
+    if args:
+        user = user_id if args[0].lower() == "me" else parse_user_arg(args[0])
+
+    if not NUMPY_AVAILABLE:
+        return create_error_block("Reports Unavailable", "Usage reports need NumPy: `pip install numpy`")
+
+    now = datetime.now(timezone.utc)
+    start = now - WINDOWS[window]
+    try:
+        log = get_usage_log()
+        columns = concat_columns(log.columns(), to_columns(open_intervals(get_status(), now)))
+        report = summarize(columns, start.timestamp(), now.timestamp(), log.sample_index(), user)
+    except Exception as e:
+        logger.error(f"Failed to build usage report: {e}", exc_info=True)
+        return create_error_block("System Error", "Failed to build the usage report. Please try again later.")
+
+    who = f" for {report.by_user[0][0] if report.by_user else user}" if user else ""
+    if report.hours == 0:
+        return create_info_block("No Usage", f"No GPU time was recorded{who} in the last {window}.")
+
+    weighted = report.measured_hours > 0
+    since = start.astimezone(INDIA_TZ).strftime('%d %b')
+    summary = f"📈 *GPU Usage{who} · last {window}* (since {since})\n*Total:* {report.hours:.1f} GPU-h"
+    if weighted:
+        summary += (f" · {report.weighted_hours:.1f} util-weighted "
+                    f"over the {report.measured_hours / report.hours:.0%} of hours with telemetry")
+    blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": summary}}]
+    if not user:
+        blocks.append({"type": "section", "text": {"type": "mrkdwn",
+                                                   "text": "👤 *By User*\n" + _format_rows(report.by_user, weighted)}})
+    blocks.append({"type": "section", "text": {"type": "mrkdwn",
+                                               "text": "📁 *By Project*\n" + _format_rows(report.by_project, weighted)}})
+    blocks.append({
+        "type": "context",
+        "elements": [{"type": "mrkdwn", "text": "💡 _Export the full history with `python -m utils.usage export usage.csv`_"}]
+    })
+    return blocks
@@ -0,0 +1,147 @@
+"""Handler for future GPU reservations."""
+import re
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any
+from config import INDIA_TZ, RESERVATION_HORIZON_DAYS, RESERVATION_MAX_HOURS
+from utils.reservations import get_reservation_book
+from utils.slack_blocks import create_error_block, create_info_block, create_success_block
+from utils.status_manager import get_status, gpu_sort_key, validate_gpu_id
+from utils.time_parser import parse_duration, parse_start_time
+
+logger = logging.getLogger(__name__)
+
+# Bookings shown by `/gpu reserve`
+_MAX_LISTED = 25
+
+USAGE = (
+    "Please use: `/gpu reserve <id|any> [today|tomorrow|YYYY-MM-DD] <HH:MM> <duration> <purpose>`\n\n"
+    "*Example:* `/gpu reserve 2 tomorrow 09:00 6h eval`"
+)
+
+
+def format_local(value: str, fmt: str = '%a %d %b, %I:%M %p') -> str:
+    """Format a stored UTC ISO time in the bot's timezone."""
+    return datetime.fromisoformat(value).astimezone(INDIA_TZ).strftime(fmt)
+
+
+def format_booking(booking: Dict[str, Any]) -> str:
+    """One-line description of a booking."""
+    return (f"GPU {booking['gpu_id']} · {format_local(booking['start'])} → {format_local(booking['end'], '%I:%M %p')} · "
+            f"*{booking['user_name']}* · `{booking['purpose']}` · #{booking['id']}")
+
+
+def _list_reservations() -> List[Dict[str, Any]]:
+    """Show upcoming and active bookings, soonest first."""
+    index = get_reservation_book().index()
+    bookings = index.upcoming(datetime.now(timezone.utc), _MAX_LISTED)
+    if not bookings:
+        return create_info_block("No Reservations", f"Nothing is booked.\n{USAGE}")
+    text = "\n".join(f"• {format_booking(booking)}" for booking in bookings)
+    if len(index) > len(bookings):
+        text += f"\n_...{len(index) - len(bookings)} more not shown_"
+    return [
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"📅 *Upcoming Reservations*\n{text}"}},
+        {
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": "💡 Use `/gpu reserve cancel #id` to cancel one of yours"}]
+        }
+    ]
+
+
+def _cancel(args: List[str], user_id: str) -> List[Dict[str, Any]]:
+    """Cancel one of the user's bookings."""
+    target = args[0].lstrip('#') if args else ""
+    if not target.isdigit():
+        return create_error_block("Invalid Command Format", "Please use: `/gpu reserve cancel #id`")
+    with get_reservation_book().transaction() as index:
+        booking = index.get(int(target))
+        if booking is None:
+            return create_error_block("Reservation Not Found", f"There is no reservation #{target}.")
+        if booking["user_id"] != user_id:
+            return create_error_block("Permission Denied", f"Reservation #{target} belongs to *{booking['user_name']}*.")
+        index.remove(booking["id"])
+    return create_success_block("Reservation Cancelled", format_booking(booking))
+
+
+def handle_reserve(args: List[str], user_id: str, user_name: str) -> List[Dict[str, Any]]:
+    """
+    Handle reservation commands.
+
+    `/gpu reserve` lists upcoming bookings, `/gpu reserve cancel #id`
+    cancels one, and `/gpu reserve <id|any> <when> <duration> <purpose>`
+    books a GPU ahead of time. The scheduler turns a booking into a claim
+    when its slot starts.
+
+    Args:
+        args: Command arguments
+        user_id: Slack user ID
+        user_name: Slack user name
+
+    Returns:
+        List of Slack block elements for the response
+    """
+    try:
+        if not args:
+            return _list_reservations()
+        if args[0].lower() == "cancel":
+            return _cancel(args[1:], user_id)
+    except Exception as e:
+        logger.error(f"Reservation command failed: {e}", exc_info=True)
+        return create_error_block("System Error", "Failed to read reservations. Please try again later.")
+
+    now = datetime.now(timezone.utc)
+    try:
+        start, used = parse_start_time(args[1:], now, INDIA_TZ)
+    except ValueError:
+        return create_error_block("Invalid Command Format", USAGE)
+    rest = args[1 + used:]
+    if not rest or not re.match(r'^\d+[hm]$', rest[0].lower()):
+        return create_error_block("Invalid Command Format", USAGE)
+    duration_str = rest[0].lower()
+    minutes = int(duration_str[:-1]) * (60 if duration_str.endswith('h') else 1)
+    if not 30 <= minutes <= RESERVATION_MAX_HOURS * 60:
+        return create_error_block("Invalid Duration", f"Reservations must last between 30m and {RESERVATION_MAX_HOURS}h.")
+    duration = parse_duration(duration_str, max_hours=RESERVATION_MAX_HOURS)
+    purpose = " ".join(rest[1:]) or "No purpose specified"
+    end = start + duration
+
+    if start < now - timedelta(minutes=1):
+        return create_error_block("Time in the Past", f"{format_local(start.isoformat())} has already passed.")
+    if start > now + timedelta(days=RESERVATION_HORIZON_DAYS):
+        return create_error_block("Too Far Ahead", f"GPUs can be booked at most {RESERVATION_HORIZON_DAYS} days ahead.")
+
+    try:
+        status = get_status()
+        target = args[0].strip()
+        if target.lower() == "any":
+            candidates = sorted(status.keys(), key=gpu_sort_key)
+        elif validate_gpu_id(target, status):
+            candidates = [target]
+        else:
+            available_gpus = ", ".join(f"`{k}`" for k in sorted(status.keys(), key=gpu_sort_key))
+            return create_error_block("GPU Not Found", f"GPU `{target}` does not exist.\n*Available GPUs:* {available_gpus}")
+
+        with get_reservation_book().transaction() as index:
+            gpu_id = next((g for g in candidates if index.conflict(g, start, end) is None), None)
+            if gpu_id is None:
+                # Suggest the earliest slot of the same length on any candidate
+                slot, slot_gpu = min((index.first_free_slot(g, start, duration), g) for g in candidates)
+                conflict = index.conflict(candidates[0], start, end)
+                taken = f" by *{conflict['user_name']}*" if len(candidates) == 1 else ""
+                return create_error_block(
+                    "Slot Already Booked",
+                    f"That slot is already reserved{taken}.\n"
+                    f"First free {duration_str} slot: GPU `{slot_gpu}` at {format_local(slot.isoformat())}"
+                )
+            booking = index.add(gpu_id, user_id, user_name, purpose, start, end)
+    except Exception as e:
+        logger.error(f"Failed to save reservation: {e}", exc_info=True)
+        return create_error_block("System Error", "Failed to save the reservation. Please try again later.")
+
+    logger.info(f"Reservation #{booking['id']} on GPU {gpu_id} by {user_name} ({user_id}) from {booking['start']}")
+    return create_success_block(
+        "GPU Reserved",
+        f"{format_booking(booking)}\nIt will be claimed for you automatically when the slot starts.",
+        emoji="📅"
+    )
@@ -1,61 +1,198 @@
 """Handler for GPU status display commands."""
+import time
 import logging
 from datetime import datetime, timezone
-from typing import List, Dict, Any
-from config import INDIA_TZ, TOTAL_GPUS
-from utils.status_manager import get_status, save_status
+from functools import lru_cache
+from itertools import groupby
+from typing import List, Dict, Any, Optional
+from config import INDIA_TZ, LIVE_BOARD_MAX_SECTIONS, LIVE_BOARD_UTIL_STEP, STATUS_PAGE_SIZE
+from utils.reservations import get_reservation_book
+from utils.shares import SHARED, format_memory, reserved_mb, share_summary
+from utils.slack_blocks import create_page_footer, paginate, parse_page_args
+from utils.status_manager import get_status, gpu_sort_key
+from utils.telemetry import TelemetrySnapshot
 
 logger = logging.getLogger(__name__)
 
+# Section text is limited to 3000 characters by Slack
+_MAX_SECTION_TEXT = 2900
 
-def _check_and_expire_claims(status: Dict[str, Any]) -> Dict[str, Any]:
+VIEWS = ("all", "free", "used")
+
+# Upcoming reservations listed under the dashboard
+_UPCOMING_SHOWN = 5
+
+
+@lru_cache(maxsize=4096)
+def _available_section(gpu_id: str) -> Dict[str, Any]:
+    """Build the section for an available GPU (memoized; treat as read-only)."""
+    return {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": f"✅ *GPU {gpu_id}*\nStatus: Available for use"
+        }
+    }
+
+
+@lru_cache(maxsize=4096)
+def _in_use_section(gpu_id: str, user_name: str, purpose: str,
+                    release_time: Optional[str], minute: int) -> Dict[str, Any]:
+    """
+    Build the section for a claimed GPU.
+
+    Memoized on the fields it displays plus the current minute, since the
+    remaining time only changes once a minute. The returned dict is shared
+    between responses and must be treated as read-only.
+    """
+    try:
+        release_time_str = "Unknown"
+        remaining_str = ""
+
+        if release_time is not None:
+            utc_time = datetime.fromisoformat(release_time).replace(tzinfo=timezone.utc)
+            ist_time = utc_time.astimezone(INDIA_TZ)
+            release_time_str = ist_time.strftime('%I:%M %p IST')
+
+            # Calculate remaining time from the start of the minute bucket
+            now = datetime.fromtimestamp(minute * 60, timezone.utc)
+            remaining = utc_time - now
+            if remaining.total_seconds() > 0:
+                hours = int(remaining.total_seconds() // 3600)
+                minutes = int((remaining.total_seconds() % 3600) // 60)
+                if hours > 0:
+                    remaining_str = f"⏳ {hours}h {minutes}m remaining"
+                else:
+                    remaining_str = f"⏳ {minutes}m remaining"
+            else:
+                remaining_str = "⏳ Expired"
+
+        return {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"🔴 *GPU {gpu_id} - In Use*\n👤 User: {user_name}\n📝 Purpose: `{purpose}`\n⏰ Until: ~{release_time_str}\n{remaining_str}"
+            }
+        }
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Error formatting GPU {gpu_id} status: {e}")
+        return {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"⚠️ *GPU {gpu_id}*\nStatus: In use (details unavailable)"
+            }
+        }
+
+
+def _shared_section(gpu_id: str, info: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the section for a GPU split into fractional claims."""
+    lines = []
+    for share in info.get('shares', ()):
+        line = (f"👤 {share.get('user_name', 'Unknown')} · {format_memory(share.get('memory_mb', 0))} · "
+                f"`{share.get('purpose', 'No purpose specified')}`")
+        try:
+            until = datetime.fromisoformat(share['release_time']).replace(tzinfo=timezone.utc)
+            line += f" · until ~{until.astimezone(INDIA_TZ).strftime('%I:%M %p IST')}"
+        except (KeyError, TypeError, ValueError):
+            pass
+        lines.append(line)
+    header = (f"🟡 *GPU {gpu_id} - Shared* ({format_memory(reserved_mb(info))} of "
+              f"{format_memory(info.get('memory_total_mb', 0))} reserved)")
+    return {"type": "section", "text": {"type": "mrkdwn", "text": "\n".join([header] + lines)}}
+
+
+def _gpu_section(gpu_id: str, info: Dict[str, Any], minute: int) -> Dict[str, Any]:
+    """Return the (memoized) section for one GPU record."""
+    if info.get('status') == 'available':
+        return _available_section(gpu_id)
+    if info.get('status') == SHARED:
+        return _shared_section(gpu_id, info)
+    return _in_use_section(
+        gpu_id,
+        info.get('user_name', 'Unknown'),
+        info.get('purpose', 'No purpose specified'),
+        info.get('release_time'),
+        minute
+    )
+
+
+def format_id_ranges(gpu_ids: List[str]) -> List[str]:
     """
-    Check for expired claims and automatically release them.
-    
+    Compress sorted GPU IDs into one line of index ranges per node.
+
     Args:
-        status: Current status dictionary
-        
+        gpu_ids: GPU IDs sorted with gpu_sort_key
+
     Returns:
-        Updated status dictionary with expired claims released
+        List[str]: Lines such as "0-3, 6" or "*nodeA:* 0-7"
     """
-    now = datetime.now(timezone.utc)
-    updated = False
-    
-    for gpu_id, info in status.items():
-        if info.get('status') == 'in_use' and 'release_time' in info:
-            try:
-                release_time = datetime.fromisoformat(info['release_time']).replace(tzinfo=timezone.utc)
-                if now >= release_time:
-                    logger.info(f"Auto-releasing expired GPU {gpu_id} (claimed by {info.get('user_name', 'Unknown')})")
-                    status[gpu_id] = {"status": "available"}
-                    updated = True
-            except (ValueError, KeyError) as e:
-                logger.warning(f"Error parsing release_time for GPU {gpu_id}: {e}")
-    
-    if updated:
-        try:
-            save_status(status)
-        except Exception as e:
-            logger.error(f"Failed to save auto-released status: {e}")
-    
-    return status
+    lines = []
+    for node, group in groupby((gpu_sort_key(g) for g in gpu_ids), key=lambda k: k[0]):
+        indexes = [index for _, index in group]
+        ranges = []
+        start = prev = indexes[0]
+        for index in indexes[1:] + [None]:
+            if index is not None and index == prev + 1:
+                prev = index
+                continue
+            ranges.append(str(start) if start == prev else f"{start}-{prev}")
+            if index is not None:
+                start = prev = index
+        text = ", ".join(ranges)
+        lines.append(f"*{node}:* {text}" if node else text)
+    return lines
+
+
+def _available_summary(available: List[str]) -> List[Dict[str, Any]]:
+    """Summarize all available GPUs as index ranges instead of one block each."""
+    if not available:
+        return [{
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": "✅ *Available (0)*\nAll GPUs are currently in use"}
+        }]
+    chunks = []
+    text = f"✅ *Available ({len(available)})*"
+    for line in format_id_ranges(available):
+        # Scattered free GPUs can make one line longer than a whole section;
+        # split it starting in a chunk with at least half a section left
+        if len(text) + len(line) + 1 > _MAX_SECTION_TEXT and len(line) > _MAX_SECTION_TEXT // 2 \
+                and len(text) > _MAX_SECTION_TEXT // 2:
+            chunks.append(text)
+            text = ""
+        while len(text) + len(line) + 1 > _MAX_SECTION_TEXT and len(line) > _MAX_SECTION_TEXT // 2:
+            cut = line.rindex(", ", 0, _MAX_SECTION_TEXT - len(text) - 1) + 1
+            chunks.append(f"{text}\n{line[:cut]}" if text else line[:cut])
+            text, line = "", line[cut:].lstrip()
+        if len(text) + len(line) + 1 > _MAX_SECTION_TEXT:
+            chunks.append(text)
+            text = ""
+        text = f"{text}\n{line}" if text else line
+    chunks.append(text)
+    return [{"type": "section", "text": {"type": "mrkdwn", "text": chunk}} for chunk in chunks]
 
 
 def handle_status(args: List[str], user_id: str, user_name: str) -> List[Dict[str, Any]]:
     """
     Handle GPU status display command.
-    
+
+    Small deployments get one section per GPU. When the table does not fit
+    on one page, available GPUs are summarized as index ranges and claimed
+    GPUs are paginated to stay under Slack's block limit.
+
     Args:
-        args: Command arguments (unused)
+        args: Optional view ("free" or "used") and `page N`
         user_id: Slack user ID
         user_name: Slack user name
-        
+
     Returns:
         List of Slack block elements for the response
     """
+    page, rest = parse_page_args(args)
+    view = rest[0].lower() if rest and rest[0].lower() in VIEWS else "all"
+
     try:
         status = get_status()
-        status = _check_and_expire_claims(status)
     except Exception as e:
         logger.error(f"Failed to get status: {e}")
         return [
@@ -67,75 +204,148 @@ def handle_status(args: List[str], user_id: str, user_name: str) -> List[Dict[st
                 }
             }
         ]
-    
+
+    gpu_ids = sorted(status.keys(), key=gpu_sort_key)
+    available = [gpu_id for gpu_id in gpu_ids if status[gpu_id].get('status') == 'available']
+    in_use = [gpu_id for gpu_id in gpu_ids if status[gpu_id].get('status') != 'available']
+    minute = int(time.time() // 60)
+
     current_time = datetime.now(INDIA_TZ).strftime('%I:%M %p IST, %B %d')
     blocks = [
         {"type": "header", "text": {"type": "plain_text", "text": "🎯 GPU Allocation Dashboard"}},
         {
             "type": "context",
-            "elements": [{"type": "mrkdwn", "text": f"📅 Updated: {current_time} | Total GPUs: {TOTAL_GPUS}"}]
+            "elements": [{
+                "type": "mrkdwn",
+                "text": f"📅 Updated: {current_time} | Total GPUs: {len(status)} | ✅ {len(available)} free | 🔴 {len(in_use)} in use"
+            }]
         },
         {"type": "divider"}
     ]
-    
-    for gpu_id in sorted(status.keys(), key=int):
-        info = status[gpu_id]
-        if info.get('status') == 'available':
-            blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"✅ *GPU {gpu_id}*\nStatus: Available for use"
-                }
-            })
-        else:
-            try:
-                release_time_str = "Unknown"
-                remaining_str = ""
-                
-                if 'release_time' in info:
-                    utc_time = datetime.fromisoformat(info['release_time']).replace(tzinfo=timezone.utc)
-                    ist_time = utc_time.astimezone(INDIA_TZ)
-                    release_time_str = ist_time.strftime('%I:%M %p IST')
-                    
-                    # Calculate remaining time
-                    now = datetime.now(timezone.utc)
-                    remaining = utc_time - now
-                    if remaining.total_seconds() > 0:
-                        hours = int(remaining.total_seconds() // 3600)
-                        minutes = int((remaining.total_seconds() % 3600) // 60)
-                        if hours > 0:
-                            remaining_str = f"⏳ {hours}h {minutes}m remaining"
-                        else:
-                            remaining_str = f"⏳ {minutes}m remaining"
-                    else:
-                        remaining_str = "⏳ Expired"
-                
-                user_name_display = info.get('user_name', 'Unknown')
-                purpose = info.get('purpose', 'No purpose specified')
-                
-                blocks.append({
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"🔴 *GPU {gpu_id} - In Use*\n👤 User: {user_name_display}\n📝 Purpose: `{purpose}`\n⏰ Until: ~{release_time_str}\n{remaining_str}"
-                    }
-                })
-            except (ValueError, KeyError) as e:
-                logger.warning(f"Error formatting GPU {gpu_id} status: {e}")
-                blocks.append({
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"⚠️ *GPU {gpu_id}*\nStatus: In use (details unavailable)"
-                    }
-                })
-        
-        blocks.append({"type": "divider"})
-    
+
+    if view == "all" and len(gpu_ids) <= STATUS_PAGE_SIZE:
+        for gpu_id in gpu_ids:
+            blocks.append(_gpu_section(gpu_id, status[gpu_id], minute))
+            blocks.append({"type": "divider"})
+    else:
+        if view in ("all", "free"):
+            blocks.extend(_available_summary(available))
+            blocks.append({"type": "divider"})
+        if view in ("all", "used"):
+            page_ids, page, pages = paginate(in_use, page, STATUS_PAGE_SIZE)
+            for gpu_id in page_ids:
+                blocks.append(_gpu_section(gpu_id, status[gpu_id], minute))
+            if not in_use:
+                blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": "No GPUs are claimed right now"}})
+            command = "/gpu status" if view == "all" else "/gpu status used"
+            footer = create_page_footer(page, pages, command)
+            if footer is not None:
+                blocks.append(footer)
+
+    blocks.extend(_upcoming_reservations())
     blocks.append({
         "type": "context",
         "elements": [{"type": "mrkdwn", "text": "💡 Use `/gpu claim <id> <purpose> [duration]` to reserve a GPU"}]
     })
-    
-    return blocks
\ No newline at end of file
+
+    return blocks
+
+
+def _upcoming_reservations() -> List[Dict[str, Any]]:
+    """List the next few bookings, if there are any."""
+    try:
+        bookings = get_reservation_book().index().upcoming(datetime.now(timezone.utc), _UPCOMING_SHOWN)
+    except Exception as e:
+        logger.warning(f"Failed to read reservations: {e}")
+        return []
+    if not bookings:
+        return []
+    lines = []
+    for booking in bookings:
+        start = datetime.fromisoformat(booking['start']).astimezone(INDIA_TZ).strftime('%a %I:%M %p')
+        end = datetime.fromisoformat(booking['end']).astimezone(INDIA_TZ).strftime('%I:%M %p')
+        lines.append(f"• GPU {booking['gpu_id']} · {start} → {end} · {booking['user_name']}")
+    return [{"type": "context", "elements": [{"type": "mrkdwn", "text": "📅 *Upcoming reservations*\n" + "\n".join(lines)}]}]
+
+
+def _board_line(gpu_id: str, info: Dict[str, Any], utilization: Optional[float]) -> str:
+    """One line for a claimed GPU on the live board."""
+    if info.get('status') == SHARED:
+        line = f"🟡 *GPU {gpu_id}* · shared · {share_summary(info)}"
+        return line if utilization is None else f"{line} · ⚡ {utilization:.0f}%"
+    line = f"🔴 *GPU {gpu_id}* · {info.get('user_name', 'Unknown')} · `{info.get('purpose', 'No purpose specified')}`"
+    try:
+        until = datetime.fromisoformat(info['release_time']).replace(tzinfo=timezone.utc)
+        line += f" · until {until.astimezone(INDIA_TZ).strftime('%I:%M %p')}"
+    except (KeyError, TypeError, ValueError):
+        pass
+    if utilization is not None:
+        line += f" · ⚡ {utilization:.0f}%"
+    return line
+
+
+def render_board(status: Dict[str, Any], snapshot: Optional[TelemetrySnapshot] = None) -> List[Dict[str, Any]]:
+    """
+    Render the pinned live board.
+
+    Unlike the dashboard, the board shows nothing that changes with the
+    clock alone (no "updated at", no countdowns), and utilization is
+    rounded to LIVE_BOARD_UTIL_STEP, so identical blocks mean nothing worth
+    an update happened.
+
+    Args:
+        status: GPU status table
+        snapshot: Telemetry for local GPUs, if available
+
+    Returns:
+        List of Slack block elements
+    """
+    utilization = {}
+    if snapshot is not None and snapshot.error is None:
+        for gpu in snapshot.gpus:
+            if gpu.utilization is not None:
+                utilization[gpu.index] = round(gpu.utilization / LIVE_BOARD_UTIL_STEP) * LIVE_BOARD_UTIL_STEP
+
+    gpu_ids = sorted(status.keys(), key=gpu_sort_key)
+    available = [gpu_id for gpu_id in gpu_ids if status[gpu_id].get('status') == 'available']
+    in_use = [gpu_id for gpu_id in gpu_ids if status[gpu_id].get('status') != 'available']
+    blocks = [
+        {"type": "header", "text": {"type": "plain_text", "text": "📌 Live GPU Board"}},
+        {
+            "type": "context",
+            "elements": [{
+                "type": "mrkdwn",
+                "text": f"Total GPUs: {len(status)} | ✅ {len(available)} free | 🔴 {len(in_use)} in use · updates automatically"
+            }]
+        },
+        {"type": "divider"}
+    ]
+    # Free GPUs get at most a quarter of the sections, claimed GPUs the rest
+    free_sections = _available_summary(available)
+    if len(free_sections) > LIVE_BOARD_MAX_SECTIONS // 4:
+        free_sections = free_sections[:LIVE_BOARD_MAX_SECTIONS // 4]
+        free_sections[-1]["text"]["text"] += " …"
+    blocks.extend(free_sections)
+    blocks.append({"type": "divider"})
+
+    sections, text, shown = [], "", 0
+    for gpu_id in in_use:
+        line = _board_line(gpu_id, status[gpu_id], utilization.get(gpu_id))
+        if len(text) + len(line) + 1 > _MAX_SECTION_TEXT:
+            if len(sections) + len(free_sections) + 1 == LIVE_BOARD_MAX_SECTIONS:
+                break
+            sections.append(text)
+            text = ""
+        text = f"{text}\n{line}" if text else line
+        shown += 1
+    if text:
+        sections.append(text)
+    blocks.extend({"type": "section", "text": {"type": "mrkdwn", "text": chunk}} for chunk in sections)
+    if not in_use:
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": "No GPUs are claimed right now"}})
+    elif shown < len(in_use):
+        blocks.append({
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": f"…and {len(in_use) - shown} more · `/gpu status used` lists them all"}]
+        })
+    return blocks
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Stand-in for nvidia-smi that emits plausible CSV telemetry.
+
+Supports the queries the bot issues:
+    fake_nvidia_smi.py --query-gpu=<fields> --format=csv,noheader,nounits
+    fake_nvidia_smi.py --query-compute-apps=<fields> --format=csv,noheader,nounits
+
+Environment variables:
+    FAKE_GPU_COUNT    number of GPUs to report (default 2)
+    FAKE_GPU_NAME     GPU model name (default "NVIDIA A100-SXM4-80GB")
+    FAKE_GPU_DELAY    seconds to sleep before answering (default 0)
+    FAKE_GPU_FAIL     if set, exit with an error like a broken driver
+
+Values drift deterministically with wall-clock time, and odd-numbered GPUs
+run one compute process each, so repeated samples differ realistically.
+Point config.NVIDIA_SMI (or the NVIDIA_SMI environment variable) at this
+script to run the bot without a GPU.
+"""
+import os
+import sys
+import math
+import time
+
+MEMORY_TOTAL = 81920
+
+
+def _gpu_values(index: int, now: float) -> dict:
+    phase = now / 30.0 + index
+    busy = index % 2 == 1
+    util = int(50 + 45 * math.sin(phase)) if busy else 0
+    mem_used = int(MEMORY_TOTAL * (0.3 + 0.2 * math.sin(phase / 3))) if busy else 4
+    return {
+        "index": str(index),
+        "name": os.environ.get("FAKE_GPU_NAME", "NVIDIA A100-SXM4-80GB"),
+        "temperature.gpu": str(35 + util // 2),
+        "utilization.gpu": str(util),
+        "memory.used": str(mem_used),
+        "memory.total": str(MEMORY_TOTAL),
+        "uuid": f"GPU-00000000-0000-0000-0000-{index:012d}",
+        "pci.bus_id": f"00000000:{index + 1:02X}:00.0",
+        "power.draw": f"{60 + util * 3:.2f}",
+    }
+
+
+def _process_values(index: int, now: float) -> dict:
+    gpu = _gpu_values(index, now)
+    return {
+        "gpu_uuid": gpu["uuid"],
+        "pid": str(10000 + index),
+        "process_name": "python",
+        "used_gpu_memory": str(int(gpu["memory.used"]) - 500),
+    }
+
+
+def main(argv: list) -> int:
+    if os.environ.get("FAKE_GPU_FAIL"):
+        sys.stderr.write("NVIDIA-SMI has failed because it couldn't communicate with the NVIDIA driver.\n")
+        return 9
+    delay = float(os.environ.get("FAKE_GPU_DELAY", "0"))
+    if delay:
+        time.sleep(delay)
+
+    count = int(os.environ.get("FAKE_GPU_COUNT", "2"))
+    now = time.time()
+    for arg in argv:
+        if arg.startswith("--query-gpu="):
+            fields = arg.split("=", 1)[1].split(",")
+            rows = [_gpu_values(i, now) for i in range(count)]
+        elif arg.startswith("--query-compute-apps="):
+            fields = arg.split("=", 1)[1].split(",")
+            rows = [_process_values(i, now) for i in range(count) if i % 2 == 1]
+        else:
+            continue
+        for row in rows:
+            print(", ".join(row.get(field, "[N/A]") for field in fields))
+        return 0
+
+    sys.stderr.write("fake_nvidia_smi: only --query-gpu and --query-compute-apps are supported\n")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Slack Web API, for trying the live board and DMs.
+
+Answers chat.postMessage, chat.update and pins.add like Slack would (with
+a message `ts`), and anything else with {"ok": true}. Every call is logged
+to stdout and kept in memory; GET /calls returns them as JSON.
+
+Usage:
+    python tools/fake_slack_api.py [--port 5099]
+    SLACK_API_URL=http://127.0.0.1:5099 SLACK_BOT_TOKEN=xoxb-fake \\
+        GPU_LIVE_BOARD_CHANNELS=C0BOARD python bot.py
+
+Environment variables:
+    FAKE_SLACK_RATELIMIT    if set, answer every Nth call with "ratelimited"
+"""
+import os
+import json
+import argparse
+import itertools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_calls = []
+_lock = threading.Lock()
+_ts = itertools.count(1)
+_messages = {}  # (channel, ts) -> blocks
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _reply(self, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        with _lock:
+            self._reply({"ok": True, "calls": list(_calls)})
+
+    def do_POST(self) -> None:
+        method = self.path.strip("/")
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with _lock:
+            _calls.append({"method": method, "payload": payload})
+            every = int(os.environ.get("FAKE_SLACK_RATELIMIT", 0))
+            if every and len(_calls) % every == 0:
+                body = {"ok": False, "error": "ratelimited"}
+            elif method == "chat.postMessage":
+                ts = f"{1700000000 + next(_ts)}.000100"
+                _messages[(payload.get("channel"), ts)] = payload.get("blocks")
+                body = {"ok": True, "channel": payload.get("channel"), "ts": ts}
+            elif method == "chat.update":
+                key = (payload.get("channel"), payload.get("ts"))
+                if key in _messages:
+                    _messages[key] = payload.get("blocks")
+                    body = {"ok": True, "channel": key[0], "ts": key[1]}
+                else:
+                    body = {"ok": False, "error": "message_not_found"}
+            else:
+                body = {"ok": True}
+        print(f"{method}: {body}", flush=True)
+        self._reply(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=5099)
+    args = parser.parse_args()
+    ThreadingHTTPServer(("127.0.0.1", args.port), _Handler).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+In-memory stand-in for the subset of pynvml used by NvmlProvider.
+
+Usage:
+    from tools import mock_pynvml
+    from utils.telemetry import NvmlProvider
+    provider = NvmlProvider(nvml=mock_pynvml)
+
+Set MOCK_NVML_GPU_COUNT (default 2) before nvmlInit() to change the number
+of devices. Values drift with wall-clock time like tools/fake_nvidia_smi.py,
+and odd-numbered GPUs run one compute process each.
+"""
+import os
+import math
+import time
+from typing import List, NamedTuple
+
+NVML_TEMPERATURE_GPU = 0
+
+_MEMORY_TOTAL = 80 * 2**30
+_initialized = False
+_device_count = 0
+
+
+class NVMLError(Exception):
+    """Mirrors pynvml.NVMLError."""
+
+
+class NVMLError_Uninitialized(NVMLError):
+    pass
+
+
+class NVMLError_NotFound(NVMLError):
+    pass
+
+
+class _Utilization(NamedTuple):
+    gpu: int
+    memory: int
+
+
+class _Memory(NamedTuple):
+    total: int
+    free: int
+    used: int
+
+
+class _Process(NamedTuple):
+    pid: int
+    usedGpuMemory: int
+
+
+def _check_init() -> None:
+    if not _initialized:
+        raise NVMLError_Uninitialized("Uninitialized")
+
+
+def _phase(handle: int) -> float:
+    return time.time() / 30.0 + handle
+
+
+def nvmlInit() -> None:
+    global _initialized, _device_count
+    _device_count = int(os.environ.get("MOCK_NVML_GPU_COUNT", "2"))
+    _initialized = True
+
+
+def nvmlShutdown() -> None:
+    global _initialized
+    _check_init()
+    _initialized = False
+
+
+def nvmlDeviceGetCount() -> int:
+    _check_init()
+    return _device_count
+
+
+def nvmlDeviceGetHandleByIndex(index: int) -> int:
+    _check_init()
+    if not 0 <= index < _device_count:
+        raise NVMLError_NotFound("Not Found")
+    return index
+
+
+def nvmlDeviceGetName(handle: int) -> str:
+    _check_init()
+    return "NVIDIA A100-SXM4-80GB"
+
+
+def nvmlDeviceGetUUID(handle: int) -> str:
+    _check_init()
+    return f"GPU-00000000-0000-0000-0000-{handle:012d}"
+
+
+def nvmlDeviceGetUtilizationRates(handle: int) -> _Utilization:
+    _check_init()
+    util = int(50 + 45 * math.sin(_phase(handle))) if handle % 2 else 0
+    return _Utilization(gpu=util, memory=util // 2)
+
+
+def nvmlDeviceGetTemperature(handle: int, sensor: int) -> int:
+    _check_init()
+    return 35 + nvmlDeviceGetUtilizationRates(handle).gpu // 2
+
+
+def nvmlDeviceGetMemoryInfo(handle: int) -> _Memory:
+    _check_init()
+    if handle % 2:
+        used = int(_MEMORY_TOTAL * (0.3 + 0.2 * math.sin(_phase(handle) / 3)))
+    else:
+        used = 4 * 2**20
+    return _Memory(total=_MEMORY_TOTAL, free=_MEMORY_TOTAL - used, used=used)
+
+
+def nvmlDeviceGetComputeRunningProcesses(handle: int) -> List[_Process]:
+    _check_init()
+    if handle % 2 == 0:
+        return []
+    used = nvmlDeviceGetMemoryInfo(handle).used - 500 * 2**20
+    return [_Process(pid=10000 + handle, usedGpuMemory=used)]
+
+
+def nvmlSystemGetProcessName(pid: int) -> str:
+    _check_init()
+    return "python"
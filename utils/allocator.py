@@ -0,0 +1,338 @@
+"""GPU selection for multi-GPU claims.
+
+Explicit sets are parsed from selectors such as "0-3", "0,2,5" or
+"nodeA:0-3". For "any N" claims, FreeSetIndex keeps the free GPU indexes
+of every node in sorted lists so a placement is found without scanning
+the whole inventory, preferring (in order) a single topology group, a
+single node with the tightest run of indexes, then the fewest nodes.
+
+Fractional "--mem" claims are placed by MemoryFitIndex, which keeps the
+free memory of every shareable GPU (or free MIG instance) in one sorted
+list, so the best fit is a single bisect.
+"""
+import bisect
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from config import GPU_TOPOLOGY, MIG_INSTANCES, SHARE_DEFAULT_MEMORY_GB, SHARE_MAX_PER_GPU
+from utils.shares import SHARED, reserved_mb
+from utils.telemetry import TelemetrySnapshot
+
+# Upper bound on the GPUs a single range selector may expand to
+MAX_SELECTOR_GPUS = 4096
+
+
+def make_gpu_id(node: str, index: int) -> str:
+    """Build a GPU ID from a node name ("" for local) and an index."""
+    return f"{node}:{index}" if node else str(index)
+
+
+def split_gpu_id(gpu_id: str) -> Tuple[str, int]:
+    """
+    Split a GPU ID into (node, index).
+
+    Raises:
+        ValueError: If the index part is not a number
+    """
+    node, _, index = gpu_id.rpartition(':')
+    return node, int(index)
+
+
+def parse_gpu_selector(selector: str) -> List[str]:
+    """
+    Expand a GPU selector into GPU IDs.
+
+    Args:
+        selector: A single ID ("3", "nodeA:3"), a range ("0-3", "nodeA:0-3")
+            or a comma-separated list of either ("0,2,5")
+
+    Returns:
+        List[str]: GPU IDs in the order given, without duplicates
+
+    Raises:
+        ValueError: If the selector is malformed
+    """
+    gpu_ids = []
+    for part in selector.split(','):
+        part = part.strip()
+        if not part:
+            raise ValueError(f"empty GPU in selector '{selector}'")
+        node, sep, indexes = part.rpartition(':')
+        if sep and not node:
+            raise ValueError(f"missing node name in '{part}'")
+        start, dash, end = indexes.partition('-')
+        if not start.isdigit() or (dash and not end.isdigit()):
+            raise ValueError(f"invalid GPU '{part}'")
+        first, last = int(start), int(end) if dash else int(start)
+        if last < first or last - first >= MAX_SELECTOR_GPUS:
+            raise ValueError(f"invalid GPU range '{part}'")
+        for index in range(first, last + 1):
+            gpu_id = make_gpu_id(node, index)
+            if gpu_id not in gpu_ids:
+                gpu_ids.append(gpu_id)
+    return gpu_ids
+
+
+def _contains(indexes: Sequence[int], index: int) -> bool:
+    """Membership test on a sorted list."""
+    position = bisect.bisect_left(indexes, index)
+    return position < len(indexes) and indexes[position] == index
+
+
+def _tightest_run(indexes: Sequence[int], count: int) -> List[int]:
+    """Pick `count` of the sorted indexes with the smallest index span."""
+    best = 0
+    for i in range(1, len(indexes) - count + 1):
+        if indexes[i + count - 1] - indexes[i] < indexes[best + count - 1] - indexes[best]:
+            best = i
+    return list(indexes[best:best + count])
+
+
+class FreeSetIndex:
+    """
+    Sorted free-index lists per node, maintained incrementally.
+
+    The index is a hint: callers must check its picks against the locked
+    status and rebuild it when they disagree.
+    """
+
+    def __init__(self, topology: Optional[Dict[str, List[List[int]]]] = None):
+        self._free: Dict[str, List[int]] = {}
+        self._topology = GPU_TOPOLOGY if topology is None else topology
+        self.version: Optional[Hashable] = None
+
+    @classmethod
+    def from_status(cls, status: Dict[str, Any], version: Optional[Hashable] = None,
+                    topology: Optional[Dict[str, List[List[int]]]] = None) -> "FreeSetIndex":
+        """Build an index from a full status table."""
+        index = cls(topology)
+        for gpu_id, info in status.items():
+            if info.get('status') == 'available':
+                index.add(gpu_id)
+        index.version = version
+        return index
+
+    def __len__(self) -> int:
+        return sum(len(indexes) for indexes in self._free.values())
+
+    def add(self, gpu_id: str) -> None:
+        """Mark a GPU as free."""
+        try:
+            node, index = split_gpu_id(gpu_id)
+        except ValueError:
+            return
+        indexes = self._free.setdefault(node, [])
+        if not _contains(indexes, index):
+            bisect.insort(indexes, index)
+
+    def discard(self, gpu_id: str) -> None:
+        """Mark a GPU as no longer free."""
+        try:
+            node, index = split_gpu_id(gpu_id)
+        except ValueError:
+            return
+        indexes = self._free.get(node)
+        if not indexes:
+            return
+        position = bisect.bisect_left(indexes, index)
+        if position < len(indexes) and indexes[position] == index:
+            del indexes[position]
+
+    def update(self, claimed: Iterable[str] = (), released: Iterable[str] = ()) -> None:
+        """Apply a batch of claims and releases."""
+        for gpu_id in claimed:
+            self.discard(gpu_id)
+        for gpu_id in released:
+            self.add(gpu_id)
+
+    def _from_group(self, node: str, count: int) -> Optional[List[int]]:
+        """Pick from the smallest topology group on a node that has room."""
+        free = self._free[node]
+        best = None
+        for group in self._topology.get(node, ()):
+            available = [index for index in sorted(group) if _contains(free, index)]
+            if len(available) >= count and (best is None or len(available) < len(best)):
+                best = available
+        return _tightest_run(best, count) if best is not None else None
+
+    def allocate(self, count: int) -> Optional[List[str]]:
+        """
+        Choose `count` free GPUs without modifying the index.
+
+        Args:
+            count: Number of GPUs wanted
+
+        Returns:
+            Optional[List[str]]: Chosen GPU IDs, or None if too few are free
+        """
+        if count <= 0 or len(self) < count:
+            return None
+        # Best fit: the node with the fewest free GPUs that can hold the whole job
+        fitting = sorted((len(indexes), node) for node, indexes in self._free.items() if len(indexes) >= count)
+        for _, node in fitting:
+            picked = self._from_group(node, count)
+            if picked is not None:
+                return [make_gpu_id(node, index) for index in picked]
+        if fitting:
+            node = fitting[0][1]
+            return [make_gpu_id(node, index) for index in _tightest_run(self._free[node], count)]
+        # Spread over as few nodes as possible, largest free pools first
+        chosen = []
+        for free_count, node in sorted(((len(ix), n) for n, ix in self._free.items()), reverse=True):
+            take = min(free_count, count - len(chosen))
+            chosen.extend(make_gpu_id(node, index) for index in _tightest_run(self._free[node], take))
+            if len(chosen) == count:
+                break
+        return chosen
+
+
+# GPU ID -> (memory total, memory used or None) in MiB, from telemetry
+MemoryCapacity = Dict[str, Tuple[int, Optional[int]]]
+
+# Placement option for the MIG-less case
+NO_INSTANCE = -1
+
+
+def memory_capacity(snapshot: Optional[TelemetrySnapshot]) -> MemoryCapacity:
+    """
+    Read the memory size and live usage of local GPUs from a snapshot.
+
+    Args:
+        snapshot: Telemetry for this host, if any
+
+    Returns:
+        MemoryCapacity: Entries for GPUs that report their memory size
+    """
+    if snapshot is None or snapshot.error is not None:
+        return {}
+    return {
+        gpu.index: (int(gpu.memory_total), None if gpu.memory_used is None else int(gpu.memory_used))
+        for gpu in snapshot.gpus if gpu.memory_total
+    }
+
+
+def memory_total(gpu_id: str, info: Dict[str, Any], capacity: MemoryCapacity) -> int:
+    """
+    Memory that shares on a GPU are packed into, in MiB (0 if unknown).
+
+    MIG GPUs count their configured instances; others use telemetry, then
+    the size recorded when the GPU was first shared, then
+    SHARE_DEFAULT_MEMORY_GB.
+    """
+    instances = MIG_INSTANCES.get(gpu_id)
+    if instances:
+        return int(sum(instances) * 1024)
+    if gpu_id in capacity:
+        return capacity[gpu_id][0]
+    return info.get('memory_total_mb') or int(SHARE_DEFAULT_MEMORY_GB * 1024)
+
+
+def share_slots(gpu_id: str, info: Dict[str, Any], capacity: MemoryCapacity) -> List[Tuple[int, int]]:
+    """
+    List where a new share could go on one GPU.
+
+    A free or shared GPU offers its free memory: the total minus the larger
+    of the reserved and the live-used memory, so jobs that outgrow their
+    budget (or unclaimed processes) are respected. A MIG GPU offers each
+    instance no share is using.
+
+    Args:
+        gpu_id: GPU ID
+        info: The GPU's status record
+        capacity: memory_capacity() of this host
+
+    Returns:
+        List of (free MiB, MIG instance or NO_INSTANCE)
+    """
+    state = info.get('status')
+    if state not in ('available', SHARED):
+        return []
+    shares = info.get('shares', ()) if state == SHARED else ()
+    if len(shares) >= SHARE_MAX_PER_GPU:
+        return []
+    instances = MIG_INSTANCES.get(gpu_id)
+    if instances:
+        taken = {share.get('mig_instance') for share in shares}
+        return [(int(size * 1024), number) for number, size in enumerate(instances) if number not in taken]
+    total = memory_total(gpu_id, info, capacity)
+    used = capacity.get(gpu_id, (0, None))[1] or 0
+    free = total - max(reserved_mb(info), used)
+    return [(free, NO_INSTANCE)] if free > 0 else []
+
+
+class MemoryFitIndex:
+    """
+    Placement options of all shareable GPUs, sorted by free memory.
+
+    The best fit for a budget is the first option with at least that much
+    free memory, found by bisection; claiming updates only the chosen
+    GPU's options. Like FreeSetIndex, the index is a hint: callers must
+    check its pick against the locked status and rebuild it when they
+    disagree.
+    """
+
+    def __init__(self):
+        self._slots: List[Tuple[int, str, int]] = []  # (free MiB, GPU ID, instance)
+        self._by_gpu: Dict[str, List[Tuple[int, str, int]]] = {}
+        self.version: Optional[Hashable] = None
+
+    @classmethod
+    def from_status(cls, status: Dict[str, Any], capacity: MemoryCapacity,
+                    version: Optional[Hashable] = None) -> "MemoryFitIndex":
+        """Build an index from a full status table."""
+        index = cls()
+        for gpu_id, info in status.items():
+            slots = [(free, gpu_id, instance) for free, instance in share_slots(gpu_id, info, capacity)]
+            if slots:
+                index._by_gpu[gpu_id] = slots
+                index._slots.extend(slots)
+        index._slots.sort()
+        index.version = version
+        return index
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def set_gpu(self, gpu_id: str, slots: List[Tuple[int, int]]) -> None:
+        """Replace one GPU's options, e.g. with share_slots() of its new record."""
+        for slot in self._by_gpu.pop(gpu_id, ()):
+            position = bisect.bisect_left(self._slots, slot)
+            if position < len(self._slots) and self._slots[position] == slot:
+                del self._slots[position]
+        entries = [(free, gpu_id, instance) for free, instance in slots]
+        for slot in entries:
+            bisect.insort(self._slots, slot)
+        if entries:
+            self._by_gpu[gpu_id] = entries
+
+    def best_fits(self, memory_mb: int) -> Iterator[Tuple[str, int]]:
+        """
+        Yield the options that fit, least free memory first.
+
+        Callers normally take the first one; the rest are fallbacks when
+        it turns out to be unusable.
+
+        Args:
+            memory_mb: Budget of the new share
+
+        Yields:
+            Tuple[str, int]: (GPU ID, instance)
+        """
+        for position in range(bisect.bisect_left(self._slots, (memory_mb,)), len(self._slots)):
+            _, gpu_id, instance = self._slots[position]
+            yield gpu_id, instance
+
+    def best_fit(self, memory_mb: int) -> Optional[Tuple[str, int]]:
+        """
+        Choose the option with the least free memory that still fits.
+
+        Args:
+            memory_mb: Budget of the new share
+
+        Returns:
+            Optional[Tuple[str, int]]: (GPU ID, instance), or None if no
+            GPU has room
+        """
+        position = bisect.bisect_left(self._slots, (memory_mb,))
+        if position == len(self._slots):
+            return None
+        _, gpu_id, instance = self._slots[position]
+        return gpu_id, instance
@@ -0,0 +1,136 @@
+"""Deferred Slack responses delivered to response_url from a worker pool."""
+import json
+import time
+import logging
+import threading
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional
+from config import (
+    DEFERRED_WORKERS, DEFERRED_MAX_QUEUE, DEFERRED_RETRIES, DEFERRED_BACKOFF_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+# Latency samples kept for latency_summary()
+_LATENCY_WINDOW = 1000
+
+
+def post_to_response_url(response_url: str, payload: Dict[str, Any],
+                         retries: int = DEFERRED_RETRIES,
+                         backoff: float = DEFERRED_BACKOFF_SECONDS) -> bool:
+    """
+    POST a message payload to a Slack response_url with retry and backoff.
+    
+    Network errors, 5xx and 429 responses are retried with exponential
+    backoff (honoring Retry-After on 429); other 4xx responses are not.
+    
+    Args:
+        response_url: The response_url from the slash command request
+        payload: Message body (blocks, response_type, ...)
+        retries: Number of retries after the first attempt
+        backoff: Delay before the first retry, doubled after each one
+        
+    Returns:
+        bool: True if Slack accepted the message
+    """
+    data = json.dumps(payload).encode()
+    delay = backoff
+    for attempt in range(retries + 1):
+        request = urllib.request.Request(
+            response_url, data=data, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                response.read()
+            return True
+        except urllib.error.HTTPError as e:
+            if e.code != 429 and e.code < 500:
+                logger.error(f"response_url rejected message: HTTP {e.code}")
+                return False
+            retry_after = e.headers.get('Retry-After') if e.headers else None
+            wait = float(retry_after) if retry_after and retry_after.isdigit() else delay
+            logger.warning(f"response_url returned HTTP {e.code} (attempt {attempt + 1})")
+        except (urllib.error.URLError, OSError) as e:
+            wait = delay
+            logger.warning(f"Failed to reach response_url (attempt {attempt + 1}): {e}")
+        if attempt < retries:
+            time.sleep(wait)
+            delay *= 2
+    logger.error(f"Giving up on response_url after {retries + 1} attempts")
+    return False
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class DeferredResponder:
+    """
+    Runs command handlers in the background and delivers their output.
+    
+    At most `max_workers` handlers run at once and at most `max_queue` more
+    may wait; submit() refuses work beyond that so a burst cannot pile up
+    unbounded threads or memory.
+    """
+
+    def __init__(self, max_workers: int = DEFERRED_WORKERS, max_queue: int = DEFERRED_MAX_QUEUE):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="deferred")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._ack_latency: deque = deque(maxlen=_LATENCY_WINDOW)
+        self._e2e_latency: deque = deque(maxlen=_LATENCY_WINDOW)
+
+    def submit(self, run: Callable[[], Dict[str, Any]], response_url: str, received_at: float) -> bool:
+        """
+        Queue a handler whose result is posted to response_url.
+        
+        Args:
+            run: Produces the message payload to post
+            response_url: Where to deliver the payload
+            received_at: time.perf_counter() when the request arrived
+            
+        Returns:
+            bool: False if the queue is full and the caller must run inline
+        """
+        if not self._slots.acquire(blocking=False):
+            logger.warning("Deferred response queue full")
+            return False
+        try:
+            self._executor.submit(self._deliver, run, response_url, received_at)
+        except RuntimeError:
+            self._slots.release()
+            return False
+        return True
+
+    def record_ack(self, received_at: float) -> None:
+        """Record the time from request arrival to the acknowledgement."""
+        self._ack_latency.append(time.perf_counter() - received_at)
+
+    def _deliver(self, run: Callable[[], Dict[str, Any]], response_url: str, received_at: float) -> None:
+        try:
+            payload = run()
+            delivered = post_to_response_url(response_url, payload)
+            elapsed = time.perf_counter() - received_at
+            self._e2e_latency.append(elapsed)
+            logger.info(f"Deferred response {'delivered' if delivered else 'failed'} after {elapsed * 1000:.0f}ms")
+        except Exception as e:
+            logger.error(f"Deferred command failed: {e}", exc_info=True)
+        finally:
+            self._slots.release()
+
+    def latency_summary(self) -> Dict[str, Optional[float]]:
+        """
+        Summarize recent ack and end-to-end latencies in milliseconds.
+        
+        Returns:
+            Dict[str, Optional[float]]: p50/p99 for ack and end-to-end delivery
+        """
+        summary: Dict[str, Optional[float]] = {}
+        for name, samples in (("ack", list(self._ack_latency)), ("e2e", list(self._e2e_latency))):
+            for pct in (50, 99):
+                summary[f"{name}_p{pct}_ms"] = _percentile(samples, pct) * 1000 if samples else None
+        return summary
@@ -0,0 +1,258 @@
+"""Background scheduler for expiry, reservations, idle claims, usage sampling, telemetry history and the live board."""
+import os
+import fcntl
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Hashable, List, Optional, Tuple
+from config import EXPIRY_POLL_SECONDS, RECONCILE_INTERVAL_SECONDS, SCHEDULER_LOCK_FILE, USAGE_SAMPLE_SECONDS
+from utils.gpu_sampler import get_sampler
+from utils.live_board import LiveBoard
+from utils.reconciler import fresh_snapshot, reconcile_idle_claims
+from utils.reservations import activate_due, get_reservation_book
+from utils.shares import SHARED, gpu_claims, keep_shares
+from utils.status_manager import get_status, get_store
+from utils.usage import record_utilization
+from utils.waitlist import hand_off, notify_hand_offs, release_transaction
+
+logger = logging.getLogger(__name__)
+
+# First wait after a failure; doubles per consecutive failure up to the poll interval
+_RETRY_SECONDS = 1.0
+
+
+def parse_release_time(info: Dict[str, Any]) -> Optional[datetime]:
+    """
+    Parse a claim's release_time as an aware UTC datetime.
+    
+    Args:
+        info: GPU status record
+        
+    Returns:
+        Optional[datetime]: Release time, or None if missing or malformed
+    """
+    try:
+        return datetime.fromisoformat(info['release_time']).replace(tzinfo=timezone.utc)
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def release_expired(due: List[Tuple[str, str]]) -> List[str]:
+    """
+    Release claims whose release time has passed.
+    
+    Each GPU is only released if its record still carries the release_time
+    it was scheduled with, so a claim that was released, re-claimed or
+    extended in the meantime is left alone. On a shared GPU only the
+    shares with that release_time end; the GPU is released with its last
+    share. Released GPUs go to the head of the waitlist when someone is
+    waiting for them.
+    
+    Args:
+        due: (gpu_id, release_time) pairs that are due for expiry
+        
+    Returns:
+        List[str]: GPU IDs that were released
+    """
+    released = []
+    with release_transaction([gpu_id for gpu_id, _ in due], event="expire") as (queue, status):
+        for gpu_id, release_time in due:
+            info = status.get(gpu_id, {})
+            if info.get('status') == 'in_use' and info.get('release_time') == release_time:
+                logger.info(f"Auto-releasing expired GPU {gpu_id} (claimed by {info.get('user_name', 'Unknown')})")
+                status[gpu_id] = {"status": "available"}
+                released.append(gpu_id)
+            elif info.get('status') == SHARED and any(share.get('release_time') == release_time
+                                                      for share in info.get('shares', ())):
+                logger.info(f"Auto-releasing expired share(s) of GPU {gpu_id}")
+                status[gpu_id] = keep_shares(info, lambda share: share.get('release_time') != release_time)
+                if status[gpu_id].get('status') == 'available':
+                    released.append(gpu_id)
+        hand_offs = hand_off(queue, status, released)
+    notify_hand_offs(hand_offs)
+    return released
+
+
+class ExpiryScheduler:
+    """
+    Releases expired claims, activates due reservations, reconciles idle
+    claims (every RECONCILE_INTERVAL_SECONDS) and samples the utilization
+    of claimed GPUs for usage reports (every USAGE_SAMPLE_SECONDS) from a
+    background thread.
+    
+    Pending expiries are kept in a min-heap keyed by release time, and the
+    thread sleeps until the earliest one is due. The heap is rebuilt
+    whenever the store version changes, which is checked at least every
+    `poll_interval` seconds so claims made by other workers are picked up.
+    
+    Only one process runs the scheduler at a time: each candidate tries to
+    take a non-blocking flock on `lock_path`, and the lock is released
+    automatically if the leader process dies, letting another worker take
+    over on its next attempt. The leader also records the telemetry
+    history all workers read, and runs the live board, if one is given.
+    """
+
+    def __init__(self, poll_interval: float = EXPIRY_POLL_SECONDS, lock_path: str = SCHEDULER_LOCK_FILE,
+                 board: Optional[LiveBoard] = None):
+        self.poll_interval = poll_interval
+        self.lock_path = lock_path
+        self.board = board
+        self._heap: List[Tuple[datetime, str, str]] = []
+        self._version: Optional[Hashable] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock_file = None
+        self._last_reconcile: Optional[datetime] = None
+        self._last_usage_sample: Optional[datetime] = None
+        self._activation_failures = 0
+        self._activation_retry_at: Optional[datetime] = None
+
+    def start(self) -> None:
+        """Start the scheduler thread if it isn't already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="expiry-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the scheduler thread and give up leadership."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether this process currently holds the scheduler lock."""
+        return self._lock_file is not None
+
+    def _try_acquire_leadership(self) -> bool:
+        """Try to become the single active scheduler without blocking."""
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        logger.info(f"Expiry scheduler running in process {os.getpid()}")
+        get_sampler().record_history = True
+        if self.board is not None:
+            self.board.start()
+        return True
+
+    def _release_leadership(self) -> None:
+        if self.board is not None:
+            self.board.stop()
+        if self._lock_file is not None:
+            get_sampler(start=False).record_history = False
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _rebuild_heap(self) -> None:
+        """Rebuild the pending-expiry heap if the stored state changed."""
+        version = get_store().version()
+        if version is not None and version == self._version:
+            return
+        heap = []
+        for gpu_id, info in get_status().items():
+            for claim in gpu_claims(info):
+                release_time = parse_release_time(claim)
+                if release_time is None:
+                    logger.warning(f"Error parsing release_time for GPU {gpu_id}")
+                    continue
+                heap.append((release_time, gpu_id, claim['release_time']))
+        heapq.heapify(heap)
+        self._heap = heap
+        self._version = version
+
+    def run_once(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Release every claim that is due at `now`.
+        
+        Args:
+            now: Current time (defaults to the current UTC time)
+            
+        Returns:
+            List[str]: GPU IDs that were released
+        """
+        now = now or datetime.now(timezone.utc)
+        if self._activation_retry_at is None or now >= self._activation_retry_at:
+            try:
+                activate_due(now)
+                self._activation_failures, self._activation_retry_at = 0, None
+            except Exception as e:
+                # A booking that keeps failing stays due; don't retry it in a tight loop
+                self._activation_failures += 1
+                delay = self._retry_delay(self._activation_failures)
+                self._activation_retry_at = now + timedelta(seconds=delay)
+                logger.error(f"Failed to activate reservations (retrying in {delay:.0f}s): {e}", exc_info=True)
+        if self._last_reconcile is None or (now - self._last_reconcile).total_seconds() >= RECONCILE_INTERVAL_SECONDS:
+            self._last_reconcile = now
+            try:
+                reconcile_idle_claims(now)
+            except Exception as e:
+                logger.error(f"Idle-claim reconciliation failed: {e}", exc_info=True)
+        if self._last_usage_sample is None or (now - self._last_usage_sample).total_seconds() >= USAGE_SAMPLE_SECONDS:
+            self._last_usage_sample = now
+            try:
+                snapshot = fresh_snapshot()
+                if snapshot is not None:
+                    record_utilization(get_status(), snapshot)
+            except Exception as e:
+                logger.error(f"Failed to sample utilization: {e}", exc_info=True)
+        self._rebuild_heap()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, gpu_id, release_time = heapq.heappop(self._heap)
+            due.append((gpu_id, release_time))
+        if not due:
+            return []
+        try:
+            return release_expired(due)
+        except Exception:
+            # The popped entries are lost from the heap; force a rebuild.
+            self._version = None
+            raise
+
+    def _retry_delay(self, failures: int) -> float:
+        """Seconds to wait after `failures` consecutive failures."""
+        return min(self.poll_interval, _RETRY_SECONDS * 2 ** (failures - 1))
+
+    def _seconds_until_next(self) -> float:
+        """Time to sleep before the next expiry, reservation or version check."""
+        upcoming = [self._heap[0][0]] if self._heap else []
+        next_start = get_reservation_book().index().next_start()
+        if next_start is not None:
+            if self._activation_retry_at is not None:
+                next_start = max(next_start, self._activation_retry_at)
+            upcoming.append(next_start)
+        if not upcoming:
+            return self.poll_interval
+        delay = (min(upcoming) - datetime.now(timezone.utc)).total_seconds()
+        return max(0.0, min(delay, self.poll_interval))
+
+    def _run(self) -> None:
+        failures = 0
+        try:
+            while not self._stop.is_set():
+                if not self.is_leader and not self._try_acquire_leadership():
+                    self._stop.wait(self.poll_interval)
+                    continue
+                try:
+                    self.run_once()
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    logger.error(f"Expiry scheduler iteration failed: {e}", exc_info=True)
+                delay = self._seconds_until_next()
+                if failures:
+                    # Failed expiries are still due; back off instead of spinning
+                    delay = max(delay, self._retry_delay(failures))
+                self._stop.wait(delay)
+        finally:
+            self._release_leadership()
@@ -0,0 +1,62 @@
+"""File locking and atomic write helpers shared by the storage modules."""
+import os
+import time
+import fcntl
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from utils.metrics import LOCK_HOLD, LOCK_WAIT
+
+
+@contextmanager
+def file_lock(path: str, operation: int = fcntl.LOCK_EX, label: Optional[str] = None) -> Iterator[None]:
+    """
+    Hold an flock on a dedicated lock file for the duration of a block.
+    
+    Files that are replaced by rename cannot carry a lock themselves, so
+    callers lock a separate, never-replaced sidecar file instead.
+    
+    Args:
+        path: Path of the lock file (created if missing)
+        operation: fcntl.LOCK_EX or fcntl.LOCK_SH
+        label: Metric label for the lock (defaults to the file name)
+    """
+    name = label or os.path.basename(path)
+    with open(path, 'a') as lock:
+        start = time.perf_counter()
+        fcntl.flock(lock.fileno(), operation)
+        acquired = time.perf_counter()
+        LOCK_WAIT.labels(lock=name).observe(acquired - start)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+            LOCK_HOLD.labels(lock=name).observe(time.perf_counter() - acquired)
+
+
+def atomic_write(path: str, data: str) -> None:
+    """
+    Atomically replace a file with new content.
+    
+    The data is written to a temporary file in the same directory,
+    fsync'd and renamed over the old file, so readers always see either
+    the previous or the new content, never a truncated file.
+    
+    Args:
+        path: Destination file path
+        data: Text content to write
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
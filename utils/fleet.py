@@ -0,0 +1,128 @@
+"""Concurrent fan-out to fleet agents with per-node timeouts and caching."""
+import json
+import time
+import logging
+import threading
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+from config import FLEET_NODES, FLEET_TIMEOUT_SECONDS, FLEET_CACHE_SECONDS
+from utils.telemetry import TelemetrySnapshot, snapshot_from_dict
+
+logger = logging.getLogger(__name__)
+
+
+class NodeResult(NamedTuple):
+    """The outcome of querying one fleet node."""
+    node: str
+    telemetry: Optional[TelemetrySnapshot]
+    claims: Dict[str, Any]
+    fetched_at: Optional[float]  # time.time() of the data shown, None if never fetched
+    error: Optional[str]  # why fresh data is missing; data may still be cached
+
+    @property
+    def is_partial(self) -> bool:
+        """Whether the node failed to answer in time for this request."""
+        return self.error is not None
+
+
+class FleetClient:
+    """
+    Queries every fleet agent concurrently and merges the results.
+    
+    Each node gets FLEET_TIMEOUT_SECONDS to answer. Responses are reused
+    for FLEET_CACHE_SECONDS, and a node that is slow or down is reported
+    with its last known data (if any) and an error instead of failing the
+    whole request. Requests that miss the deadline keep running in the
+    background and refresh the cache when they finish.
+    """
+
+    def __init__(self, nodes: Dict[str, str] = FLEET_NODES,
+                 timeout: float = FLEET_TIMEOUT_SECONDS, cache_seconds: float = FLEET_CACHE_SECONDS):
+        self.nodes = dict(nodes)
+        self.timeout = timeout
+        self.cache_seconds = cache_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max(4, len(self.nodes)), thread_name_prefix="fleet")
+        self._cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _fetch(self, node: str, url: str) -> Dict[str, Any]:
+        """Fetch one node's state and store it in the cache."""
+        with urllib.request.urlopen(f"{url.rstrip('/')}/node", timeout=self.timeout) as response:
+            data = json.load(response)
+        with self._lock:
+            self._cache[node] = (time.time(), data)
+        return data
+
+    def _submit(self, node: str, url: str) -> Future:
+        """Start a fetch for a node unless one is already in flight."""
+        with self._lock:
+            future = self._inflight.get(node)
+            if future is None or future.done():
+                future = self._executor.submit(self._fetch, node, url)
+                self._inflight[node] = future
+            return future
+
+    def fetch_all(self) -> List[NodeResult]:
+        """
+        Return the state of every configured node.
+        
+        Returns:
+            List[NodeResult]: One result per node, in configuration order
+        """
+        now = time.time()
+        futures: Dict[str, Future] = {}
+        with self._lock:
+            cached = dict(self._cache)
+        for node, url in self.nodes.items():
+            entry = cached.get(node)
+            if entry is None or now - entry[0] > self.cache_seconds:
+                futures[node] = self._submit(node, url)
+
+        if futures:
+            wait(futures.values(), timeout=self.timeout)
+
+        results = []
+        for node in self.nodes:
+            error = None
+            future = futures.get(node)
+            if future is not None:
+                if not future.done():
+                    error = f"no response within {self.timeout:g}s"
+                elif future.exception() is not None:
+                    error = str(future.exception())
+            with self._lock:
+                entry = self._cache.get(node)
+            if error:
+                logger.warning(f"Fleet node {node} unavailable: {error}")
+            if entry is None:
+                results.append(NodeResult(node, None, {}, None, error or "no data"))
+                continue
+            fetched_at, data = entry
+            results.append(NodeResult(
+                node=node,
+                telemetry=snapshot_from_dict(data["telemetry"]) if data.get("telemetry") else None,
+                claims=data.get("claims", {}),
+                fetched_at=fetched_at,
+                error=error
+            ))
+        return results
+
+
+_client: Optional[FleetClient] = None
+_client_lock = threading.Lock()
+
+
+def get_fleet_client() -> FleetClient:
+    """
+    Return the process-wide fleet client for config.FLEET_NODES.
+    
+    Returns:
+        FleetClient: Shared client instance
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = FleetClient()
+        return _client
@@ -0,0 +1,137 @@
+"""Background sampler that keeps a fresh GPU telemetry snapshot in memory."""
+import time
+import logging
+import threading
+from typing import Optional
+from config import TELEMETRY_INTERVAL_SECONDS
+from utils.telemetry import TelemetryError, TelemetrySnapshot, collect_snapshot
+from utils.telemetry_history import get_history
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetrySampler:
+    """
+    Polls GPU telemetry on a fixed interval and publishes the latest snapshot.
+    
+    Snapshots are immutable and replaced by a single reference assignment,
+    so request handlers can read `snapshot` without locking or waiting on
+    nvidia-smi. While `record_history` is set (in the scheduler leader
+    only), every published snapshot is also folded into the history file
+    that all workers read.
+    """
+
+    def __init__(self, interval: float = TELEMETRY_INTERVAL_SECONDS):
+        self.interval = interval
+        self._snapshot: Optional[TelemetrySnapshot] = None
+        self.history = get_history()
+        self.record_history = False
+        self._sample_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def snapshot(self) -> Optional[TelemetrySnapshot]:
+        """The most recently published snapshot, if any."""
+        return self._snapshot
+
+    def publish(self, snapshot: TelemetrySnapshot) -> None:
+        """Make a snapshot the current one and, if recording, add it to the history."""
+        self._snapshot = snapshot
+        if self.record_history:
+            try:
+                self.history.record(snapshot)
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to record telemetry history: {e}")
+
+    def _is_stale(self, snapshot: Optional[TelemetrySnapshot]) -> bool:
+        """Whether a snapshot is missing or the sampler has fallen behind."""
+        return snapshot is None or snapshot.age > 3 * self.interval
+
+    def _collect(self) -> TelemetrySnapshot:
+        """Collect and publish a snapshot; caller holds _sample_lock."""
+        try:
+            snapshot = collect_snapshot()
+        except TelemetryError as e:
+            snapshot = TelemetrySnapshot(taken_at=time.time(), gpus=(), processes=(), error=e)
+        self.publish(snapshot)
+        return snapshot
+
+    def sample_now(self) -> TelemetrySnapshot:
+        """
+        Collect and publish a snapshot immediately.
+        
+        Failures are published as a snapshot carrying the error, so readers
+        see why telemetry is unavailable instead of stale data.
+        
+        Returns:
+            TelemetrySnapshot: The newly published snapshot
+        """
+        with self._sample_lock:
+            return self._collect()
+
+    def latest(self) -> TelemetrySnapshot:
+        """
+        Return the current snapshot, sampling synchronously if there is none
+        yet or the background thread has fallen behind.
+        
+        Returns:
+            TelemetrySnapshot: A snapshot at most a few intervals old
+        """
+        snapshot = self._snapshot
+        if self._is_stale(snapshot):
+            with self._sample_lock:
+                # Another thread may have sampled while we waited
+                snapshot = self._snapshot
+                if self._is_stale(snapshot):
+                    snapshot = self._collect()
+        return snapshot
+
+    def start(self) -> None:
+        """Start the background sampling thread if it isn't already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sampling thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.sample_now()
+            except Exception as e:
+                logger.error(f"Telemetry sampling failed: {e}", exc_info=True)
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+_sampler: Optional[TelemetrySampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler(start: bool = True) -> TelemetrySampler:
+    """
+    Return this process's sampler, creating it on first use.
+    
+    Args:
+        start: Start the background sampling thread when creating the
+            sampler; pass False when something else (e.g. an asyncio task)
+            publishes snapshots
+    
+    Returns:
+        TelemetrySampler: The process-wide sampler
+    """
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = TelemetrySampler()
+            if start:
+                _sampler.start()
+        return _sampler
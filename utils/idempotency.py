@@ -0,0 +1,234 @@
+"""Replay the original response for retried or double-submitted commands.
+
+Slack resends a slash command (same trigger_id, with an X-Slack-Retry-Num
+header) when the first attempt is slow, and users sometimes submit the
+same command twice. State-changing commands are keyed by their trigger_id
+and by (user, command text) within a short window. The first request with
+a key runs; duplicates get its stored response instead of running the
+handler again. Read-only commands are not deduplicated: running them
+twice is harmless and they should not pay for a shared write.
+
+Entries are rows of a small SQLite table in WAL mode shared by all
+workers, so a lookup reads one row and a request only writes its own
+keys. They are bounded by both TTL and count.
+"""
+import os
+import time
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from config import (
+    IDEMPOTENCY_DOUBLE_SUBMIT_SECONDS, IDEMPOTENCY_FILE, IDEMPOTENCY_MAX_ENTRIES,
+    IDEMPOTENCY_PENDING_SECONDS, IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_WAIT_SECONDS
+)
+from utils.metrics import DUPLICATE_COMMANDS
+
+logger = logging.getLogger(__name__)
+
+# Commands whose repetition changes state; only these are deduplicated
+STATE_CHANGING_ACTIONS = frozenset({"claim", "release", "extend", "queue", "reserve"})
+
+# Returned to a duplicate whose original is still running after IDEMPOTENCY_WAIT_SECONDS
+IN_PROGRESS_RESPONSE = {
+    "response_type": "ephemeral",
+    "text": "⏳ Still working on this command from your previous request..."
+}
+
+_POLL_SECONDS = 0.1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    expires REAL NOT NULL,
+    response TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses(expires);
+"""
+
+
+def command_keys(trigger_id: Optional[str], user_id: str, command_text: str) -> List[Tuple[str, float]]:
+    """
+    Build the idempotency keys for one request.
+
+    Args:
+        trigger_id: Slack's trigger_id, identical across retries of a request
+        user_id: Slack user ID
+        command_text: Command text (e.g., "claim 0 training 2h")
+
+    Returns:
+        List of (key, seconds to keep the response) pairs; empty for
+        read-only commands and requests that cannot be deduplicated
+    """
+    words = command_text.lower().split()
+    if not words or words[0] not in STATE_CHANGING_ACTIONS:
+        return []
+    keys = []
+    if trigger_id:
+        keys.append((f"trigger:{trigger_id}", IDEMPOTENCY_TTL_SECONDS))
+    if IDEMPOTENCY_DOUBLE_SUBMIT_SECONDS > 0:
+        digest = hashlib.sha1(f"{user_id}\0{' '.join(words)}".encode()).hexdigest()
+        keys.append((f"text:{digest}", IDEMPOTENCY_DOUBLE_SUBMIT_SECONDS))
+    return keys
+
+
+class IdempotencyCache:
+    """
+    Stored responses by key, in one SQLite table shared across workers.
+
+    Each row holds a key, its expiry time and the JSON response body; a
+    NULL response marks a request that is still running. Pending entries
+    expire after IDEMPOTENCY_PENDING_SECONDS so a crashed worker cannot
+    block retries for long. Connections are opened lazily per thread and
+    per process, like the SQLite status store.
+    """
+
+    def __init__(self, path: str = IDEMPOTENCY_FILE, max_entries: int = IDEMPOTENCY_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block inside BEGIN IMMEDIATE ... COMMIT."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read one live entry without taking the write lock.
+
+        Returns:
+            Optional[Dict[str, Any]]: {"expires": t, "response": body or None},
+            or None if the key is unknown or expired
+        """
+        row = self._connect().execute(
+            "SELECT expires, response FROM responses WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return {"expires": row[0], "response": json.loads(row[1]) if row[1] is not None else None}
+
+    def _begin(self, keys: List[Tuple[str, float]]) -> Tuple[bool, Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Claim the keys for this request, or find the request that already holds one.
+
+        Returns:
+            Tuple of (claimed, matching key, stored response or None if still pending)
+        """
+        now = time.time()
+        with self._write_transaction() as conn:
+            for key, _ in keys:
+                row = conn.execute(
+                    "SELECT response FROM responses WHERE key = ? AND expires > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    return False, key, json.loads(row[0]) if row[0] is not None else None
+            conn.executemany(
+                "INSERT OR REPLACE INTO responses (key, expires, response) VALUES (?, ?, NULL)",
+                [(key, now + IDEMPOTENCY_PENDING_SECONDS) for key, _ in keys]
+            )
+        return True, None, None
+
+    def _finish(self, keys: List[Tuple[str, float]], response: Optional[Dict[str, Any]]) -> None:
+        """
+        Store the response under every key, or drop the keys if there is none.
+
+        Expired entries, and the oldest ones beyond max_entries, are pruned
+        in the same transaction.
+        """
+        now = time.time()
+        with self._write_transaction() as conn:
+            if response is None:
+                conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key, _ in keys])
+            else:
+                body = json.dumps(response)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO responses (key, expires, response) VALUES (?, ?, ?)",
+                    [(key, now + ttl, body) for key, ttl in keys]
+                )
+            conn.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+            conn.execute(
+                "DELETE FROM responses WHERE expires < "
+                "(SELECT expires FROM responses ORDER BY expires DESC LIMIT 1 OFFSET ?)",
+                (self.max_entries - 1,)
+            )
+
+    def _wait(self, key: str) -> Dict[str, Any]:
+        """Poll for the original request's response, up to IDEMPOTENCY_WAIT_SECONDS."""
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(_POLL_SECONDS)
+            entry = self.get(key)
+            if entry is None:
+                break
+            if entry["response"] is not None:
+                return entry["response"]
+        return IN_PROGRESS_RESPONSE
+
+    def run_once(self, keys: List[Tuple[str, float]], produce: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Return the response for a request, running `produce` only for the first of its duplicates.
+
+        Responses are stored only when `produce` returns; if it raises, the
+        keys are released so a retry runs the command again.
+
+        Args:
+            keys: Keys from command_keys()
+            produce: Builds the JSON response body
+
+        Returns:
+            Dict[str, Any]: The new or the original response body
+        """
+        if not keys:
+            return produce()
+        try:
+            claimed, key, response = self._begin(keys)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            logger.error(f"Idempotency cache unavailable, running command anyway: {e}")
+            return produce()
+        if not claimed:
+            reason = "retry" if key.startswith("trigger:") else "double_submit"
+            DUPLICATE_COMMANDS.labels(reason=reason).inc()
+            logger.info(f"Duplicate command ({reason}); returning the original response")
+            return response if response is not None else self._wait(key)
+        try:
+            response = produce()
+        except Exception:
+            self._finish(keys, None)
+            raise
+        self._finish(keys, response)
+        return response
+
+
+_cache: Optional[IdempotencyCache] = None
+
+
+def get_idempotency_cache() -> IdempotencyCache:
+    """Return the process-wide idempotency cache."""
+    global _cache
+    if _cache is None:
+        _cache = IdempotencyCache()
+    return _cache
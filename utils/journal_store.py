@@ -0,0 +1,228 @@
+"""Append-only event journal storage backend for GPU status."""
+import os
+import copy
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, Hashable, Iterator, List, Optional, Tuple
+from config import JOURNAL_FILE, SNAPSHOT_FILE, JOURNAL_COMPACT_EVERY
+from utils.file_utils import atomic_write, file_lock
+from utils.status_store import StatusStore, default_status
+
+logger = logging.getLogger(__name__)
+
+
+def _event_name(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> str:
+    """Infer the journal event name for a single GPU record change."""
+    if new is None:
+        return "remove"
+    if new.get('status') == 'available' and old and old.get('status') != 'available':
+        return "release"
+    if new.get('status') in ('in_use', 'shared') and (not old or old.get('status') == 'available'):
+        return "claim"
+    return "update"
+
+
+class JournalStatusStore(StatusStore):
+    """
+    Stores GPU state as a snapshot plus an append-only log of changes.
+    
+    Every claim, release and auto-expiry is appended as one fsync'd JSON
+    line to JOURNAL_FILE, so a mutation costs a single small append instead
+    of a full rewrite. Current state is the latest snapshot replayed with
+    the log tail written after it. Compaction only rewrites the snapshot;
+    the log itself is never truncated and doubles as the audit history.
+    """
+
+    def __init__(self, journal_path: str = JOURNAL_FILE, snapshot_path: str = SNAPSHOT_FILE):
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self.lock_path = f"{journal_path}.lock"
+        # Replayed state cached per process, so reads only parse the new log tail
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_lock = threading.RLock()
+
+    def _snapshot_key(self) -> Tuple[int, int]:
+        """Identify the current snapshot file by (inode, mtime)."""
+        try:
+            st = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            return 0, 0
+        return st.st_ino, st.st_mtime_ns
+
+    def _read_snapshot(self) -> Dict[str, Any]:
+        """Load the latest snapshot into a fresh cache entry."""
+        key = self._snapshot_key()
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            snapshot = {"offset": 0, "seq": 0, "status": default_status()}
+        return {
+            "key": key,
+            "snapshot_seq": snapshot['seq'],
+            "offset": snapshot['offset'],
+            "seq": snapshot['seq'],
+            "status": snapshot['status'],
+        }
+
+    def _replay(self) -> Dict[str, Any]:
+        """
+        Bring the cached state up to date with the log.
+        
+        Only complete lines are applied, so a half-written final line from a
+        concurrent writer is picked up on a later call instead; one left by a
+        crashed writer is cut off by the next _append().
+        
+        Returns:
+            Dict[str, Any]: Cache entry with offset, seq, snapshot_seq and
+                status; callers must not mutate it, and must hold
+                _cache_lock while reading it since other threads replay
+                into it in place
+        """
+        with self._cache_lock:
+            if self._cache is None or self._cache['key'] != self._snapshot_key():
+                self._cache = self._read_snapshot()
+            cache = self._cache
+
+            try:
+                with open(self.journal_path, 'rb') as f:
+                    f.seek(cache['offset'])
+                    tail = f.read()
+            except FileNotFoundError:
+                tail = b''
+
+            end = tail.rfind(b'\n') + 1
+            for line in tail[:end].splitlines():
+                entry = json.loads(line)
+                if entry['seq'] <= cache['seq']:
+                    continue
+                if entry['record'] is None:
+                    cache['status'].pop(entry['gpu_id'], None)
+                else:
+                    cache['status'][entry['gpu_id']] = entry['record']
+                cache['seq'] = entry['seq']
+            cache['offset'] += end
+            return cache
+
+    def _compact(self, offset: int, seq: int, status: Dict[str, Any]) -> None:
+        """Write a new snapshot covering the log up to `offset`."""
+        with self._cache_lock:
+            data = json.dumps({"offset": offset, "seq": seq, "status": status})
+        atomic_write(self.snapshot_path, data)
+        logger.info(f"Compacted journal snapshot at seq {seq}")
+
+    def _append(self, status: Dict[str, Any], event: Optional[str]) -> None:
+        """
+        Append the differences between the replayed state and `status`.
+        
+        Must be called under the store's file lock. Anything after the last
+        complete line was left by a writer that crashed mid-append; it is
+        truncated first so the new entries don't run on from it.
+        """
+        with self._cache_lock:
+            cache = self._replay()
+            current, seq, offset = dict(cache['status']), cache['seq'], cache['offset']
+        now = datetime.now(timezone.utc).isoformat()
+        entries: List[str] = []
+        for gpu_id in list(current.keys()) + [k for k in status if k not in current]:
+            old, new = current.get(gpu_id), status.get(gpu_id)
+            if old == new:
+                continue
+            seq += 1
+            entries.append(json.dumps({
+                "seq": seq,
+                "time": now,
+                "event": event or _event_name(old, new),
+                "gpu_id": gpu_id,
+                "record": new
+            }) + "\n")
+        if not entries:
+            return
+
+        try:
+            if os.path.getsize(self.journal_path) > offset:
+                logger.warning(f"Dropping incomplete last line of {self.journal_path}")
+                os.truncate(self.journal_path, offset)
+        except FileNotFoundError:
+            pass
+        with open(self.journal_path, 'a') as f:
+            f.write("".join(entries))
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Nothing else is appended while the file lock is held, so the
+        # replayed state stays at `offset` until the snapshot is written
+        with self._cache_lock:
+            cache = self._replay()
+            offset, seq, due = cache['offset'], cache['seq'], cache['seq'] - cache['snapshot_seq'] >= JOURNAL_COMPACT_EVERY
+        if due:
+            self._compact(offset, seq, cache['status'])
+
+    def initialize(self) -> bool:
+        if not os.path.exists(self.snapshot_path) and not os.path.exists(self.journal_path):
+            with file_lock(self.lock_path):
+                if not os.path.exists(self.snapshot_path):
+                    self._compact(0, 0, default_status())
+                    logger.info(f"Initialized journal snapshot at {self.snapshot_path}")
+        return True
+
+    def _current_status(self) -> Dict[str, Any]:
+        """Replay the log and copy the state before another thread can change it."""
+        with self._cache_lock:
+            return copy.deepcopy(self._replay()['status'])
+
+    def load(self) -> Dict[str, Any]:
+        return self._current_status()
+
+    def version(self) -> Optional[Hashable]:
+        # The log is append-only, so its size identifies the state; the
+        # snapshot key covers compaction.
+        try:
+            size = os.stat(self.journal_path).st_size
+        except FileNotFoundError:
+            size = 0
+        return self._snapshot_key(), size
+
+    def size_bytes(self) -> Optional[int]:
+        total = 0
+        for path in (self.journal_path, self.snapshot_path):
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    def save(self, status: Dict[str, Any]) -> None:
+        with file_lock(self.lock_path):
+            self._append(status, "update")
+
+    @contextmanager
+    def transaction(self, event: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        with file_lock(self.lock_path):
+            status = self._current_status()
+            yield status
+            self._append(status, event)
+
+    def history(self, gpu_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the full audit history in log order.
+        
+        Args:
+            gpu_id: Only yield events for this GPU if given
+            
+        Yields:
+            Dict[str, Any]: Journal entries with seq, time, event, gpu_id and record
+        """
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break
+                    entry = json.loads(line)
+                    if gpu_id is None or entry['gpu_id'] == gpu_id:
+                        yield entry
+        except FileNotFoundError:
+            return
@@ -0,0 +1,76 @@
+"""JSON file storage backend for GPU status."""
+import os
+import json
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any, Hashable, Iterator, Optional
+from config import STATUS_FILE
+from utils.file_utils import atomic_write, file_lock
+from utils.status_store import StatusStore, default_status
+
+logger = logging.getLogger(__name__)
+
+
+def _serialize(status: Dict[str, Any]) -> str:
+    """Serialize the status exactly as it is stored on disk."""
+    return json.dumps(status, indent=2)
+
+
+class JsonStatusStore(StatusStore):
+    """
+    Stores the whole GPU table in a single JSON file.
+    
+    Writers hold an exclusive flock on a sidecar lock file and replace the
+    status file atomically, so readers never need a lock.
+    """
+
+    def __init__(self, path: str = STATUS_FILE):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+
+    def initialize(self) -> bool:
+        if not os.path.exists(self.path):
+            with file_lock(self.lock_path):
+                if not os.path.exists(self.path):
+                    atomic_write(self.path, _serialize(default_status()))
+                    logger.info(f"Initialized status file at {self.path}")
+        return True
+
+    def load(self) -> Dict[str, Any]:
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def version(self) -> Optional[Hashable]:
+        # Every write renames a new file into place, so the inode changes
+        # along with mtime and size.
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def size_bytes(self) -> Optional[int]:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return None
+
+    def save(self, status: Dict[str, Any]) -> None:
+        with file_lock(self.lock_path):
+            atomic_write(self.path, _serialize(status))
+
+    @contextmanager
+    def transaction(self, event: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        with file_lock(self.lock_path):
+            try:
+                with open(self.path, 'r') as f:
+                    original = f.read()
+                status = json.loads(original)
+            except FileNotFoundError:
+                logger.warning("Status file not found, initializing...")
+                original = None
+                status = default_status()
+            yield status
+            if original is not None and _serialize(status) == original:
+                return
+            atomic_write(self.path, _serialize(status))
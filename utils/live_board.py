@@ -0,0 +1,182 @@
+"""Pinned live board messages, edited in place when the GPU table changes."""
+import json
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from config import (
+    LIVE_BOARD_BACKOFF_SECONDS, LIVE_BOARD_CHANNELS, LIVE_BOARD_DEBOUNCE_SECONDS, LIVE_BOARD_FILE,
+    LIVE_BOARD_MAX_CALLS_PER_MINUTE, LIVE_BOARD_MAX_DELAY_SECONDS, LIVE_BOARD_MIN_INTERVAL_SECONDS,
+    LIVE_BOARD_POLL_SECONDS, SLACK_BOT_TOKEN
+)
+from utils.file_utils import atomic_write
+from utils.gpu_sampler import get_sampler
+from utils.notifier import call_slack_api
+from utils.status_manager import get_status, get_store
+from utils.telemetry import TelemetrySnapshot
+
+logger = logging.getLogger(__name__)
+
+Renderer = Callable[[Dict[str, Any], Optional[TelemetrySnapshot]], List[Dict[str, Any]]]
+
+
+def blocks_digest(blocks: List[Dict[str, Any]]) -> str:
+    """Fingerprint of rendered blocks, to skip updates that would change nothing."""
+    return hashlib.sha1(json.dumps(blocks, sort_keys=True).encode()).hexdigest()
+
+
+class LiveBoard:
+    """
+    Keeps one board message per channel in sync with the GPU table.
+
+    Every LIVE_BOARD_POLL_SECONDS the board checks the store version and
+    the telemetry snapshot; only when one of them moved does it re-render,
+    and only a different rendering counts as a change. Changes are
+    coalesced: they are sent once no further change arrived for
+    LIVE_BOARD_DEBOUNCE_SECONDS (or LIVE_BOARD_MAX_DELAY_SECONDS after the
+    first one), never more often than LIVE_BOARD_MIN_INTERVAL_SECONDS or
+    LIVE_BOARD_MAX_CALLS_PER_MINUTE allow. A channel whose message already
+    shows the rendering is skipped.
+
+    Message timestamps and digests persist in `path`, so a restart or a
+    new scheduler leader edits the existing messages instead of posting
+    new ones. Run it in one process only (the scheduler leader).
+
+    Args:
+        render: Builds the board blocks from (status, telemetry snapshot)
+        channels: Slack channel IDs to keep a board in
+        path: JSON file of {channel: {"ts": ..., "digest": ...}}
+    """
+
+    def __init__(self, render: Renderer, channels: List[str] = LIVE_BOARD_CHANNELS, path: str = LIVE_BOARD_FILE):
+        self.render = render
+        self.channels = list(channels)
+        self.path = path
+        self._boards = self._load()
+        self._trigger: Optional[Tuple[Any, Any]] = None
+        self._blocks: List[Dict[str, Any]] = []
+        self._digest: Optional[str] = None
+        self._dirty_since: Optional[float] = None
+        self._last_change = 0.0
+        self._next_send = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        atomic_write(self.path, json.dumps(self._boards, indent=2))
+
+    def _observe(self, now: float) -> None:
+        """Re-render if the table or telemetry moved, and note a change if the rendering differs."""
+        snapshot = get_sampler().snapshot
+        version = get_store().version()
+        trigger = (version, None if snapshot is None else snapshot.taken_at)
+        if version is not None and trigger == self._trigger:
+            return
+        self._trigger = trigger
+        blocks = self.render(get_status(), snapshot)
+        digest = blocks_digest(blocks)
+        if digest == self._digest:
+            return
+        self._blocks, self._digest = blocks, digest
+        self._last_change = now
+        if self._dirty_since is None:
+            self._dirty_since = self._last_change
+
+    def _publish(self, channel: str) -> Tuple[int, bool]:
+        """
+        Bring one channel's board up to date.
+
+        Returns:
+            Tuple of (API calls made, whether the board now shows the rendering)
+        """
+        board = self._boards.get(channel, {})
+        payload = {"channel": channel, "text": "📌 Live GPU Board", "blocks": self._blocks}
+        calls = 0
+        if board.get('ts'):
+            body = call_slack_api("chat.update", {**payload, "ts": board['ts']})
+            calls += 1
+            if body and body.get('ok'):
+                self._boards[channel] = {"ts": board['ts'], "digest": self._digest}
+                return calls, True
+            if not body or body.get('error') != 'message_not_found':
+                return calls, False
+            logger.info(f"Live board in {channel} was deleted; posting a new one")
+
+        body = call_slack_api("chat.postMessage", payload)
+        calls += 1
+        if not body or not body.get('ok'):
+            return calls, False
+        self._boards[channel] = {"ts": body['ts'], "digest": self._digest}
+        # Pinning is best-effort; the board still works without pins:write
+        call_slack_api("pins.add", {"channel": channel, "timestamp": body['ts']})
+        return calls + 1, True
+
+    def tick(self, now: Optional[float] = None) -> int:
+        """
+        Check for changes and send the coalesced update once it is due.
+
+        Args:
+            now: Current time.monotonic() value
+
+        Returns:
+            int: Slack API calls made
+        """
+        now = time.monotonic() if now is None else now
+        self._observe(now)
+        if self._dirty_since is None or now < self._next_send:
+            return 0
+        if now - self._last_change < LIVE_BOARD_DEBOUNCE_SECONDS and \
+                now - self._dirty_since < LIVE_BOARD_MAX_DELAY_SECONDS:
+            return 0
+
+        calls, failed = 0, False
+        for channel in self.channels:
+            if self._boards.get(channel, {}).get('digest') == self._digest:
+                continue
+            made, ok = self._publish(channel)
+            calls += made
+            failed = failed or not ok
+        if calls:
+            self._save()
+        if failed:
+            # Includes rate limiting; retry the remaining channels later
+            self._next_send = now + LIVE_BOARD_BACKOFF_SECONDS
+        else:
+            self._dirty_since = None
+            self._next_send = now + max(LIVE_BOARD_MIN_INTERVAL_SECONDS, 60 * calls / LIVE_BOARD_MAX_CALLS_PER_MINUTE)
+        return calls
+
+    def start(self) -> None:
+        """Start the board thread if it isn't already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if not SLACK_BOT_TOKEN:
+            logger.warning("Live board disabled: SLACK_BOT_TOKEN is not set")
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="live-board", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the board thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        logger.info(f"Live board running for {len(self.channels)} channel(s)")
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Live board update failed: {e}", exc_info=True)
+            self._stop.wait(LIVE_BOARD_POLL_SECONDS)
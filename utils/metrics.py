@@ -0,0 +1,110 @@
+"""Prometheus metrics, safe to aggregate across gunicorn workers.
+
+When PROMETHEUS_MULTIPROC_DIR is set, every worker writes its samples to
+that directory and /metrics merges them (prometheus_client multiprocess
+mode). Without prometheus_client installed, all metrics are no-ops.
+"""
+import os
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+    )
+    from prometheus_client import multiprocess
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+# Lock waits and file operations are usually sub-millisecond
+_FAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+class _NoopMetric:
+    """Stand-in used when prometheus_client is not installed."""
+
+    def labels(self, *args: Any, **kwargs: Any) -> "_NoopMetric":
+        return self
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+
+if PROMETHEUS_AVAILABLE:
+    COMMAND_LATENCY = Histogram(
+        'gpu_bot_command_duration_seconds', 'Slash command handling time', ['action']
+    )
+    COMMAND_ERRORS = Counter(
+        'gpu_bot_command_errors_total', 'Slash commands that raised an unexpected error', ['action']
+    )
+    DUPLICATE_COMMANDS = Counter(
+        'gpu_bot_duplicate_commands_total', 'Retried or double-submitted commands answered from the cache', ['reason']
+    )
+    LOCK_WAIT = Histogram(
+        'gpu_bot_lock_wait_seconds', 'Time spent waiting to acquire a state lock', ['lock'],
+        buckets=_FAST_BUCKETS
+    )
+    LOCK_HOLD = Histogram(
+        'gpu_bot_lock_hold_seconds', 'Time a state lock was held', ['lock'],
+        buckets=_FAST_BUCKETS
+    )
+    TELEMETRY_LATENCY = Histogram(
+        'gpu_bot_telemetry_collect_seconds', 'Time to collect one telemetry snapshot', ['provider']
+    )
+    TELEMETRY_FAILURES = Counter(
+        'gpu_bot_telemetry_failures_total', 'Telemetry collections that failed', ['provider']
+    )
+    # Set by whichever worker serves the scrape; "mostrecent" keeps only
+    # the latest value across workers instead of summing them.
+    STATE_BYTES = Gauge(
+        'gpu_bot_state_size_bytes', 'Size of the GPU state storage', multiprocess_mode='mostrecent'
+    )
+    GPU_COUNT = Gauge(
+        'gpu_bot_gpus', 'GPUs by claim status', ['status'], multiprocess_mode='mostrecent'
+    )
+else:
+    COMMAND_LATENCY = COMMAND_ERRORS = DUPLICATE_COMMANDS = LOCK_WAIT = LOCK_HOLD = _NoopMetric()
+    TELEMETRY_LATENCY = TELEMETRY_FAILURES = STATE_BYTES = GPU_COUNT = _NoopMetric()
+
+
+@contextmanager
+def observe_duration(metric: Any) -> Iterator[None]:
+    """
+    Observe the wall-clock duration of a block on a (labelled) histogram.
+    
+    Args:
+        metric: Histogram, already labelled if it has labels
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric.observe(time.perf_counter() - start)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+    
+    Returns:
+        Tuple[bytes, str]: (response body, content type)
+    """
+    if not PROMETHEUS_AVAILABLE:
+        return b"# prometheus_client is not installed\n", "text/plain; charset=utf-8"
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,383 @@
+"""Memory-mapped, fixed-slot storage backend for GPU status."""
+import os
+import sys
+import json
+import mmap
+import struct
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Hashable, Iterator, List, Optional, Tuple
+from config import MMAP_CAPACITY, MMAP_SLOT_SIZE, MMAP_STATUS_FILE, STATUS_FILE
+from utils.file_utils import file_lock
+from utils.status_store import StatusStore, default_status
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"GPUTAB01"
+
+# magic, slot size, capacity, slots in use, generation (odd while a write
+# is in progress), change ring position (slot writes so far)
+_HEADER = struct.Struct("<8sIIIxxxxQQ")
+_HEADER_SIZE = 64
+_COUNT_OFFSET = 16
+_GENERATION_OFFSET = 24
+_POSITION_OFFSET = 32
+
+# Ring of the most recently written slot indices, so readers can decode
+# just the slots that changed since their previous load
+_RING_SLOTS = 1024
+_RING = struct.Struct(f"<{_RING_SLOTS}I")
+_SLOTS_OFFSET = _HEADER_SIZE + _RING.size
+
+# gpu_id, status code, claim/release time (µs since the epoch), then
+# (offset, length) of user_id, user_name, purpose and extra JSON in the
+# slot's string area
+_SLOT = struct.Struct("<32sB3xqq8H")
+
+_STATUS_CODES = {"available": 1, "in_use": 2}
+_STATUS_NAMES = {code: name for name, code in _STATUS_CODES.items()}
+_OTHER_STATUS = 3
+
+_STRING_FIELDS = ("user_id", "user_name", "purpose")
+_TIME_FIELDS = ("claim_time", "release_time")
+_KNOWN_FIELDS = ("status",) + _STRING_FIELDS + _TIME_FIELDS
+
+_NO_TIME = -(2 ** 63)
+_ABSENT = 0xFFFF
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Lock-free snapshot attempts before a reader falls back to the writer lock
+_READ_RETRIES = 100
+
+
+def _to_micros(value: Any) -> Optional[int]:
+    """Convert a stored ISO time (UTC) to µs since the epoch, or None if it isn't one."""
+    if not isinstance(value, str):
+        return None
+    try:
+        moment = datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    delta = moment - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def encode_slot(gpu_id: str, record: Dict[str, Any], slot_size: int = MMAP_SLOT_SIZE) -> bytes:
+    """
+    Encode one GPU record into a fixed-width slot.
+
+    Status and times are stored as numbers; strings go into the slot's own
+    string area, and any other fields as a small JSON object. An overlong
+    purpose is truncated to fit.
+
+    Raises:
+        ValueError: If the GPU ID or the record cannot fit in a slot
+    """
+    gpu_bytes = gpu_id.encode()
+    if not gpu_bytes or len(gpu_bytes) > 32:
+        raise ValueError(f"GPU ID '{gpu_id}' must be 1-32 bytes")
+    extra = {k: v for k, v in record.items() if k not in _KNOWN_FIELDS}
+    code = _STATUS_CODES.get(record.get('status'))
+    if code is None:
+        code = _OTHER_STATUS
+        extra['status'] = record.get('status')
+    times = []
+    for field in _TIME_FIELDS:
+        micros = _to_micros(record.get(field))
+        if micros is None and field in record:
+            extra[field] = record[field]
+        times.append(_NO_TIME if micros is None else micros)
+
+    strings = [record[field].encode() if isinstance(record.get(field), str) else None for field in _STRING_FIELDS]
+    for field, value in zip(_STRING_FIELDS, strings):
+        if value is None and field in record:
+            extra[field] = record[field]
+    strings.append(json.dumps(extra).encode() if extra else None)
+
+    room = slot_size - _SLOT.size
+    used = sum(len(s) for s in strings if s is not None)
+    if used > room and strings[2] is not None:
+        # Only the free-text purpose may be shortened; cut on a character boundary
+        keep = max(0, len(strings[2]) - (used - room))
+        strings[2] = strings[2][:keep].decode(errors='ignore').encode()
+        logger.warning(f"Purpose for GPU {gpu_id} truncated to fit a {slot_size}-byte slot")
+        used = sum(len(s) for s in strings if s is not None)
+    if used > room:
+        raise ValueError(f"Record for GPU {gpu_id} does not fit in a {slot_size}-byte slot")
+
+    spans, area, offset = [], b"", _SLOT.size
+    for value in strings:
+        if value is None:
+            spans += [0, _ABSENT]
+        else:
+            spans += [offset, len(value)]
+            area += value
+            offset += len(value)
+    return _SLOT.pack(gpu_bytes, code, *times, *spans) + area + bytes(slot_size - _SLOT.size - len(area))
+
+
+def decode_slot(data) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Decode a slot into (gpu_id, record), or None for an empty slot."""
+    gpu_bytes, code, *rest = _SLOT.unpack_from(data)
+    if code == 0:
+        return None
+    times, spans = rest[:2], rest[2:]
+    record: Dict[str, Any] = {"status": _STATUS_NAMES.get(code)}
+    values = []
+    for i in range(4):
+        offset, length = spans[2 * i], spans[2 * i + 1]
+        values.append(None if length == _ABSENT else bytes(data[offset:offset + length]).decode())
+    for field, value in zip(_STRING_FIELDS, values):
+        if value is not None:
+            record[field] = value
+    for field, micros in zip(_TIME_FIELDS, times):
+        if micros != _NO_TIME:
+            record[field] = (_EPOCH + timedelta(microseconds=micros)).isoformat()
+    if values[3] is not None:
+        record.update(json.loads(values[3]))
+    return gpu_bytes.rstrip(b"\0").decode(), record
+
+
+class MmapStatusStore(StatusStore):
+    """
+    Stores the GPU table as fixed-width slots in a memory-mapped file.
+
+    Every process maps the file once. Writers hold an flock, bump the
+    header's generation counter to an odd value, update only the changed
+    slots in place, log their indices in a small change ring and bump the
+    generation back to even. Readers take no lock and make no syscalls:
+    they copy what they need and retry if the generation was odd or moved
+    meanwhile (a seqlock). version() is the generation itself, and load()
+    decodes only the slots written since the previous load in this process.
+    """
+
+    def __init__(self, path: str = MMAP_STATUS_FILE, capacity: int = MMAP_CAPACITY,
+                 slot_size: int = MMAP_SLOT_SIZE):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self._map: Optional[mmap.mmap] = None
+        self._pid: Optional[int] = None
+        # State of the previous load, for incremental decoding; guarded by _cache_lock
+        self._cache_lock = threading.Lock()
+        self._position: Optional[int] = None
+        self._slot_ids: List[Optional[str]] = []
+        self._status: Dict[str, Any] = {}
+
+    def _mapping(self) -> mmap.mmap:
+        """Return this process's mapping, opening it on first use."""
+        if self._map is None or self._pid != os.getpid():
+            with open(self.path, 'r+b') as f:
+                self._map = mmap.mmap(f.fileno(), 0)
+            self._pid = os.getpid()
+            self._position = None
+            magic, slot_size, capacity, _, _, _ = _HEADER.unpack_from(self._map)
+            if magic != _MAGIC:
+                raise IOError(f"{self.path} is not a GPU status table")
+            self.slot_size, self.capacity = slot_size, capacity
+        return self._map
+
+    def _generation(self, mm: mmap.mmap) -> int:
+        return struct.unpack_from("<Q", mm, _GENERATION_OFFSET)[0]
+
+    def _slot_offset(self, index: int) -> int:
+        return _SLOTS_OFFSET + index * self.slot_size
+
+    def _slot_area(self, mm: mmap.mmap) -> bytes:
+        """Copy the slots in use; only consistent under the seqlock or the writer lock."""
+        count = struct.unpack_from("<I", mm, _COUNT_OFFSET)[0]
+        return mm[_SLOTS_OFFSET:self._slot_offset(count)]
+
+    def _slots(self, area: bytes) -> Iterator[bytes]:
+        for start in range(0, len(area), self.slot_size):
+            yield area[start:start + self.slot_size]
+
+    def _decode_all(self, area: bytes) -> Dict[str, Any]:
+        """Decode every slot into fresh (mutable) records."""
+        status = {}
+        for data in self._slots(area):
+            decoded = decode_slot(data)
+            if decoded is not None:
+                status[decoded[0]] = decoded[1]
+        return status
+
+    def _snapshot(self, mm: mmap.mmap) -> Tuple[int, bool, Dict[int, bytes]]:
+        """
+        Copy the slots changed since the previous load, or all of them when
+        the ring no longer covers that span.
+
+        Returns:
+            Tuple of (ring position, whether the copy is partial, slot bytes by index)
+        """
+        position = struct.unpack_from("<Q", mm, _POSITION_OFFSET)[0]
+        if self._position is not None and 0 <= position - self._position <= _RING_SLOTS:
+            ring = _RING.unpack_from(mm, _HEADER_SIZE)
+            indices = {ring[p % _RING_SLOTS] for p in range(self._position, position)}
+            return position, True, {i: mm[self._slot_offset(i):self._slot_offset(i + 1)] for i in indices}
+        return position, False, dict(enumerate(self._slots(self._slot_area(mm))))
+
+    def _create(self) -> None:
+        """Create the fixed-size file with an empty table; caller holds the lock."""
+        size = _SLOTS_OFFSET + self.capacity * self.slot_size
+        with open(self.path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, self.slot_size, self.capacity, 0, 0, 0))
+            f.truncate(size)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_changes(self, original: Dict[str, Any], status: Dict[str, Any]) -> None:
+        """Write changed records into their slots in place; caller holds the lock."""
+        changed = [gpu_id for gpu_id, record in status.items() if original.get(gpu_id) != record]
+        removed = [gpu_id for gpu_id in original if gpu_id not in status]
+        if not changed and not removed:
+            return
+        mm = self._mapping()
+        slots, free = {}, []
+        for index, data in enumerate(self._slots(self._slot_area(mm))):
+            if data[32]:
+                slots[data[:32].rstrip(b"\0").decode()] = index
+            else:
+                free.append(index)
+        writes = [(slots.pop(gpu_id), bytes(self.slot_size)) for gpu_id in removed if gpu_id in slots]
+        free += [index for index, _ in writes]
+        count = struct.unpack_from("<I", mm, _COUNT_OFFSET)[0]
+        for gpu_id in changed:
+            index = slots.get(gpu_id)
+            if index is None:
+                if free:
+                    index = free.pop(0)
+                elif count < self.capacity:
+                    index, count = count, count + 1
+                else:
+                    raise IOError(f"{self.path} is full ({self.capacity} GPUs); raise MMAP_CAPACITY")
+            writes.append((index, encode_slot(gpu_id, status[gpu_id], self.slot_size)))
+
+        generation = self._generation(mm)
+        position = struct.unpack_from("<Q", mm, _POSITION_OFFSET)[0]
+        struct.pack_into("<Q", mm, _GENERATION_OFFSET, generation + 1)
+        try:
+            for index, data in writes:
+                mm[self._slot_offset(index):self._slot_offset(index + 1)] = data
+                struct.pack_into("<I", mm, _HEADER_SIZE + 4 * (position % _RING_SLOTS), index)
+                position += 1
+            struct.pack_into("<I", mm, _COUNT_OFFSET, count)
+            struct.pack_into("<Q", mm, _POSITION_OFFSET, position)
+        finally:
+            struct.pack_into("<Q", mm, _GENERATION_OFFSET, generation + 2)
+        mm.flush()
+
+    def initialize(self) -> bool:
+        if not os.path.exists(self.path):
+            with file_lock(self.lock_path):
+                if not os.path.exists(self.path):
+                    self._create()
+                    self._write_changes({}, default_status())
+                    logger.info(f"Initialized status table at {self.path}")
+        return True
+
+    def load(self) -> Dict[str, Any]:
+        with self._cache_lock:
+            mm = self._mapping()
+            for _ in range(_READ_RETRIES):
+                generation = self._generation(mm)
+                if generation & 1:
+                    continue
+                position, partial, slots = self._snapshot(mm)
+                if self._generation(mm) == generation:
+                    break
+            else:
+                with file_lock(self.lock_path):
+                    position, partial, slots = self._snapshot(mm)
+
+            # Merge into copies so other threads never see a half-built table
+            if partial:
+                slot_ids, status = list(self._slot_ids), dict(self._status)
+            else:
+                slot_ids, status = [], {}
+            decoded = {index: decode_slot(data) for index, data in sorted(slots.items())}
+            if decoded:
+                slot_ids.extend([None] * (max(decoded) + 1 - len(slot_ids)))
+            # Drop replaced GPUs before adding, since a GPU may have moved to another slot
+            for index, entry in decoded.items():
+                previous = slot_ids[index]
+                if previous is not None and (entry is None or entry[0] != previous):
+                    status.pop(previous, None)
+            for index, entry in decoded.items():
+                slot_ids[index] = None if entry is None else entry[0]
+                if entry is not None:
+                    status[entry[0]] = entry[1]
+            self._slot_ids, self._status, self._position = slot_ids, status, position
+        # Records are shared with later loads; callers treat them as read-only
+        return dict(status)
+
+    def version(self) -> Optional[Hashable]:
+        try:
+            mm = self._mapping()
+        except FileNotFoundError:
+            return None
+        generation = self._generation(mm)
+        # Mid-write: report a token that never matches a cached version
+        return generation if not generation & 1 else object()
+
+    def fits(self, gpu_id: str, record: Dict[str, Any]) -> bool:
+        try:
+            # Reads the slot size the file was created with
+            self._mapping()
+        except FileNotFoundError:
+            pass
+        try:
+            encode_slot(gpu_id, record, self.slot_size)
+        except ValueError:
+            return False
+        return True
+
+    def size_bytes(self) -> Optional[int]:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return None
+
+    def save(self, status: Dict[str, Any]) -> None:
+        with file_lock(self.lock_path):
+            if not os.path.exists(self.path):
+                self._create()
+            self._write_changes(self._decode_all(self._slot_area(self._mapping())), status)
+
+    @contextmanager
+    def transaction(self, event: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        with file_lock(self.lock_path):
+            if not os.path.exists(self.path):
+                logger.warning("Status table not found, initializing...")
+                self._create()
+            original = self._decode_all(self._slot_area(self._mapping()))
+            status = json.loads(json.dumps(original)) if original else default_status()
+            yield status
+            self._write_changes(original, status)
+
+    def migrate_from_json(self, json_path: str = STATUS_FILE) -> int:
+        """
+        One-shot import of an existing gpu_status.json into the table.
+
+        Args:
+            json_path: Path of the JSON status file to import
+
+        Returns:
+            int: Number of GPU records imported
+        """
+        with open(json_path, 'r') as f:
+            status = json.load(f)
+        self.save(status)
+        logger.info(f"Migrated {len(status)} GPUs from {json_path} to {self.path}")
+        return len(status)
+
+
+if __name__ == '__main__':
+    # Usage: python -m utils.mmap_store migrate [gpu_status.json]
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[1:]
+    if not args or args[0] != 'migrate':
+        sys.exit("Usage: python -m utils.mmap_store migrate [json_path]")
+    MmapStatusStore().migrate_from_json(args[1] if len(args) > 1 else STATUS_FILE)
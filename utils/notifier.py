@@ -0,0 +1,89 @@
+"""Direct messages to Slack users via the Web API (chat.postMessage)."""
+import json
+import logging
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from config import NOTIFY_WORKERS, SLACK_API_URL, SLACK_BOT_TOKEN
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def call_slack_api(method: str, payload: Dict[str, Any], token: Optional[str] = SLACK_BOT_TOKEN,
+                   api_url: str = SLACK_API_URL) -> Optional[Dict[str, Any]]:
+    """
+    Call a Slack Web API method.
+    
+    Without a token the call is only logged, so the bot works (minus
+    notifications) when no bot token is configured.
+    
+    Args:
+        method: API method, e.g. "chat.postMessage"
+        payload: JSON body
+        token: Bot token (xoxb-...)
+        api_url: Base URL of the Web API
+        
+    Returns:
+        Optional[Dict[str, Any]]: Decoded response, or None if not sent or failed
+    """
+    if not token:
+        logger.info(f"[slack stub] {method}: {json.dumps(payload)}")
+        return None
+    request = urllib.request.Request(
+        f"{api_url.rstrip('/')}/{method}",
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json; charset=utf-8", "Authorization": f"Bearer {token}"},
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            body = json.loads(response.read() or b'{}')
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        logger.error(f"Slack API call {method} failed: {e}")
+        return None
+    if not body.get('ok', False):
+        logger.error(f"Slack API call {method} returned error: {body.get('error')}")
+    return body
+
+
+def send_direct_message(user_id: str, text: str, blocks: Optional[List[Dict[str, Any]]] = None) -> bool:
+    """
+    Send a direct message to a user (synchronously).
+    
+    Args:
+        user_id: Slack user ID; chat.postMessage opens the DM channel
+        text: Message text (also the notification fallback for blocks)
+        blocks: Optional Block Kit blocks
+        
+    Returns:
+        bool: True if Slack accepted the message
+    """
+    payload: Dict[str, Any] = {"channel": user_id, "text": text}
+    if blocks:
+        payload["blocks"] = blocks
+    body = call_slack_api("chat.postMessage", payload)
+    return bool(body and body.get('ok'))
+
+
+def notify_user(user_id: str, text: str, blocks: Optional[List[Dict[str, Any]]] = None) -> Future:
+    """
+    Send a direct message from a background thread.
+    
+    Args:
+        user_id: Slack user ID
+        text: Message text
+        blocks: Optional Block Kit blocks
+        
+    Returns:
+        Future: Resolves to the result of send_direct_message()
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=NOTIFY_WORKERS, thread_name_prefix="notify")
+    return _executor.submit(send_direct_message, user_id, text, blocks)
@@ -0,0 +1,153 @@
+"""Reconcile GPU claims with live telemetry to find idle claims.
+
+A claimed GPU is idle when its utilization is at or below
+IDLE_UTILIZATION_PERCENT and no compute process is running on it. The
+reconciler records when a claim went idle on the claim record itself
+(`idle_since`, `idle_warned_at`) so the state survives scheduler failover,
+warns the holder after IDLE_WARN_MINUTES and, in "release" mode, releases
+the claim IDLE_GRACE_MINUTES after the warning. It also reports the
+reverse case: compute processes on GPUs nobody has claimed.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+from config import (
+    IDLE_GRACE_MINUTES, IDLE_RECLAIM, IDLE_UTILIZATION_PERCENT, IDLE_WARN_MINUTES, TELEMETRY_INTERVAL_SECONDS
+)
+from utils.gpu_sampler import get_sampler
+from utils.notifier import notify_user
+from utils.shares import SHARED
+from utils.telemetry import GpuSample, ProcessSample, TelemetrySnapshot
+from utils.waitlist import hand_off, notify_hand_offs, waitlist_transaction
+
+logger = logging.getLogger(__name__)
+
+IDLE_FIELDS = ("idle_since", "idle_warned_at")
+
+# Unclaimed GPUs with processes already logged, so each is reported once
+_reported_orphans: set = set()
+
+
+class GpuActivity(NamedTuple):
+    """Claim state joined with telemetry for one local GPU."""
+    gpu_id: str
+    claim: Dict[str, Any]
+    sample: GpuSample
+    processes: Tuple[ProcessSample, ...]
+
+    @property
+    def claimed(self) -> bool:
+        """Whether someone holds the GPU."""
+        return self.claim.get('status') == 'in_use'
+
+    @property
+    def idle(self) -> bool:
+        """No compute processes and reported utilization at or below the threshold."""
+        utilization = self.sample.utilization
+        return not self.processes and utilization is not None and utilization <= IDLE_UTILIZATION_PERCENT
+
+
+def join_activity(status: Dict[str, Any], snapshot: TelemetrySnapshot) -> List[GpuActivity]:
+    """
+    Join local GPU claims with a telemetry snapshot by GPU index.
+
+    Args:
+        status: GPU status table
+        snapshot: Telemetry for this host
+
+    Returns:
+        List[GpuActivity]: One entry per sampled GPU that is in the status
+    """
+    by_uuid: Dict[str, List[ProcessSample]] = {}
+    for process in snapshot.processes:
+        by_uuid.setdefault(process.gpu_uuid, []).append(process)
+    return [
+        GpuActivity(gpu.index, status[gpu.index], gpu, tuple(by_uuid.get(gpu.uuid, ())))
+        for gpu in snapshot.gpus if gpu.index in status
+    ]
+
+
+def idle_for(claim: Dict[str, Any], now: datetime) -> Optional[timedelta]:
+    """How long a claim has been idle, or None if it is not marked idle."""
+    if 'idle_since' not in claim:
+        return None
+    return now - datetime.fromisoformat(claim['idle_since'])
+
+
+def fresh_snapshot() -> Optional[TelemetrySnapshot]:
+    """The latest snapshot, or None if it is unusable for reconciliation."""
+    snapshot = get_sampler().latest()
+    if snapshot.error is not None or not snapshot.gpus:
+        return None
+    # A stalled sampler must not make busy GPUs look idle
+    if snapshot.age > 3 * TELEMETRY_INTERVAL_SECONDS:
+        return None
+    return snapshot
+
+
+def reconcile_idle_claims(now: Optional[datetime] = None, mode: str = IDLE_RECLAIM) -> List[str]:
+    """
+    Update idle markers on claims, warn holders and release idle claims.
+
+    Args:
+        now: Current time (defaults to the current UTC time)
+        mode: "off", "warn" (mark and warn only) or "release"
+
+    Returns:
+        List[str]: GPU IDs released for being idle
+    """
+    if mode == "off":
+        return []
+    snapshot = fresh_snapshot()
+    if snapshot is None:
+        return []
+    now = now or datetime.now(timezone.utc)
+    warn_after = timedelta(minutes=IDLE_WARN_MINUTES)
+    grace = timedelta(minutes=IDLE_GRACE_MINUTES)
+
+    warnings, released, orphans = [], [], []
+    with waitlist_transaction(event="reclaim") as (queue, status):
+        for activity in join_activity(status, snapshot):
+            claim = status[activity.gpu_id]
+            if claim.get('status') == SHARED:
+                # Processes of different shares cannot be told apart, so shares are not idle-tracked
+                continue
+            if not activity.claimed:
+                if activity.processes:
+                    orphans.append(activity)
+                continue
+            if not activity.idle:
+                if any(field in claim for field in IDLE_FIELDS):
+                    status[activity.gpu_id] = {k: v for k, v in claim.items() if k not in IDLE_FIELDS}
+                continue
+
+            claim = dict(claim)
+            claim.setdefault('idle_since', now.isoformat())
+            if 'idle_warned_at' not in claim:
+                if idle_for(claim, now) >= warn_after:
+                    claim['idle_warned_at'] = now.isoformat()
+                    warnings.append((activity.gpu_id, claim))
+            elif mode == "release" and now - datetime.fromisoformat(claim['idle_warned_at']) >= grace:
+                logger.info(f"Releasing idle GPU {activity.gpu_id} (claimed by {claim.get('user_name', 'Unknown')})")
+                status[activity.gpu_id] = {"status": "available"}
+                released.append((activity.gpu_id, claim))
+                continue
+            status[activity.gpu_id] = claim
+        hand_offs = hand_off(queue, status, [gpu_id for gpu_id, _ in released])
+
+    for gpu_id, claim in warnings:
+        minutes = int(idle_for(claim, now).total_seconds() // 60)
+        action = (f"It will be released in {IDLE_GRACE_MINUTES} minutes unless it gets busy again."
+                  if mode == "release" else "Please release it if you no longer need it.")
+        notify_user(claim['user_id'], f"💤 GPU {gpu_id} has been idle for {minutes} minutes. {action}")
+    for gpu_id, claim in released:
+        notify_user(claim['user_id'], f"♻️ GPU {gpu_id} was released after staying idle past the grace period.")
+    notify_hand_offs(hand_offs)
+    current = {activity.gpu_id for activity in orphans}
+    for activity in orphans:
+        if activity.gpu_id not in _reported_orphans:
+            pids = ", ".join(p.pid for p in activity.processes)
+            logger.warning(f"GPU {activity.gpu_id} is unclaimed but running processes (PIDs: {pids})")
+    _reported_orphans.intersection_update(current)
+    _reported_orphans.update(current)
+    return [gpu_id for gpu_id, _ in released]
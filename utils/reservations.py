@@ -0,0 +1,282 @@
+"""Future GPU reservations with a sorted-interval index per GPU."""
+import os
+import json
+import bisect
+import heapq
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Hashable, Iterator, List, Optional, Tuple
+from config import INDIA_TZ, RESERVATIONS_FILE
+from utils.file_utils import atomic_write, file_lock
+from utils.notifier import notify_user
+from utils.shares import gpu_claims
+from utils.waitlist import claim_record, enqueue, waitlist_transaction
+
+logger = logging.getLogger(__name__)
+
+
+def _timestamp(value: str) -> float:
+    """Parse a stored ISO time (UTC) into a POSIX timestamp."""
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+class ReservationIndex:
+    """
+    Bookings kept as sorted, non-overlapping (start, end, id) lists per GPU.
+
+    Because bookings on one GPU never overlap, sorting by start also sorts
+    by end, so overlap checks and free-slot searches are a bisect plus a
+    look at the neighbouring bookings: O(log n) per GPU.
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        self.next_id: int = data.get("next_id", 1)
+        self._by_id: Dict[int, Dict[str, Any]] = {}
+        self._by_gpu: Dict[str, List[Tuple[float, float, int]]] = {}
+        for booking in data.get("reservations", []):
+            self._insert(booking)
+
+    def _insert(self, booking: Dict[str, Any]) -> None:
+        key = (_timestamp(booking["start"]), _timestamp(booking["end"]), booking["id"])
+        bisect.insort(self._by_gpu.setdefault(booking["gpu_id"], []), key)
+        self._by_id[booking["id"]] = booking
+
+    def to_data(self) -> Dict[str, Any]:
+        """Serializable form, ordered by start time."""
+        bookings = sorted(self._by_id.values(), key=lambda b: (b["start"], b["id"]))
+        return {"next_id": self.next_id, "reservations": bookings}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, reservation_id: int) -> Optional[Dict[str, Any]]:
+        """Look up a booking by ID."""
+        return self._by_id.get(reservation_id)
+
+    def conflict(self, gpu_id: str, start: datetime, end: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Find a booking on `gpu_id` that overlaps [start, end).
+
+        Returns:
+            Optional[Dict[str, Any]]: An overlapping booking, or None
+        """
+        intervals = self._by_gpu.get(gpu_id, [])
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        position = bisect.bisect_left(intervals, (start_ts,))
+        # Only the booking just before and the one at `position` can overlap
+        if position > 0 and intervals[position - 1][1] > start_ts:
+            return self._by_id[intervals[position - 1][2]]
+        if position < len(intervals) and intervals[position][0] < end_ts:
+            return self._by_id[intervals[position][2]]
+        return None
+
+    def first_free_slot(self, gpu_id: str, after: datetime, duration: timedelta) -> datetime:
+        """
+        Return the earliest start >= `after` where `duration` fits on `gpu_id`.
+
+        Args:
+            gpu_id: GPU to search
+            after: Earliest acceptable start
+            duration: Length of the slot needed
+
+        Returns:
+            datetime: Start of the first free slot (aware UTC)
+        """
+        intervals = self._by_gpu.get(gpu_id, [])
+        candidate, length = after.timestamp(), duration.total_seconds()
+        position = bisect.bisect_left(intervals, (candidate,))
+        if position > 0:
+            candidate = max(candidate, intervals[position - 1][1])
+        for start_ts, end_ts, _ in intervals[position:]:
+            if candidate + length <= start_ts:
+                break
+            candidate = max(candidate, end_ts)
+        return datetime.fromtimestamp(candidate, timezone.utc)
+
+    def add(self, gpu_id: str, user_id: str, user_name: str, purpose: str,
+            start: datetime, end: datetime) -> Dict[str, Any]:
+        """
+        Book [start, end) on a GPU.
+
+        Raises:
+            ValueError: If the slot overlaps an existing booking
+        """
+        if self.conflict(gpu_id, start, end) is not None:
+            raise ValueError(f"GPU {gpu_id} is already reserved in that slot")
+        booking = {
+            "id": self.next_id,
+            "gpu_id": gpu_id,
+            "user_id": user_id,
+            "user_name": user_name,
+            "purpose": purpose,
+            "start": start.isoformat(),
+            "end": end.isoformat()
+        }
+        self.next_id += 1
+        self._insert(booking)
+        return booking
+
+    def remove(self, reservation_id: int) -> Optional[Dict[str, Any]]:
+        """Remove a booking; returns it, or None if unknown."""
+        booking = self._by_id.pop(reservation_id, None)
+        if booking is not None:
+            intervals = self._by_gpu[booking["gpu_id"]]
+            key = (_timestamp(booking["start"]), _timestamp(booking["end"]), reservation_id)
+            del intervals[bisect.bisect_left(intervals, key)]
+        return booking
+
+    def for_gpu(self, gpu_id: str, now: datetime, limit: int) -> List[Dict[str, Any]]:
+        """Upcoming or active bookings on one GPU, soonest first."""
+        intervals = self._by_gpu.get(gpu_id, [])
+        position = bisect.bisect_right(intervals, (now.timestamp(), float('inf')))
+        if position > 0 and intervals[position - 1][1] > now.timestamp():
+            position -= 1
+        return [self._by_id[key[2]] for key in intervals[position:position + limit]]
+
+    def upcoming(self, now: datetime, limit: int) -> List[Dict[str, Any]]:
+        """The next `limit` bookings that have not ended, across all GPUs."""
+        now_ts = now.timestamp()
+        tails = []
+        for intervals in self._by_gpu.values():
+            position = bisect.bisect_left(intervals, (now_ts,))
+            if position > 0 and intervals[position - 1][1] > now_ts:
+                position -= 1
+            tails.append(intervals[position:position + limit])
+        return [self._by_id[key[2]] for key in heapq.merge(*tails)][:limit]
+
+    def due(self, now: datetime) -> List[Dict[str, Any]]:
+        """Bookings whose slot has started, oldest first."""
+        now_ts = now.timestamp()
+        started = []
+        for intervals in self._by_gpu.values():
+            position = bisect.bisect_right(intervals, (now_ts, float('inf')))
+            started.extend(self._by_id[key[2]] for key in intervals[:position])
+        return sorted(started, key=lambda b: b["start"])
+
+    def next_start(self) -> Optional[datetime]:
+        """Start of the earliest booking, if any."""
+        starts = [intervals[0][0] for intervals in self._by_gpu.values() if intervals]
+        return datetime.fromtimestamp(min(starts), timezone.utc) if starts else None
+
+
+class ReservationBook:
+    """
+    The reservation calendar stored in one JSON file.
+
+    Writers hold an flock on a sidecar lock file and replace the file
+    atomically. index() caches the parsed index until the file changes.
+    Lock order: the reservation lock comes before the waitlist and status
+    locks.
+    """
+
+    def __init__(self, path: str = RESERVATIONS_FILE):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self._cache: Optional[Tuple[Hashable, ReservationIndex]] = None
+        self._cache_lock = threading.Lock()
+
+    def _version(self) -> Optional[Hashable]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def index(self) -> ReservationIndex:
+        """Return the current index (shared; treat as read-only)."""
+        version = self._version()
+        with self._cache_lock:
+            if self._cache is not None and version is not None and self._cache[0] == version:
+                return self._cache[1]
+        index = ReservationIndex(self._load())
+        with self._cache_lock:
+            self._cache = (version, index)
+        return index
+
+    @contextmanager
+    def transaction(self) -> Iterator[ReservationIndex]:
+        """Exclusive read-modify-write access to the calendar."""
+        with file_lock(self.lock_path):
+            data = self._load()
+            index = ReservationIndex(data)
+            yield index
+            new_data = index.to_data()
+            if new_data != {"next_id": data.get("next_id", 1), "reservations": data.get("reservations", [])} \
+                    or not os.path.exists(self.path):
+                atomic_write(self.path, json.dumps(new_data, indent=2))
+
+
+_book: Optional[ReservationBook] = None
+
+
+def get_reservation_book() -> ReservationBook:
+    """Return the process-wide reservation calendar."""
+    global _book
+    if _book is None:
+        _book = ReservationBook()
+    return _book
+
+
+def activate_due(now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Turn bookings whose slot has started into live claims.
+
+    A free GPU is claimed for the booker until the booking ends. If the GPU
+    is still held by someone else, the booker is put at the front of the
+    waitlist for it (with the same end time) and the holder is asked to
+    release it.
+
+    Args:
+        now: Current time (defaults to the current UTC time)
+
+    Returns:
+        List[Dict[str, Any]]: Bookings that became claims immediately
+    """
+    now = now or datetime.now(timezone.utc)
+    book = get_reservation_book()
+    if not book.index().due(now):
+        return []
+
+    activated, queued = [], []
+    with book.transaction() as index:
+        due = index.due(now)
+        if not due:
+            return []
+        with waitlist_transaction(event="reserve") as (queue, status):
+            for booking in due:
+                index.remove(booking["id"])
+                gpu_id = booking["gpu_id"]
+                info = status.get(gpu_id)
+                if info is None or datetime.fromisoformat(booking["end"]) <= now:
+                    logger.warning(f"Dropping reservation #{booking['id']} on GPU {gpu_id}: GPU gone or slot over")
+                    continue
+                entry = {**booking, "until": booking["end"]}
+                if info.get('status') == 'available' or info.get('user_id') == booking["user_id"]:
+                    status[gpu_id] = claim_record(entry, now)
+                    activated.append(booking)
+                else:
+                    enqueue(queue, booking["user_id"], booking["user_name"], gpu_id, booking["purpose"],
+                            "reserved", until=booking["end"], front=True)
+                    queued.append((booking, info))
+                logger.info(f"Activated reservation #{booking['id']} on GPU {gpu_id} for {booking['user_name']}")
+
+    for booking in activated:
+        end = datetime.fromisoformat(booking["end"]).astimezone(INDIA_TZ).strftime('%I:%M %p IST')
+        notify_user(booking["user_id"], f"📅 Your reservation started: GPU {booking['gpu_id']} is yours until ~{end}.")
+    for booking, info in queued:
+        notify_user(booking["user_id"], f"📅 Your reservation on GPU {booking['gpu_id']} started, but it is still in use. "
+                                        "You are first in line and will get it as soon as it is released.")
+        for claim in gpu_claims(info):
+            notify_user(claim.get('user_id'), f"⚠️ GPU {booking['gpu_id']} is reserved by {booking['user_name']} from now. "
+                                              f"Please `/gpu release {booking['gpu_id']}` as soon as you can.")
+    return activated
@@ -0,0 +1,131 @@
+"""Fractional GPU claims: several memory-budgeted shares on one GPU.
+
+A GPU holding shares has the record
+    {"status": "shared", "memory_total_mb": 81920, "shares": [share, ...]}
+where each share carries the usual claim fields (user_id, user_name,
+purpose, claim_time, release_time) plus the "memory_mb" it reserved and,
+on GPUs partitioned with MIG (config.MIG_INSTANCES), the "mig_instance" it
+runs on. Whole-GPU claims cannot take a shared GPU, and the GPU becomes
+available again when its last share ends.
+"""
+import re
+from typing import Any, Callable, Dict, List
+
+SHARED = "shared"
+
+_MEMORY_RE = re.compile(r'^(\d+(?:\.\d+)?)\s*([gm]i?b?)?$', re.IGNORECASE)
+
+
+def parse_memory(text: str) -> int:
+    """
+    Parse a memory budget such as "20G", "20GB", "512M" or "20" (GB).
+
+    Args:
+        text: Budget as typed by the user
+
+    Returns:
+        int: Budget in MiB
+
+    Raises:
+        ValueError: If the budget is malformed or not positive
+    """
+    match = _MEMORY_RE.match(text.strip())
+    if not match:
+        raise ValueError(f"invalid memory budget '{text}'")
+    value, unit = float(match.group(1)), (match.group(2) or "g")[0].lower()
+    memory_mb = int(value * 1024) if unit == "g" else int(value)
+    if memory_mb <= 0:
+        raise ValueError(f"invalid memory budget '{text}'")
+    return memory_mb
+
+
+def format_memory(memory_mb: int) -> str:
+    """Format MiB for messages, e.g. 20480 -> "20G" and 512 -> "512M"."""
+    if memory_mb % 1024 == 0:
+        return f"{memory_mb // 1024}G"
+    if memory_mb >= 1024:
+        return f"{memory_mb / 1024:.1f}G"
+    return f"{memory_mb}M"
+
+
+def gpu_claims(info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    List the claims held on one GPU.
+
+    Args:
+        info: GPU status record
+
+    Returns:
+        List[Dict[str, Any]]: The record itself for a whole-GPU claim, its
+        shares for a shared GPU, and nothing for a free GPU
+    """
+    state = info.get('status')
+    if state == 'in_use':
+        return [info]
+    if state == SHARED:
+        return list(info.get('shares', ()))
+    return []
+
+
+def reserved_mb(info: Dict[str, Any]) -> int:
+    """Memory reserved by the shares on a GPU."""
+    return sum(share.get('memory_mb', 0) for share in info.get('shares', ()))
+
+
+def add_share(info: Dict[str, Any], share: Dict[str, Any], memory_total_mb: int) -> Dict[str, Any]:
+    """
+    Build the record of a free or shared GPU with one more share.
+
+    Args:
+        info: Current GPU status record
+        share: The new share
+        memory_total_mb: GPU memory the shares are packed into
+
+    Returns:
+        Dict[str, Any]: New record; `info` is left unchanged
+    """
+    shares = list(info.get('shares', ())) if info.get('status') == SHARED else []
+    return {"status": SHARED, "memory_total_mb": memory_total_mb, "shares": shares + [dict(share)]}
+
+
+def keep_shares(info: Dict[str, Any], keep: Callable[[Dict[str, Any]], bool]) -> Dict[str, Any]:
+    """
+    Build the record of a shared GPU without the shares `keep` rejects.
+
+    Args:
+        info: Shared GPU record
+        keep: Returns True for shares that stay
+
+    Returns:
+        Dict[str, Any]: New record, {"status": "available"} once no share
+        is left; `info` is left unchanged
+    """
+    shares = [share for share in info.get('shares', ()) if keep(share)]
+    if not shares:
+        return {"status": "available"}
+    return {**info, "shares": shares}
+
+
+def release_user(info: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """
+    Build a GPU's record without the claims `user_id` holds on it.
+
+    Args:
+        info: GPU status record
+        user_id: Slack user ID
+
+    Returns:
+        Dict[str, Any]: New record; a whole-GPU claim or the last share
+        leaves the GPU available
+    """
+    if info.get('status') == SHARED:
+        return keep_shares(info, lambda share: share.get('user_id') != user_id)
+    return {"status": "available"}
+
+
+def share_summary(info: Dict[str, Any]) -> str:
+    """Describe a shared GPU in one line, e.g. "30G of 80G reserved · Ana 20G, Bo 10G"."""
+    holders = ", ".join(f"{share.get('user_name', 'Unknown')} {format_memory(share.get('memory_mb', 0))}"
+                        for share in info.get('shares', ()))
+    return (f"{format_memory(reserved_mb(info))} of {format_memory(info.get('memory_total_mb', 0))} "
+            f"reserved · {holders}")
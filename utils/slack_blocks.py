@@ -1,5 +1,8 @@
 """Slack Block Kit UI component builders."""
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+# Slack rejects messages with more blocks than this
+MAX_BLOCKS = 50
 
 
 def create_success_block(title: str, message: str, emoji: str = "✅") -> List[Dict[str, Any]]:
@@ -44,4 +47,81 @@ def create_info_block(title: str, message: str, emoji: str = "ℹ️") -> List[D
     Returns:
         List of Slack block elements
     """
-    return [{"type": "section", "text": {"type": "mrkdwn", "text": f"{emoji} *{title}*\n{message}"}}]
\ No newline at end of file
+    return [{"type": "section", "text": {"type": "mrkdwn", "text": f"{emoji} *{title}*\n{message}"}}]
+
+
+def create_unexpected_error_response(error: Exception) -> Dict[str, Any]:
+    """
+    Create the ephemeral response body for an unhandled command error.
+    
+    Args:
+        error: The exception raised while processing the command
+        
+    Returns:
+        Slack response body with an error block
+    """
+    return {
+        "response_type": "ephemeral",
+        "blocks": create_error_block("Error", f"An unexpected error occurred: {str(error)}")
+    }
+
+
+def parse_page_args(args: List[str]) -> Tuple[int, List[str]]:
+    """
+    Split a `page N` option out of command arguments.
+    
+    Args:
+        args: Command arguments, e.g. ["free", "page", "2"]
+        
+    Returns:
+        Tuple[int, List[str]]: (1-based page number, remaining arguments)
+    """
+    page = 1
+    rest = []
+    i = 0
+    while i < len(args):
+        if args[i].lower() == "page" and i + 1 < len(args) and args[i + 1].isdigit():
+            page = max(1, int(args[i + 1]))
+            i += 2
+            continue
+        rest.append(args[i])
+        i += 1
+    return page, rest
+
+
+def paginate(items: Sequence[Any], page: int, per_page: int) -> Tuple[Sequence[Any], int, int]:
+    """
+    Slice one page out of a sequence.
+    
+    Args:
+        items: Items to paginate
+        page: Requested 1-based page (clamped to the valid range)
+        per_page: Items per page
+        
+    Returns:
+        Tuple of (items on the page, page actually shown, total pages)
+    """
+    pages = max(1, -(-len(items) // per_page))
+    page = min(max(1, page), pages)
+    start = (page - 1) * per_page
+    return items[start:start + per_page], page, pages
+
+
+def create_page_footer(page: int, pages: int, command: str) -> Optional[Dict[str, Any]]:
+    """
+    Create a context block telling the user how to reach other pages.
+    
+    Args:
+        page: Page being shown
+        pages: Total number of pages
+        command: Command to repeat with `page N`, e.g. "/gpu status used"
+        
+    Returns:
+        A context block, or None when everything fits on one page
+    """
+    if pages <= 1:
+        return None
+    hint = f"Page {page} of {pages}"
+    if page < pages:
+        hint += f" | Next: `{command} page {page + 1}`"
+    return {"type": "context", "elements": [{"type": "mrkdwn", "text": f"📄 {hint}"}]}
@@ -0,0 +1,250 @@
+"""SQLite storage backend for GPU status."""
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Hashable, Iterator, List, Optional, Tuple
+from config import STATUS_FILE, SQLITE_STATUS_FILE
+from utils.metrics import LOCK_HOLD, LOCK_WAIT
+from utils.status_store import StatusStore, configured_gpu_ids
+
+logger = logging.getLogger(__name__)
+
+# Record fields that get their own column; anything else is kept in `extra`.
+_COLUMNS = ("user_id", "user_name", "purpose", "claim_time", "release_time")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS gpus (
+    gpu_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'available',
+    user_id TEXT,
+    user_name TEXT,
+    purpose TEXT,
+    claim_time TEXT,
+    release_time TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_gpus_user_id ON gpus(user_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0);
+"""
+
+_BUMP_GENERATION = "UPDATE meta SET value = value + 1 WHERE key = 'generation'"
+
+_SELECT = "SELECT gpu_id, status, user_id, user_name, purpose, claim_time, release_time, extra FROM gpus"
+
+_UPSERT = """
+INSERT INTO gpus (gpu_id, status, user_id, user_name, purpose, claim_time, release_time, extra)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(gpu_id) DO UPDATE SET
+    status = excluded.status,
+    user_id = excluded.user_id,
+    user_name = excluded.user_name,
+    purpose = excluded.purpose,
+    claim_time = excluded.claim_time,
+    release_time = excluded.release_time,
+    extra = excluded.extra
+"""
+
+
+def _row_to_record(row: Tuple) -> Dict[str, Any]:
+    """Convert a `gpus` row into a status record."""
+    record = {"status": row[1]}
+    for column, value in zip(_COLUMNS, row[2:7]):
+        if value is not None:
+            record[column] = value
+    if row[7]:
+        record.update(json.loads(row[7]))
+    return record
+
+
+def _record_to_row(gpu_id: str, record: Dict[str, Any]) -> Tuple:
+    """Convert a status record into a `gpus` row."""
+    extra = {k: v for k, v in record.items() if k != 'status' and k not in _COLUMNS}
+    return (
+        gpu_id,
+        record.get('status', 'available'),
+        *(record.get(column) for column in _COLUMNS),
+        json.dumps(extra) if extra else None,
+    )
+
+
+class SqliteStatusStore(StatusStore):
+    """
+    Stores one row per GPU in a SQLite database in WAL mode.
+    
+    Readers never block writers, and mutations only rewrite the rows that
+    actually changed. Connections are opened lazily per thread and per
+    process, so the store is safe to share across gunicorn workers.
+    """
+
+    def __init__(self, path: str = SQLITE_STATUS_FILE):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block inside BEGIN IMMEDIATE ... COMMIT."""
+        conn = self._connect()
+        start = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        acquired = time.perf_counter()
+        LOCK_WAIT.labels(lock="sqlite").observe(acquired - start)
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            LOCK_HOLD.labels(lock="sqlite").observe(time.perf_counter() - acquired)
+
+    def initialize(self) -> bool:
+        with self._write_transaction() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM gpus").fetchone()
+            if count == 0:
+                conn.executemany(
+                    "INSERT INTO gpus (gpu_id, status) VALUES (?, 'available')",
+                    [(gpu_id,) for gpu_id in configured_gpu_ids()]
+                )
+                conn.execute(_BUMP_GENERATION)
+                logger.info(f"Initialized status database at {self.path}")
+        return True
+
+    def load(self) -> Dict[str, Any]:
+        rows = self._connect().execute(_SELECT).fetchall()
+        return {row[0]: _row_to_record(row) for row in rows}
+
+    def save(self, status: Dict[str, Any]) -> None:
+        with self._write_transaction() as conn:
+            conn.execute("DELETE FROM gpus")
+            conn.executemany(_UPSERT, [_record_to_row(k, v) for k, v in status.items()])
+            conn.execute(_BUMP_GENERATION)
+
+    @contextmanager
+    def transaction(self, event: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        with self._write_transaction() as conn:
+            status = {row[0]: _row_to_record(row) for row in conn.execute(_SELECT)}
+            # Normalized copies of the rows as read, to detect which GPUs changed
+            rows = {gpu_id: _record_to_row(gpu_id, record) for gpu_id, record in status.items()}
+            yield status
+            changed = []
+            for gpu_id, record in status.items():
+                row = _record_to_row(gpu_id, record)
+                if rows.get(gpu_id) != row:
+                    changed.append(row)
+            removed = [(gpu_id,) for gpu_id in rows if gpu_id not in status]
+            if changed:
+                conn.executemany(_UPSERT, changed)
+            if removed:
+                conn.executemany("DELETE FROM gpus WHERE gpu_id = ?", removed)
+            if changed or removed:
+                conn.execute(_BUMP_GENERATION)
+
+    def size_bytes(self) -> Optional[int]:
+        total = 0
+        for suffix in ('', '-wal'):
+            try:
+                total += os.path.getsize(self.path + suffix)
+            except OSError:
+                pass
+        return total
+
+    def get_gpu(self, gpu_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a single GPU record by its primary key.
+        
+        Args:
+            gpu_id: GPU ID to look up
+            
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if the GPU doesn't exist
+        """
+        row = self._connect().execute(f"{_SELECT} WHERE gpu_id = ?", (gpu_id,)).fetchone()
+        return _row_to_record(row) if row else None
+
+    def claim_if_available(self, gpu_id: str, record: Dict[str, Any]) -> bool:
+        row = _record_to_row(gpu_id, record)
+        with self._write_transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE gpus
+                SET status = ?, user_id = ?, user_name = ?, purpose = ?,
+                    claim_time = ?, release_time = ?, extra = ?
+                WHERE gpu_id = ? AND status = 'available'
+                """,
+                (*row[1:], gpu_id)
+            )
+            claimed = cursor.rowcount == 1
+            if claimed:
+                conn.execute(_BUMP_GENERATION)
+        return claimed
+
+    def version(self) -> Optional[Hashable]:
+        (generation,) = self._connect().execute(
+            "SELECT value FROM meta WHERE key = 'generation'"
+        ).fetchone()
+        return generation
+
+    def gpus_for_user(self, user_id: str) -> List[str]:
+        rows = self._connect().execute(
+            "SELECT gpu_id FROM gpus WHERE user_id = ?", (user_id,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def migrate_from_json(self, json_path: str = STATUS_FILE, force: bool = False) -> int:
+        """
+        One-shot import of an existing gpu_status.json into the database.
+        
+        Args:
+            json_path: Path of the JSON status file to import
+            force: Replace existing rows instead of refusing to migrate
+            
+        Returns:
+            int: Number of GPU records imported
+            
+        Raises:
+            RuntimeError: If the database already has GPUs and force is False
+        """
+        with open(json_path, 'r') as f:
+            status = json.load(f)
+        with self._write_transaction() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM gpus").fetchone()
+            if count and not force:
+                raise RuntimeError(f"{self.path} already contains {count} GPUs; use --force to overwrite")
+            conn.execute("DELETE FROM gpus")
+            conn.executemany(_UPSERT, [_record_to_row(k, v) for k, v in status.items()])
+            conn.execute(_BUMP_GENERATION)
+        logger.info(f"Migrated {len(status)} GPUs from {json_path} to {self.path}")
+        return len(status)
+
+
+if __name__ == '__main__':
+    # Usage: python -m utils.sqlite_store migrate [gpu_status.json] [--force]
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[1:]
+    if not args or args[0] != 'migrate':
+        sys.exit("Usage: python -m utils.sqlite_store migrate [json_path] [--force]")
+    force = '--force' in args
+    paths = [a for a in args[1:] if a != '--force']
+    SqliteStatusStore().migrate_from_json(paths[0] if paths else STATUS_FILE, force=force)
@@ -1,87 +1,445 @@
 """Status management utilities for GPU tracking."""
-import os
+import copy
 import json
-import fcntl
 import logging
-from typing import Dict, Any
-from config import TOTAL_GPUS, STATUS_FILE
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Hashable, Iterator, List, Optional, Tuple
+from config import MIG_INSTANCES, STATUS_BACKEND
+from utils.allocator import FreeSetIndex, MemoryCapacity, MemoryFitIndex, NO_INSTANCE, memory_total, share_slots
+from utils.metrics import GPU_COUNT, STATE_BYTES
+from utils.shares import SHARED, add_share, gpu_claims
+from utils.status_store import StatusStore, configured_gpu_ids
+from utils.usage import completed_claims, record_completed
 
 logger = logging.getLogger(__name__)
 
+_store: Optional[StatusStore] = None
+
+# Process-local read cache: (store version, parsed status). Writes from any
+# worker change the store version, which invalidates every other worker.
+_cache: Optional[Tuple[Hashable, Dict[str, Any]]] = None
+_cache_stats = {"hits": 0, "misses": 0}
+_cache_lock = threading.Lock()
+
+# Free-set index for "any N" claims, reused while the store version is unchanged
+_free_index: Optional[FreeSetIndex] = None
+_free_index_lock = threading.Lock()
+
+# Best-fit index for "--mem" claims, reused while the store version and telemetry are unchanged
+_fit_index: Optional[MemoryFitIndex] = None
+_fit_index_lock = threading.Lock()
+
+# user_id -> held GPU IDs, rebuilt from the cached status when the store version changes
+_user_index: Optional[Tuple[Hashable, Dict[str, List[str]]]] = None
+
+
+def get_store() -> StatusStore:
+    """
+    Return the storage backend selected by config.STATUS_BACKEND.
+    
+    Returns:
+        StatusStore: The process-wide store instance
+        
+    Raises:
+        ValueError: If the configured backend is unknown
+    """
+    global _store
+    if _store is None:
+        if STATUS_BACKEND == "json":
+            from utils.json_store import JsonStatusStore
+            _store = JsonStatusStore()
+        elif STATUS_BACKEND == "sqlite":
+            from utils.sqlite_store import SqliteStatusStore
+            _store = SqliteStatusStore()
+        elif STATUS_BACKEND == "journal":
+            from utils.journal_store import JournalStatusStore
+            _store = JournalStatusStore()
+        elif STATUS_BACKEND == "striped":
+            from utils.striped_store import StripedStatusStore
+            _store = StripedStatusStore()
+        elif STATUS_BACKEND == "mmap":
+            from utils.mmap_store import MmapStatusStore
+            _store = MmapStatusStore()
+        else:
+            raise ValueError(f"Unknown STATUS_BACKEND: {STATUS_BACKEND}")
+    return _store
+
 
 def initialize_status() -> bool:
     """
-    Initialize the GPU status file if it doesn't exist.
+    Initialize the GPU status storage if it doesn't exist.
+    
+    GPUs added to the configuration since the store was created (a higher
+    TOTAL_GPUS or a new fleet node) are added as available.
     
     Returns:
         bool: True if initialization was successful
     """
     try:
-        if not os.path.exists(STATUS_FILE):
-            status = {str(i): {"status": "available"} for i in range(TOTAL_GPUS)}
-            with open(STATUS_FILE, 'w') as f:
-                json.dump(status, f, indent=2)
-            logger.info(f"Initialized status file with {TOTAL_GPUS} GPUs")
+        get_store().initialize()
+        with status_transaction() as status:
+            for gpu_id in configured_gpu_ids():
+                status.setdefault(gpu_id, {"status": "available"})
         return True
     except (IOError, OSError) as e:
-        logger.error(f"Failed to initialize status file: {e}")
+        logger.error(f"Failed to initialize status storage: {e}")
         raise
 
 
 def get_status() -> Dict[str, Any]:
     """
-    Read the current GPU status from the file.
+    Read the current GPU status.
+    
+    Returns a consistent snapshot without blocking writers. Repeated reads
+    are served from a process-local cache until the store version changes.
+    The returned dictionary is shared and must be treated as read-only;
+    use status_transaction() to read and modify.
     
     Returns:
         Dict[str, Any]: Dictionary containing GPU status information
         
     Raises:
-        IOError: If the file cannot be read
-        json.JSONDecodeError: If the file contains invalid JSON
+        IOError: If the status cannot be read
+        json.JSONDecodeError: If the status file contains invalid JSON
     """
+    global _cache
+    store = get_store()
     try:
-        with open(STATUS_FILE, 'r') as f:
-            fcntl.flock(f.fileno(), fcntl.LOCK_SH)  # Shared lock for reading
-            try:
-                return json.load(f)
-            finally:
-                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        # Read the version before the data: a write in between only causes
+        # an extra miss next time, never a stale hit.
+        version = store.version()
+        cached = _cache
+        if version is not None and cached is not None and cached[0] == version:
+            with _cache_lock:
+                _cache_stats["hits"] += 1
+            return cached[1]
+        status = store.load()
+        with _cache_lock:
+            _cache_stats["misses"] += 1
+            if version is not None:
+                _cache = (version, status)
+        return status
     except FileNotFoundError:
         logger.warning("Status file not found, initializing...")
         initialize_status()
         return get_status()
     except (IOError, json.JSONDecodeError) as e:
-        logger.error(f"Failed to read status file: {e}")
+        logger.error(f"Failed to read status: {e}")
         raise
 
 
+def get_cache_stats() -> Dict[str, int]:
+    """
+    Return hit/miss counters for the process-local status cache.
+    
+    Returns:
+        Dict[str, int]: Counts of "hits" and "misses" since startup
+    """
+    with _cache_lock:
+        return dict(_cache_stats)
+
+
+def record_state_metrics() -> None:
+    """Update the state size and per-status GPU count gauges (call before a scrape)."""
+    store = get_store()
+    size = store.size_bytes()
+    if size is not None:
+        STATE_BYTES.set(size)
+    counts = {"available": 0, "in_use": 0, SHARED: 0}
+    for info in get_status().values():
+        state = info.get("status", "unknown")
+        counts[state] = counts.get(state, 0) + 1
+    for state, count in counts.items():
+        GPU_COUNT.labels(status=state).set(count)
+
+
+def _claimed_records(status: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the claimed records of a transaction, to find the claims it ends."""
+    return {gpu_id: copy.deepcopy(info) if info.get('status') == SHARED else dict(info)
+            for gpu_id, info in status.items() if info.get('status') in ('in_use', SHARED)}
+
+
+@contextmanager
+def status_transaction(event: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Atomic read-modify-write access to the GPU status.
+    
+    Holds one exclusive lock across the read, the caller's mutation and
+    the write. The status is only written back if the block exits without
+    an exception and actually changed it. Claims the block ends are then
+    recorded in the usage log.
+    
+    Example:
+        with status_transaction() as status:
+            status["0"] = {"status": "available"}
+    
+    Args:
+        event: Optional name for the change (e.g. "expire"), recorded by
+            backends that keep a history
+    
+    Yields:
+        Dict[str, Any]: Mutable dictionary containing GPU status information
+        
+    Raises:
+        IOError: If the status cannot be read or written
+    """
+    with get_store().transaction(event) as status:
+        claims = _claimed_records(status)
+        yield status
+        ended = completed_claims(claims, status)
+    logger.debug("Status updated successfully")
+    record_completed(ended)
+
+
+@contextmanager
+def gpu_transaction(gpu_ids: List[str], event: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Atomic read-modify-write access to some GPUs' records.
+    
+    With the "striped" backend only these GPUs are locked, so transactions
+    on other GPUs proceed in parallel; other backends lock the whole table.
+    Only the records of existing GPUs in `gpu_ids` are yielded, and only
+    those may be changed.
+    
+    Example:
+        with gpu_transaction(["0", "3"]) as records:
+            records["3"] = {"status": "available"}
+    
+    Args:
+        gpu_ids: GPUs to lock
+        event: Optional name for the change, as for status_transaction()
+    
+    Yields:
+        Dict[str, Any]: Mutable records of the selected GPUs
+    """
+    with get_store().gpu_transaction(gpu_ids, event) as records:
+        claims = _claimed_records(records)
+        yield records
+        ended = completed_claims(claims, records)
+    record_completed(ended)
+
+
 def save_status(status: Dict[str, Any]) -> None:
     """
-    Save the GPU status to the file with file locking.
+    Save the GPU status with locking.
+    
+    This overwrites the whole state unconditionally; prefer
+    status_transaction() when the new state depends on the current one.
     
     Args:
         status: Dictionary containing GPU status information
         
     Raises:
-        IOError: If the file cannot be written
+        IOError: If the status cannot be written
     """
     try:
-        with open(STATUS_FILE, 'w') as f:
-            fcntl.flock(f.fileno(), fcntl.LOCK_EX)  # Exclusive lock for writing
-            try:
-                json.dump(status, f, indent=2)
-            finally:
-                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-        logger.debug("Status file updated successfully")
+        get_store().save(status)
+        logger.debug("Status updated successfully")
     except (IOError, OSError) as e:
-        logger.error(f"Failed to save status file: {e}")
+        logger.error(f"Failed to save status: {e}")
         raise
 
 
+def claim_gpu(gpu_id: str, record: Dict[str, Any]) -> bool:
+    """
+    Atomically claim a GPU if it exists and is available.
+    
+    Args:
+        gpu_id: GPU ID to claim
+        record: New status record for the GPU
+        
+    Returns:
+        bool: True if the claim succeeded
+    """
+    return get_store().claim_if_available(gpu_id, record)
+
+
+def claim_gpus(gpu_ids: List[str], record: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """
+    Atomically claim a set of GPUs: either all of them or none.
+    
+    Args:
+        gpu_ids: GPU IDs to claim
+        record: Status record stored for each GPU
+        
+    Returns:
+        Tuple[List[str], List[str]]: (unknown IDs, IDs already in use);
+        both empty if the claim succeeded
+    """
+    with gpu_transaction(gpu_ids, "claim") as status:
+        missing = [gpu_id for gpu_id in gpu_ids if gpu_id not in status]
+        busy = [gpu_id for gpu_id in gpu_ids
+                if gpu_id in status and status[gpu_id].get('status') != 'available']
+        if missing or busy:
+            return missing, busy
+        for gpu_id in gpu_ids:
+            status[gpu_id] = dict(record)
+    return [], []
+
+
+def claim_any(count: int, record: Dict[str, Any]) -> Optional[List[str]]:
+    """
+    Atomically claim `count` free GPUs chosen by the allocator.
+    
+    Prefers GPUs in one topology group, then on one node with adjacent
+    indexes (see utils.allocator).
+    
+    The free-set index is rebuilt from the locked table (one pass over
+    every GPU) whenever the store version changed since this process last
+    used it, which is after any write by any worker. It is only reused, and
+    updated in place, across consecutive "any" claims from this process with
+    no other write in between. The transaction reads the whole table anyway,
+    so a rebuild costs about as much as that read. A stale index only costs
+    placement quality: picks are re-checked against the locked table.
+    
+    Args:
+        count: Number of GPUs to claim
+        record: Status record stored for each GPU
+        
+    Returns:
+        Optional[List[str]]: The claimed GPU IDs, or None if too few are free
+    """
+    global _free_index
+    store = get_store()
+    with _free_index_lock:
+        with status_transaction("claim") as status:
+            version = store.version()
+            index = _free_index
+            rebuilt = index is None or index.version != version
+            if rebuilt:
+                index = FreeSetIndex.from_status(status, version)
+            chosen = index.allocate(count)
+            # The index is only a hint; fall back to a fresh one if it is stale
+            if not rebuilt and (chosen is None or any(status.get(gpu_id, {}).get('status') != 'available'
+                                                      for gpu_id in chosen)):
+                index = FreeSetIndex.from_status(status, version)
+                chosen = index.allocate(count)
+            _free_index = index
+            if chosen is None:
+                return None
+            for gpu_id in chosen:
+                status[gpu_id] = dict(record)
+        index.update(claimed=chosen)
+        index.version = store.version()
+    return chosen
+
+
+def claim_share(memory_mb: int, share: Dict[str, Any], capacity: MemoryCapacity,
+                capacity_version: Optional[Hashable] = None,
+                gpu_id: Optional[str] = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Atomically place a fractional claim of `memory_mb` on a shared GPU.
+    
+    Without `gpu_id` the GPU (or MIG instance) with the least free memory
+    that still fits is chosen, see utils.allocator.MemoryFitIndex. GPUs
+    whose record the store cannot hold with another share are skipped.
+    
+    The index is reused only while the store version and `capacity_version`
+    match the ones it was built from, e.g. across placements that found no
+    room; any write, this one included, rebuilds it on the next call in one
+    pass over the table the transaction has already read.
+    
+    Args:
+        memory_mb: Memory budget in MiB
+        share: Claim fields (user_id, user_name, purpose, claim_time,
+            release_time) of the share
+        capacity: Memory sizes and live usage from memory_capacity()
+        capacity_version: Changes whenever `capacity` does (e.g. the
+            snapshot time); None rebuilds the index on every call
+        gpu_id: Place the share on this GPU only
+        
+    Returns:
+        Optional[Tuple[str, Dict[str, Any]]]: (GPU ID, the share as
+        stored), or None if no GPU has room
+    """
+    global _fit_index
+    store = get_store()
+    with _fit_index_lock:
+        with status_transaction("claim") as status:
+            if gpu_id is not None:
+                candidates = [(gpu_id, instance) for free, instance in
+                              sorted(share_slots(gpu_id, status.get(gpu_id, {}), capacity)) if free >= memory_mb]
+            else:
+                # Read under the lock: an index built from exactly this state
+                # is current, anything else (including this process's last
+                # claim) rebuilds it
+                version = (store.version(), capacity_version)
+                if _fit_index is None or capacity_version is None or _fit_index.version != version:
+                    _fit_index = MemoryFitIndex.from_status(status, capacity, version)
+                candidates = _fit_index.best_fits(memory_mb)
+            for gpu_id, instance in candidates:
+                info = status.get(gpu_id, {})
+                # The index is only a hint; the locked record must still have room
+                if not any(free >= memory_mb and slot == instance
+                           for free, slot in share_slots(gpu_id, info, capacity)):
+                    continue
+                placed = dict(share, memory_mb=memory_mb)
+                if instance != NO_INSTANCE:
+                    # The share gets the whole MIG instance
+                    placed['memory_mb'] = int(MIG_INSTANCES[gpu_id][instance] * 1024)
+                    placed['mig_instance'] = instance
+                record = add_share(info, placed, memory_total(gpu_id, info, capacity))
+                # Backends with fixed-size records (mmap) may have no room for another share
+                if store.fits(gpu_id, record):
+                    break
+            else:
+                return None
+            status[gpu_id] = record
+    return gpu_id, placed
+
+
+def build_user_index(status: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Map each user to the GPUs they hold, whole or as shares.
+    
+    Args:
+        status: GPU status table
+        
+    Returns:
+        Dict[str, List[str]]: user_id -> GPU IDs sorted with gpu_sort_key
+    """
+    index: Dict[str, List[str]] = {}
+    for gpu_id in sorted(status, key=gpu_sort_key):
+        for user_id in dict.fromkeys(claim.get('user_id') for claim in gpu_claims(status[gpu_id])):
+            if user_id:
+                index.setdefault(user_id, []).append(gpu_id)
+    return index
+
+
+def get_user_gpus(user_id: str) -> List[str]:
+    """
+    List the GPU IDs currently held by a user.
+    
+    Served from a per-process user index that is rebuilt only when the
+    store version changes, so lookups don't scan every GPU record. Like the
+    free-set index, the result is a hint: code that acts on it must check
+    ownership again inside a transaction.
+    
+    Args:
+        user_id: Slack user ID
+        
+    Returns:
+        List[str]: GPU IDs claimed by the user, sorted with gpu_sort_key
+    """
+    global _user_index
+    store = get_store()
+    version = store.version()
+    if version is None:
+        return sorted(store.gpus_for_user(user_id), key=gpu_sort_key)
+    cached = _user_index
+    if cached is None or cached[0] != version:
+        cached = (version, build_user_index(get_status()))
+        _user_index = cached
+    return list(cached[1].get(user_id, ()))
+
+
 def validate_gpu_id(gpu_id: str, status: Dict[str, Any]) -> bool:
     """
     Validate that a GPU ID exists in the status.
     
+    Accepts local IDs ("3") and node-qualified fleet IDs ("nodeA:3").
+    
     Args:
         gpu_id: GPU ID to validate
         status: Current status dictionary
@@ -91,9 +449,26 @@ def validate_gpu_id(gpu_id: str, status: Dict[str, Any]) -> bool:
     """
     if not gpu_id or not isinstance(gpu_id, str):
         return False
-    # Check if it's a valid numeric string that exists in status
+    # Check if it's a valid (optionally node-qualified) index that exists in status
     try:
-        int(gpu_id)
+        int(gpu_id.rpartition(':')[2])
         return gpu_id in status
     except ValueError:
-        return False
\ No newline at end of file
+        return False
+
+
+def gpu_sort_key(gpu_id: str) -> Tuple[str, int]:
+    """
+    Sort key ordering local GPUs first, then fleet nodes, by numeric index.
+    
+    Args:
+        gpu_id: GPU ID such as "3" or "nodeA:3"
+        
+    Returns:
+        Tuple[str, int]: (node name, index); local GPUs have an empty node
+    """
+    node, _, index = gpu_id.rpartition(':')
+    try:
+        return node, int(index)
+    except ValueError:
+        return node, -1
@@ -0,0 +1,174 @@
+"""Storage backend interface for GPU status."""
+from contextlib import contextmanager
+from typing import Dict, Any, Hashable, Iterator, List, Optional
+from config import TOTAL_GPUS, FLEET_NODE_GPUS
+from utils.shares import gpu_claims
+
+
+def configured_gpu_ids() -> List[str]:
+    """
+    List every GPU ID the configuration declares.
+    
+    Local GPUs use plain indices ("0", "1", ...); GPUs on remote fleet
+    nodes are node-qualified ("nodeA:0", "nodeA:1", ...).
+    
+    Returns:
+        List[str]: Configured GPU IDs
+    """
+    gpu_ids = [str(i) for i in range(TOTAL_GPUS)]
+    for node, count in FLEET_NODE_GPUS.items():
+        gpu_ids.extend(f"{node}:{i}" for i in range(count))
+    return gpu_ids
+
+
+def default_status() -> Dict[str, Any]:
+    """Build the status dictionary for a fresh installation."""
+    return {gpu_id: {"status": "available"} for gpu_id in configured_gpu_ids()}
+
+
+class StatusStore:
+    """
+    Base class for GPU status storage backends.
+    
+    Backends persist a mapping of GPU ID to status record, e.g.
+    ``{"0": {"status": "available"}}``. Subclasses must implement
+    initialize(), load(), save() and transaction(); the remaining methods
+    (including per-GPU gpu_transaction()) have generic implementations
+    built on top of those and may be overridden with faster
+    backend-specific versions.
+    """
+
+    def initialize(self) -> bool:
+        """
+        Create the backing storage with every configured GPU available if missing.
+        
+        Returns:
+            bool: True if initialization was successful
+        """
+        raise NotImplementedError
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Read a consistent snapshot of all GPU records.
+        
+        Returns:
+            Dict[str, Any]: Dictionary containing GPU status information
+        """
+        raise NotImplementedError
+
+    def save(self, status: Dict[str, Any]) -> None:
+        """
+        Replace the stored state with the given status.
+        
+        Args:
+            status: Dictionary containing GPU status information
+        """
+        raise NotImplementedError
+
+    @contextmanager
+    def transaction(self, event: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Atomic read-modify-write access to all GPU records.
+        
+        Args:
+            event: Optional name for the change (e.g. "expire"), recorded by
+                backends that keep a history
+        
+        Yields:
+            Dict[str, Any]: Mutable status dictionary, persisted on clean exit
+        """
+        raise NotImplementedError
+        yield {}
+
+    @contextmanager
+    def gpu_transaction(self, gpu_ids: List[str], event: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Atomic read-modify-write access to a subset of GPU records.
+        
+        Yields only the records of `gpu_ids` that exist. Backends with
+        per-GPU locking lock just those GPUs, so transactions on disjoint
+        sets run in parallel; the default locks the whole table.
+        
+        Args:
+            gpu_ids: GPUs to lock
+            event: Optional name for the change, as for transaction()
+        
+        Yields:
+            Dict[str, Any]: Mutable records of the selected GPUs, persisted
+                on clean exit
+        """
+        with self.transaction(event) as status:
+            subset = {gpu_id: status[gpu_id] for gpu_id in gpu_ids if gpu_id in status}
+            yield subset
+            status.update(subset)
+
+    def version(self) -> Optional[Hashable]:
+        """
+        Return a cheap token that changes whenever the stored state changes.
+        
+        Used to decide whether a previously loaded status is still current
+        without parsing the storage again. Changes made by other processes
+        must be reflected.
+        
+        Returns:
+            Optional[Hashable]: Version token, or None if the backend cannot
+                provide one (disables caching)
+        """
+        return None
+
+    def size_bytes(self) -> Optional[int]:
+        """
+        Return the on-disk size of the stored state, for monitoring.
+        
+        Returns:
+            Optional[int]: Size in bytes, or None if unknown
+        """
+        return None
+
+    def fits(self, gpu_id: str, record: Dict[str, Any]) -> bool:
+        """
+        Check whether a record can be stored for a GPU.
+        
+        Backends with a size limit per record override this so callers can
+        look elsewhere instead of failing the write.
+        
+        Args:
+            gpu_id: GPU ID
+            record: Candidate status record
+            
+        Returns:
+            bool: True if writing the record would succeed
+        """
+        return True
+
+    def claim_if_available(self, gpu_id: str, record: Dict[str, Any]) -> bool:
+        """
+        Store a claim record only if the GPU exists and is available.
+        
+        Args:
+            gpu_id: GPU ID to claim
+            record: New status record for the GPU
+            
+        Returns:
+            bool: True if the claim was stored
+        """
+        with self.gpu_transaction([gpu_id], "claim") as status:
+            if status.get(gpu_id, {}).get('status') != 'available':
+                return False
+            status[gpu_id] = record
+        return True
+
+    def gpus_for_user(self, user_id: str) -> List[str]:
+        """
+        Find the GPUs currently held by a user.
+        
+        Args:
+            user_id: Slack user ID
+            
+        Returns:
+            List[str]: GPU IDs the user holds whole or a share of
+        """
+        return [
+            gpu_id for gpu_id, info in self.load().items()
+            if any(claim.get('user_id') == user_id for claim in gpu_claims(info))
+        ]
@@ -0,0 +1,180 @@
+"""Per-GPU record files with lock striping."""
+import os
+import json
+import time
+import fcntl
+import logging
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Any, Hashable, Iterator, List, Optional, Tuple
+from config import STRIPED_STATUS_DIR
+from utils.file_utils import atomic_write, file_lock
+from utils.status_store import StatusStore, default_status
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = ".json"
+
+# Lock-free snapshot attempts before a reader falls back to the table lock
+_READ_RETRIES = 3
+
+
+def _sort_key(gpu_id: str) -> Tuple[str, int, str]:
+    """Order local GPUs first, then by node and numeric index."""
+    node, _, index = gpu_id.rpartition(':')
+    return node, int(index) if index.isdigit() else -1, index
+
+
+def _serialize(record: Dict[str, Any]) -> str:
+    return json.dumps(record, indent=2)
+
+
+class StripedStatusStore(StatusStore):
+    """
+    Stores each GPU record in its own file, with one lock per GPU.
+
+    Layout of STRIPED_STATUS_DIR:
+        <gpu_id>.json      one record per GPU, replaced atomically
+        locks/<gpu_id>     per-GPU flock files
+        table.lock         held shared by per-GPU writers, exclusively by
+                           whole-table transactions
+        writes.started     one byte appended before every write ...
+        writes.finished    ... and one after it
+
+    gpu_transaction() only locks the GPUs it touches, so claims and
+    releases on different GPUs run in parallel. Readers take no lock: a
+    snapshot is consistent when no write started or finished while it was
+    read (a seqlock over the two counters); after a few failed attempts
+    the reader takes the table lock instead.
+    """
+
+    def __init__(self, path: str = STRIPED_STATUS_DIR):
+        self.path = path
+        self.lock_dir = os.path.join(path, "locks")
+        self.table_lock = os.path.join(path, "table.lock")
+        self.started_path = os.path.join(path, "writes.started")
+        self.finished_path = os.path.join(path, "writes.finished")
+
+    def _record_path(self, gpu_id: str) -> str:
+        return os.path.join(self.path, gpu_id + _SUFFIX)
+
+    def _size(self, path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
+
+    def _bump(self, path: str, count: int = 1) -> None:
+        # O_APPEND writes are atomic, so concurrent writers never lose a count
+        with open(path, 'ab') as f:
+            f.write(b'.' * count)
+
+    def _read_records(self, gpu_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Read the given (or all) record files; missing GPUs are left out."""
+        if gpu_ids is None:
+            gpu_ids = sorted((name[:-len(_SUFFIX)] for name in os.listdir(self.path) if name.endswith(_SUFFIX)),
+                             key=_sort_key)
+        status = {}
+        for gpu_id in gpu_ids:
+            try:
+                with open(self._record_path(gpu_id), 'r') as f:
+                    status[gpu_id] = json.load(f)
+            except FileNotFoundError:
+                continue
+        return status
+
+    def _write_changes(self, original: Dict[str, Any], status: Dict[str, Any]) -> None:
+        """Write records that changed between `original` and `status`."""
+        changed = [gpu_id for gpu_id, record in status.items() if original.get(gpu_id) != record]
+        removed = [gpu_id for gpu_id in original if gpu_id not in status]
+        if not changed and not removed:
+            return
+        self._bump(self.started_path)
+        try:
+            for gpu_id in changed:
+                atomic_write(self._record_path(gpu_id), _serialize(status[gpu_id]))
+            for gpu_id in removed:
+                os.unlink(self._record_path(gpu_id))
+        finally:
+            self._bump(self.finished_path)
+
+    def _repair_counters(self) -> None:
+        """Even out the counters after a crashed writer; caller holds the table lock exclusively."""
+        missing = self._size(self.started_path) - self._size(self.finished_path)
+        if missing > 0:
+            logger.warning(f"Repairing {missing} unfinished write(s) in {self.path}")
+            self._bump(self.finished_path, missing)
+
+    def _valid_gpu_id(self, gpu_id: str) -> bool:
+        # GPU IDs become file names; never let one escape the directory
+        return bool(gpu_id) and '/' not in gpu_id and not gpu_id.startswith('.')
+
+    def initialize(self) -> bool:
+        os.makedirs(self.lock_dir, exist_ok=True)
+        if not any(name.endswith(_SUFFIX) for name in os.listdir(self.path)):
+            with file_lock(self.table_lock):
+                if not any(name.endswith(_SUFFIX) for name in os.listdir(self.path)):
+                    self._write_changes({}, default_status())
+                    logger.info(f"Initialized striped status in {self.path}")
+        return True
+
+    def load(self) -> Dict[str, Any]:
+        if not os.path.isdir(self.path):
+            raise FileNotFoundError(self.path)
+        for _ in range(_READ_RETRIES):
+            started = self._size(self.started_path)
+            if self._size(self.finished_path) == started:
+                status = self._read_records()
+                if self._size(self.started_path) == started:
+                    return status
+            time.sleep(0.001)
+        with file_lock(self.table_lock):
+            self._repair_counters()
+            return self._read_records()
+
+    def version(self) -> Optional[Hashable]:
+        try:
+            st = os.stat(self.finished_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size
+
+    def size_bytes(self) -> Optional[int]:
+        try:
+            return sum(entry.stat().st_size for entry in os.scandir(self.path) if entry.name.endswith(_SUFFIX))
+        except OSError:
+            return None
+
+    def save(self, status: Dict[str, Any]) -> None:
+        with file_lock(self.table_lock):
+            self._repair_counters()
+            self._write_changes(self._read_records(), status)
+
+    @contextmanager
+    def transaction(self, event: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        os.makedirs(self.lock_dir, exist_ok=True)
+        with file_lock(self.table_lock):
+            self._repair_counters()
+            original = self._read_records()
+            if not original:
+                logger.warning("Striped status not found, initializing...")
+                original = {}
+                status = default_status()
+            else:
+                status = json.loads(json.dumps(original))
+            yield status
+            self._write_changes(original, status)
+
+    @contextmanager
+    def gpu_transaction(self, gpu_ids: List[str], event: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        gpu_ids = sorted({gpu_id for gpu_id in gpu_ids if self._valid_gpu_id(gpu_id)})
+        os.makedirs(self.lock_dir, exist_ok=True)
+        with ExitStack() as stack:
+            stack.enter_context(file_lock(self.table_lock, fcntl.LOCK_SH))
+            # A fixed (sorted) lock order keeps multi-GPU transactions deadlock-free
+            for gpu_id in gpu_ids:
+                stack.enter_context(file_lock(os.path.join(self.lock_dir, gpu_id), label="gpu"))
+            original = self._read_records(gpu_ids)
+            status = json.loads(json.dumps(original))
+            yield status
+            # Only the locked GPUs may be written
+            self._write_changes(original, {k: v for k, v in status.items() if k in original})
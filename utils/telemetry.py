@@ -0,0 +1,468 @@
+"""GPU telemetry providers (NVML in-process, nvidia-smi subprocess fallback)."""
+import time
+import asyncio
+import logging
+import threading
+import subprocess
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from config import NVIDIA_SMI, TELEMETRY_BACKEND, TELEMETRY_TIMEOUT_SECONDS
+from utils.metrics import TELEMETRY_FAILURES, TELEMETRY_LATENCY, observe_duration
+
+logger = logging.getLogger(__name__)
+
+GPU_QUERY = "index,name,temperature.gpu,utilization.gpu,memory.used,memory.total,uuid"
+PROCESS_QUERY = "gpu_uuid,pid,process_name,used_gpu_memory"
+
+
+class GpuSample(NamedTuple):
+    """Telemetry for one GPU. Numeric fields are None when not reported."""
+    index: str
+    name: str
+    temperature: Optional[float]  # °C
+    utilization: Optional[float]  # percent
+    memory_used: Optional[float]  # MiB
+    memory_total: Optional[float]  # MiB
+    uuid: str
+
+
+class ProcessSample(NamedTuple):
+    """A compute process running on a GPU."""
+    gpu_uuid: str
+    pid: str
+    name: str
+    used_memory: Optional[float]  # MiB
+
+
+class TelemetryError(Exception):
+    """Raised when GPU telemetry cannot be collected."""
+
+    def __init__(self, title: str, message: str):
+        super().__init__(message)
+        self.title = title
+        self.message = message
+
+
+class TelemetrySnapshot(NamedTuple):
+    """An immutable, point-in-time view of all GPUs on this host."""
+    taken_at: float  # time.time() when the sample was collected
+    gpus: Tuple[GpuSample, ...]
+    processes: Tuple[ProcessSample, ...]
+    error: Optional[TelemetryError] = None
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was collected."""
+        return max(0.0, time.time() - self.taken_at)
+
+    def processes_for(self, uuid: str) -> List[ProcessSample]:
+        """Return the compute processes running on the GPU with this UUID."""
+        return [p for p in self.processes if p.gpu_uuid == uuid]
+
+
+def snapshot_to_dict(snapshot: TelemetrySnapshot) -> Dict[str, Any]:
+    """
+    Convert a snapshot into JSON-serializable form for the fleet agent.
+    
+    Args:
+        snapshot: Snapshot to convert
+        
+    Returns:
+        Dict[str, Any]: Plain dictionary representation
+    """
+    return {
+        "taken_at": snapshot.taken_at,
+        "gpus": [gpu._asdict() for gpu in snapshot.gpus],
+        "processes": [proc._asdict() for proc in snapshot.processes],
+        "error": {"title": snapshot.error.title, "message": snapshot.error.message} if snapshot.error else None
+    }
+
+
+def snapshot_from_dict(data: Dict[str, Any]) -> TelemetrySnapshot:
+    """
+    Rebuild a snapshot from snapshot_to_dict() output.
+    
+    Args:
+        data: Plain dictionary representation
+        
+    Returns:
+        TelemetrySnapshot: The reconstructed snapshot
+    """
+    error = data.get("error")
+    return TelemetrySnapshot(
+        taken_at=data["taken_at"],
+        gpus=tuple(GpuSample(**gpu) for gpu in data["gpus"]),
+        processes=tuple(ProcessSample(**proc) for proc in data["processes"]),
+        error=TelemetryError(error["title"], error["message"]) if error else None
+    )
+
+
+def _to_float(value: str) -> Optional[float]:
+    """Parse a numeric nvidia-smi field, mapping "[N/A]" and friends to None."""
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _run_nvidia_smi(query_arg: str) -> str:
+    """Run one nvidia-smi CSV query and return its stdout."""
+    result = subprocess.run(
+        [NVIDIA_SMI, query_arg, "--format=csv,noheader,nounits"],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=TELEMETRY_TIMEOUT_SECONDS
+    )
+    return result.stdout
+
+
+async def _run_nvidia_smi_async(query_arg: str) -> str:
+    """Run one nvidia-smi CSV query as an asyncio subprocess."""
+    process = await asyncio.create_subprocess_exec(
+        NVIDIA_SMI, query_arg, "--format=csv,noheader,nounits",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=TELEMETRY_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise subprocess.TimeoutExpired(NVIDIA_SMI, TELEMETRY_TIMEOUT_SECONDS)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, NVIDIA_SMI, stdout.decode(), stderr.decode())
+    return stdout.decode()
+
+
+def parse_gpu_lines(output: str) -> List[GpuSample]:
+    """
+    Parse `nvidia-smi --query-gpu=GPU_QUERY` CSV output.
+    
+    Args:
+        output: Raw stdout of nvidia-smi
+        
+    Returns:
+        List[GpuSample]: One sample per well-formed line
+    """
+    gpus = []
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        parts = [p.strip() for p in line.split(", ")]
+        if len(parts) < 7:
+            logger.warning(f"Invalid GPU data format: {parts}")
+            continue
+        if len(parts) > 7:
+            # nvidia-smi doesn't quote fields; rejoin a name containing ", "
+            parts = [parts[0], ", ".join(parts[1:-5])] + parts[-5:]
+        gpus.append(GpuSample(
+            index=parts[0],
+            name=parts[1],
+            temperature=_to_float(parts[2]),
+            utilization=_to_float(parts[3]),
+            memory_used=_to_float(parts[4]),
+            memory_total=_to_float(parts[5]),
+            uuid=parts[6]
+        ))
+    return gpus
+
+
+def parse_process_lines(output: str) -> List[ProcessSample]:
+    """
+    Parse `nvidia-smi --query-compute-apps=PROCESS_QUERY` CSV output.
+    
+    Args:
+        output: Raw stdout of nvidia-smi
+        
+    Returns:
+        List[ProcessSample]: One sample per well-formed line
+    """
+    processes = []
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        parts = [p.strip() for p in line.split(", ")]
+        if len(parts) >= 4:
+            processes.append(ProcessSample(
+                gpu_uuid=parts[0],
+                pid=parts[1],
+                name=", ".join(parts[2:-1]),
+                used_memory=_to_float(parts[-1])
+            ))
+    return processes
+
+
+class TelemetryProvider:
+    """Base class for sources of GPU telemetry."""
+
+    name = "base"
+
+    def collect(self) -> TelemetrySnapshot:
+        """
+        Collect telemetry for every GPU on this host.
+        
+        Returns:
+            TelemetrySnapshot: The collected snapshot
+            
+        Raises:
+            TelemetryError: If telemetry cannot be collected
+        """
+        raise NotImplementedError
+
+    async def collect_async(self) -> TelemetrySnapshot:
+        """
+        Collect telemetry without blocking the event loop.
+        
+        The default runs collect() in a worker thread; providers with a
+        native async path override this.
+        
+        Returns:
+            TelemetrySnapshot: The collected snapshot
+            
+        Raises:
+            TelemetryError: If telemetry cannot be collected
+        """
+        return await asyncio.to_thread(self.collect)
+
+    def close(self) -> None:
+        """Release any resources held by the provider."""
+
+
+class NvidiaSmiProvider(TelemetryProvider):
+    """Collects telemetry by running nvidia-smi CSV queries as subprocesses."""
+
+    name = "nvidia-smi"
+
+    @staticmethod
+    def _translate_error(e: Exception) -> TelemetryError:
+        """Map a failed GPU query to a user-facing TelemetryError."""
+        if isinstance(e, FileNotFoundError):
+            logger.error("nvidia-smi command not found")
+            return TelemetryError(
+                "NVIDIA Driver Error",
+                "The `nvidia-smi` command was not found. Please ensure NVIDIA drivers are installed."
+            )
+        if isinstance(e, subprocess.TimeoutExpired):
+            logger.error("nvidia-smi command timed out")
+            return TelemetryError(
+                "Timeout Error",
+                "The GPU query timed out. Please try again later."
+            )
+        logger.error(f"nvidia-smi command failed: {e.stderr}")
+        return TelemetryError(
+            "NVIDIA Driver Error",
+            f"The `nvidia-smi` command failed to execute.\n*Error:* {e.stderr[:200] if e.stderr else 'Unknown error'}"
+        )
+
+    @staticmethod
+    def _parse_processes(run_query) -> List[ProcessSample]:
+        """Parse the compute-apps query; failures just mean no process list."""
+        try:
+            return parse_process_lines(run_query())
+        except subprocess.CalledProcessError:
+            # No processes running is not an error
+            logger.debug("No GPU processes found or query failed")
+        except Exception as e:
+            logger.warning(f"Error querying GPU processes: {e}")
+        return []
+
+    def collect(self) -> TelemetrySnapshot:
+        try:
+            gpus = parse_gpu_lines(_run_nvidia_smi(f"--query-gpu={GPU_QUERY}"))
+        except (FileNotFoundError, subprocess.TimeoutExpired, subprocess.CalledProcessError) as e:
+            raise self._translate_error(e)
+        processes = self._parse_processes(lambda: _run_nvidia_smi(f"--query-compute-apps={PROCESS_QUERY}"))
+        return TelemetrySnapshot(taken_at=time.time(), gpus=tuple(gpus), processes=tuple(processes))
+
+    async def collect_async(self) -> TelemetrySnapshot:
+        gpu_output, process_output = await asyncio.gather(
+            _run_nvidia_smi_async(f"--query-gpu={GPU_QUERY}"),
+            _run_nvidia_smi_async(f"--query-compute-apps={PROCESS_QUERY}"),
+            return_exceptions=True
+        )
+        if isinstance(gpu_output, (FileNotFoundError, subprocess.TimeoutExpired, subprocess.CalledProcessError)):
+            raise self._translate_error(gpu_output)
+        if isinstance(gpu_output, BaseException):
+            raise gpu_output
+        gpus = parse_gpu_lines(gpu_output)
+
+        def process_result() -> str:
+            if isinstance(process_output, BaseException):
+                raise process_output
+            return process_output
+
+        processes = self._parse_processes(process_result)
+        return TelemetrySnapshot(taken_at=time.time(), gpus=tuple(gpus), processes=tuple(processes))
+
+
+def _decode(value: Any) -> str:
+    """NVML returns bytes in older pynvml releases and str in newer ones."""
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class NvmlProvider(TelemetryProvider):
+    """
+    Collects telemetry in-process through NVML.
+    
+    NVML is initialized once and one device handle per GPU is kept for the
+    lifetime of the provider, so a sample costs a few library calls instead
+    of two process launches.
+    """
+
+    name = "nvml"
+
+    def __init__(self, nvml: Any = None):
+        """
+        Args:
+            nvml: Module implementing the pynvml API; imports pynvml if None
+            
+        Raises:
+            ImportError: If pynvml is not installed
+            TelemetryError: If NVML cannot be initialized
+        """
+        if nvml is None:
+            import pynvml as nvml
+        self._nvml = nvml
+        try:
+            nvml.nvmlInit()
+            count = nvml.nvmlDeviceGetCount()
+            self._devices = []
+            for i in range(count):
+                handle = nvml.nvmlDeviceGetHandleByIndex(i)
+                self._devices.append((
+                    str(i),
+                    handle,
+                    _decode(nvml.nvmlDeviceGetName(handle)),
+                    _decode(nvml.nvmlDeviceGetUUID(handle))
+                ))
+        except nvml.NVMLError as e:
+            raise TelemetryError("NVIDIA Driver Error", f"NVML failed to initialize.\n*Error:* {e}")
+        self._process_names: dict = {}
+
+    def _process_name(self, pid: int) -> str:
+        """Look up (and remember) a process name by PID."""
+        name = self._process_names.get(pid)
+        if name is None:
+            try:
+                name = _decode(self._nvml.nvmlSystemGetProcessName(pid))
+            except self._nvml.NVMLError:
+                name = "unknown"
+            if len(self._process_names) > 4096:
+                self._process_names.clear()
+            self._process_names[pid] = name
+        return name
+
+    def _read(self, func, *args) -> Any:
+        """Call an NVML query, mapping "not supported" style errors to None."""
+        try:
+            return func(*args)
+        except self._nvml.NVMLError as e:
+            logger.debug(f"NVML query {func.__name__} failed: {e}")
+            return None
+
+    def collect(self) -> TelemetrySnapshot:
+        nvml = self._nvml
+        gpus = []
+        processes = []
+        for index, handle, name, uuid in self._devices:
+            temperature = self._read(nvml.nvmlDeviceGetTemperature, handle, nvml.NVML_TEMPERATURE_GPU)
+            rates = self._read(nvml.nvmlDeviceGetUtilizationRates, handle)
+            memory = self._read(nvml.nvmlDeviceGetMemoryInfo, handle)
+            gpus.append(GpuSample(
+                index=index,
+                name=name,
+                temperature=float(temperature) if temperature is not None else None,
+                utilization=float(rates.gpu) if rates is not None else None,
+                memory_used=memory.used / 2**20 if memory is not None else None,
+                memory_total=memory.total / 2**20 if memory is not None else None,
+                uuid=uuid
+            ))
+            for proc in self._read(nvml.nvmlDeviceGetComputeRunningProcesses, handle) or []:
+                used = getattr(proc, 'usedGpuMemory', None)
+                processes.append(ProcessSample(
+                    gpu_uuid=uuid,
+                    pid=str(proc.pid),
+                    name=self._process_name(proc.pid),
+                    used_memory=used / 2**20 if used is not None else None
+                ))
+        return TelemetrySnapshot(taken_at=time.time(), gpus=tuple(gpus), processes=tuple(processes))
+
+    def close(self) -> None:
+        try:
+            self._nvml.nvmlShutdown()
+        except self._nvml.NVMLError as e:
+            logger.debug(f"NVML shutdown failed: {e}")
+
+
+_provider: Optional[TelemetryProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> TelemetryProvider:
+    """
+    Return the telemetry provider selected by config.TELEMETRY_BACKEND.
+    
+    "nvml" and "nvidia-smi" force a provider; "auto" uses NVML when pynvml
+    is installed and a driver is present, and falls back to nvidia-smi.
+    
+    Returns:
+        TelemetryProvider: The process-wide provider instance
+        
+    Raises:
+        ValueError: If the configured backend is unknown
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            if TELEMETRY_BACKEND == "nvidia-smi":
+                _provider = NvidiaSmiProvider()
+            elif TELEMETRY_BACKEND == "nvml":
+                _provider = NvmlProvider()
+            elif TELEMETRY_BACKEND == "auto":
+                try:
+                    _provider = NvmlProvider()
+                except (ImportError, TelemetryError) as e:
+                    logger.info(f"NVML unavailable ({e}), falling back to nvidia-smi")
+                    _provider = NvidiaSmiProvider()
+            else:
+                raise ValueError(f"Unknown TELEMETRY_BACKEND: {TELEMETRY_BACKEND}")
+            logger.info(f"Using {_provider.name} telemetry provider")
+        return _provider
+
+
+def collect_snapshot() -> TelemetrySnapshot:
+    """
+    Collect a telemetry snapshot from the configured provider.
+    
+    Returns:
+        TelemetrySnapshot: The collected snapshot
+        
+    Raises:
+        TelemetryError: If telemetry cannot be collected
+    """
+    provider = get_provider()
+    try:
+        with observe_duration(TELEMETRY_LATENCY.labels(provider=provider.name)):
+            return provider.collect()
+    except Exception:
+        TELEMETRY_FAILURES.labels(provider=provider.name).inc()
+        raise
+
+
+async def collect_snapshot_async() -> TelemetrySnapshot:
+    """
+    Collect a telemetry snapshot without blocking the event loop.
+    
+    Returns:
+        TelemetrySnapshot: The collected snapshot
+        
+    Raises:
+        TelemetryError: If telemetry cannot be collected
+    """
+    provider = get_provider()
+    try:
+        with observe_duration(TELEMETRY_LATENCY.labels(provider=provider.name)):
+            return await provider.collect_async()
+    except Exception:
+        TELEMETRY_FAILURES.labels(provider=provider.name).inc()
+        raise
@@ -0,0 +1,335 @@
+"""Fixed-size, multi-resolution telemetry history per GPU, shared by all workers.
+
+Each GPU keeps one ring buffer per tier in HISTORY_TIERS, e.g. 5-second
+slots for the last hour and 1-minute slots for the last day. Slots are
+preallocated columns in HISTORY_FILE, which every worker maps, so memory
+is fixed no matter how long the processes run and every worker answers
+from the same history. A sample is folded into the current slot of every
+tier (sum, count, min, max), which makes rollups O(1) per sample; a slot
+is reset the first time it is reused for a newer period.
+
+Only the scheduler leader records samples (see TelemetrySampler), under an
+flock. Like the mmap status store, it bumps a generation counter to an odd
+value while writing and back to even afterwards; readers take no lock and
+retry a query that overlapped a write (a seqlock).
+"""
+import os
+import math
+import mmap
+import struct
+import logging
+import tempfile
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+from config import HISTORY_FILE, HISTORY_MAX_GPUS, HISTORY_TIERS
+from utils.file_utils import file_lock
+from utils.telemetry import GpuSample, TelemetrySnapshot
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("utilization", "memory", "temperature")
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+_MAGIC = b"GPUHIS01"
+
+# magic, GPU rows, tier count, generation (odd while a write is in progress);
+# followed by (seconds per slot, slots) per tier and one "has history" byte
+# per GPU row
+_HEADER = struct.Struct("<8sIIQ")
+_GENERATION_OFFSET = 16
+_TIER = struct.Struct("<II")
+
+# Lock-free query attempts before a reader settles for its last result
+_READ_RETRIES = 100
+
+
+class SeriesStats(NamedTuple):
+    """One metric over a window: per-slot averages plus overall min/avg/max."""
+    resolution: int  # seconds per point
+    points: List[Optional[float]]  # oldest first; None where nothing was sampled
+    minimum: Optional[float]
+    average: Optional[float]
+    maximum: Optional[float]
+
+
+def _tier_size(slots: int) -> int:
+    """Bytes of one tier: a period column plus sum/count/min/max columns per metric."""
+    return 8 * slots * (1 + 4 * len(METRICS))
+
+
+def _data_offset(tiers: Sequence[Tuple[int, int]], gpus: int) -> int:
+    """Start of the GPU rows, 8-byte aligned for the typed columns."""
+    size = _HEADER.size + _TIER.size * len(tiers) + gpus
+    return (size + 7) // 8 * 8
+
+
+class _Tier:
+    """Ring buffer of aggregated slots for one GPU at one resolution, over a mapped buffer."""
+
+    def __init__(self, resolution: int, slots: int, buffer: memoryview):
+        self.resolution = resolution
+        self.slots = slots
+        columns = (buffer[start:start + 8 * slots] for start in range(0, _tier_size(slots), 8 * slots))
+        # Period number (time // resolution) each slot currently holds; 0 = empty
+        self.period = next(columns).cast('q')
+        self.sums, self.counts, self.mins, self.maxs = {}, {}, {}, {}
+        for metric in METRICS:
+            self.sums[metric] = next(columns).cast('d')
+            self.counts[metric] = next(columns).cast('q')
+            self.mins[metric] = next(columns).cast('d')
+            self.maxs[metric] = next(columns).cast('d')
+
+    @property
+    def span(self) -> int:
+        """Seconds of history the tier holds."""
+        return self.resolution * self.slots
+
+    def add(self, timestamp: float, values: Dict[str, Optional[float]]) -> None:
+        period = int(timestamp // self.resolution)
+        slot = period % self.slots
+        if self.period[slot] != period:
+            self.period[slot] = period
+            for metric in METRICS:
+                self.sums[metric][slot] = 0.0
+                self.counts[metric][slot] = 0
+        for metric, value in values.items():
+            if value is None:
+                continue
+            count = self.counts[metric][slot]
+            self.sums[metric][slot] += value
+            self.counts[metric][slot] = count + 1
+            self.mins[metric][slot] = value if count == 0 else min(self.mins[metric][slot], value)
+            self.maxs[metric][slot] = value if count == 0 else max(self.maxs[metric][slot], value)
+
+    def series(self, metric: str, end: float, points: int) -> SeriesStats:
+        """Aggregate the `points` most recent periods up to and including `end`."""
+        last = int(end // self.resolution)
+        averages: List[Optional[float]] = []
+        total, count = 0.0, 0
+        low, high = math.inf, -math.inf
+        for period in range(last - points + 1, last + 1):
+            slot = period % self.slots
+            n = self.counts[metric][slot]
+            if self.period[slot] != period or n == 0:
+                averages.append(None)
+                continue
+            averages.append(self.sums[metric][slot] / n)
+            total += self.sums[metric][slot]
+            count += n
+            low = min(low, self.mins[metric][slot])
+            high = max(high, self.maxs[metric][slot])
+        if count == 0:
+            return SeriesStats(self.resolution, averages, None, None, None)
+        return SeriesStats(self.resolution, averages, low, total / count, high)
+
+
+def _values(gpu: GpuSample) -> Dict[str, Optional[float]]:
+    """The recorded metrics of one GPU sample; memory is a percentage of total."""
+    memory = None
+    if gpu.memory_used is not None and gpu.memory_total:
+        memory = gpu.memory_used / gpu.memory_total * 100
+    return {"utilization": gpu.utilization, "memory": memory, "temperature": gpu.temperature}
+
+
+class TelemetryHistory:
+    """
+    Per-GPU tiered history in a memory-mapped file, fed from telemetry snapshots.
+
+    GPU rows are local GPU indexes below `max_gpus`. The file is created
+    (or recreated, if HISTORY_TIERS or HISTORY_MAX_GPUS changed) by the
+    first record(); until then queries find no history.
+
+    Args:
+        path: History file shared by the workers on this host
+        tiers: (seconds per slot, number of slots) pairs, finest first
+        max_gpus: GPU rows in the file
+    """
+
+    def __init__(self, path: str = HISTORY_FILE, tiers: Sequence[Tuple[int, int]] = HISTORY_TIERS,
+                 max_gpus: int = HISTORY_MAX_GPUS):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.tiers = tuple(sorted(tiers))
+        self.max_gpus = max_gpus
+        self._lock = threading.Lock()
+        self._map: Optional[mmap.mmap] = None
+        self._key: Optional[Tuple[int, int, int]] = None
+        self._gpus: List[List[_Tier]] = []
+        self._skipped: Set[str] = set()
+
+    @property
+    def max_span(self) -> int:
+        """Longest window, in seconds, that can be queried."""
+        return max(resolution * slots for resolution, slots in self.tiers)
+
+    def _layout(self, mm) -> bool:
+        """Whether a file's header describes this configuration's layout."""
+        magic, gpus, count, _ = _HEADER.unpack_from(mm)
+        tiers = tuple(_TIER.unpack_from(mm, _HEADER.size + _TIER.size * i) for i in range(count))
+        return magic == _MAGIC and gpus == self.max_gpus and tiers == self.tiers
+
+    def _create(self) -> None:
+        """Write an empty history file and rename it into place; caller holds the lock."""
+        size = _data_offset(self.tiers, self.max_gpus) + self.max_gpus * sum(
+            _tier_size(slots) for _, slots in self.tiers)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), prefix=".history-")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, self.max_gpus, len(self.tiers), 0))
+                f.write(b"".join(_TIER.pack(resolution, slots) for resolution, slots in self.tiers))
+                f.truncate(size)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        logger.info(f"Created telemetry history {self.path} ({size // 1024} KiB)")
+
+    def _mapping(self) -> Optional[mmap.mmap]:
+        """
+        Return this process's mapping of the current file, remapping after
+        the file was recreated or the process forked; caller holds _lock.
+
+        Returns:
+            Optional[mmap.mmap]: The mapping, or None if there is no file
+            with this configuration's layout
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        key = (os.getpid(), st.st_ino, st.st_size)
+        if self._key != key:
+            self._map, self._gpus, self._key = None, [], key
+            with open(self.path, 'r+b') as f:
+                mm = mmap.mmap(f.fileno(), 0)
+            if not self._layout(mm):
+                # Another layout; the next record() replaces the file
+                return None
+            view = memoryview(mm)
+            offset = _data_offset(self.tiers, self.max_gpus)
+            for _ in range(self.max_gpus):
+                tiers = []
+                for resolution, slots in self.tiers:
+                    tiers.append(_Tier(resolution, slots, view[offset:offset + _tier_size(slots)]))
+                    offset += _tier_size(slots)
+                self._gpus.append(tiers)
+            self._map = mm
+        return self._map
+
+    def _row(self, gpu_id: str) -> Optional[int]:
+        """The file row of a local GPU index, or None if it has none."""
+        if not gpu_id.isdigit() or int(gpu_id) >= self.max_gpus:
+            return None
+        return int(gpu_id)
+
+    def _generation(self, mm: mmap.mmap) -> int:
+        return struct.unpack_from("<Q", mm, _GENERATION_OFFSET)[0]
+
+    def _present_offset(self, row: int) -> int:
+        return _HEADER.size + _TIER.size * len(self.tiers) + row
+
+    def record(self, snapshot: TelemetrySnapshot) -> None:
+        """Fold every GPU in a successful snapshot into its history."""
+        if snapshot.error is not None:
+            return
+        with self._lock, file_lock(self.lock_path):
+            mm = self._mapping()
+            if mm is None:
+                self._create()
+                mm = self._mapping()
+            generation = self._generation(mm)
+            struct.pack_into("<Q", mm, _GENERATION_OFFSET, generation + 1)
+            try:
+                for gpu in snapshot.gpus:
+                    row = self._row(gpu.index)
+                    if row is None:
+                        if gpu.index not in self._skipped:
+                            self._skipped.add(gpu.index)
+                            logger.warning(f"No history row for GPU {gpu.index}; raise HISTORY_MAX_GPUS")
+                        continue
+                    mm[self._present_offset(row)] = 1
+                    values = _values(gpu)
+                    for tier in self._gpus[row]:
+                        tier.add(snapshot.taken_at, values)
+            finally:
+                struct.pack_into("<Q", mm, _GENERATION_OFFSET, generation + 2)
+
+    def gpu_ids(self) -> List[str]:
+        """GPUs that have history."""
+        with self._lock:
+            mm = self._mapping()
+            if mm is None:
+                return []
+            return [str(row) for row in range(self.max_gpus) if mm[self._present_offset(row)]]
+
+    def series(self, gpu_id: str, metric: str, window: int, end: float) -> Optional[SeriesStats]:
+        """
+        Return one metric over the last `window` seconds, from the finest
+        tier that covers the whole window.
+
+        Args:
+            gpu_id: Local GPU index
+            metric: One of METRICS
+            window: Window length in seconds (at most max_span)
+            end: End of the window (POSIX seconds)
+
+        Returns:
+            Optional[SeriesStats]: The series, or None if the GPU has no history
+        """
+        row = self._row(gpu_id)
+        with self._lock:
+            mm = self._mapping()
+            if mm is None or row is None or not mm[self._present_offset(row)]:
+                return None
+            tiers = self._gpus[row]
+            tier = next((t for t in tiers if t.span >= window), tiers[-1])
+            points = max(1, min(tier.slots, window // tier.resolution))
+            for _ in range(_READ_RETRIES):
+                generation = self._generation(mm)
+                if generation & 1:
+                    continue
+                stats = tier.series(metric, end, points)
+                if self._generation(mm) == generation:
+                    return stats
+            # The writer only holds a sample for microseconds; settle for a torn read
+            return tier.series(metric, end, points)
+
+
+_history: Optional[TelemetryHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_history() -> TelemetryHistory:
+    """Return this process's handle on the shared history file."""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = TelemetryHistory()
+        return _history
+
+
+def sparkline(points: Sequence[Optional[float]], width: int = 60, low: float = 0.0, high: float = 100.0) -> str:
+    """
+    Render values as a line of block characters, averaging down to `width`.
+
+    Gaps with no samples are drawn as spaces.
+    """
+    if len(points) > width:
+        size = len(points) / width
+        buckets = [points[int(i * size):int((i + 1) * size)] for i in range(width)]
+        points = [
+            sum(values) / len(values) if values else None
+            for values in ([v for v in bucket if v is not None] for bucket in buckets)
+        ]
+    chars = []
+    scale = (len(SPARK_CHARS) - 1) / ((high - low) or 1.0)
+    for value in points:
+        if value is None:
+            chars.append(" ")
+        else:
+            level = int(round((min(max(value, low), high) - low) * scale))
+            chars.append(SPARK_CHARS[level])
+    return "".join(chars)
@@ -1,13 +1,13 @@
 """Time parsing utilities for duration strings."""
 import re
 import logging
-from datetime import timedelta
-from typing import Optional
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 
-def parse_duration(duration_str: str = "1h") -> timedelta:
+def parse_duration(duration_str: str = "1h", max_hours: int = 12) -> timedelta:
     """
     Parse a duration string into a timedelta object.
     
@@ -19,6 +19,7 @@ def parse_duration(duration_str: str = "1h") -> timedelta:
     
     Args:
         duration_str: Duration string in format like "1h" or "30m"
+        max_hours: Longest accepted duration (12h for claims)
         
     Returns:
         timedelta: Parsed duration object
@@ -36,8 +37,8 @@ def parse_duration(duration_str: str = "1h") -> timedelta:
     hour_match = re.match(r'^(\d+)h$', duration_str)
     if hour_match:
         hours = int(hour_match.group(1))
-        if hours < 1 or hours > 12:
-            logger.warning(f"Hours out of range (1-12): {hours}, defaulting to 1h")
+        if hours < 1 or hours > max_hours:
+            logger.warning(f"Hours out of range (1-{max_hours}): {hours}, defaulting to 1h")
             return timedelta(hours=1)
         return timedelta(hours=hours)
     
@@ -45,11 +46,55 @@ def parse_duration(duration_str: str = "1h") -> timedelta:
     minute_match = re.match(r'^(\d+)m$', duration_str)
     if minute_match:
         minutes = int(minute_match.group(1))
-        if minutes < 30 or minutes > 720:  # 30 minutes to 12 hours
-            logger.warning(f"Minutes out of range (30-720): {minutes}, defaulting to 1h")
+        if minutes < 30 or minutes > max_hours * 60:  # 30 minutes to max_hours
+            logger.warning(f"Minutes out of range (30-{max_hours * 60}): {minutes}, defaulting to 1h")
             return timedelta(hours=1)
         return timedelta(minutes=minutes)
     
     # Default to 1 hour if format is invalid
     logger.warning(f"Invalid duration format: {duration_str}, defaulting to 1h")
-    return timedelta(hours=1)
\ No newline at end of file
+    return timedelta(hours=1)
+
+
+def parse_start_time(words: List[str], now: datetime, tz: tzinfo) -> Tuple[datetime, int]:
+    """
+    Parse a start time such as "tomorrow 09:00", "2024-05-02 14:30" or "18:00".
+    
+    A bare time means its next occurrence. Times are in the given timezone.
+    
+    Args:
+        words: Command words starting at the time expression
+        now: Current time (aware)
+        tz: Timezone the user's times are written in
+        
+    Returns:
+        Tuple[datetime, int]: (aware start time in UTC, number of words used)
+        
+    Raises:
+        ValueError: If the words do not start with a valid time
+    """
+    if not words:
+        raise ValueError("missing start time")
+    local_now = now.astimezone(tz)
+    day_word = words[0].lower()
+    if day_word in ("today", "tomorrow"):
+        day = local_now.date() + timedelta(days=1 if day_word == "tomorrow" else 0)
+        time_words = words[1:2]
+    elif re.match(r'^\d{4}-\d{2}-\d{2}$', day_word):
+        day = date.fromisoformat(day_word)
+        time_words = words[1:2]
+    else:
+        day = None
+        time_words = words[:1]
+
+    time_match = re.match(r'^(\d{1,2}):(\d{2})$', time_words[0]) if time_words else None
+    if not time_match or int(time_match.group(1)) > 23 or int(time_match.group(2)) > 59:
+        raise ValueError(f"invalid time: {' '.join(words[:2])}")
+    clock = time(int(time_match.group(1)), int(time_match.group(2)))
+
+    if day is None:
+        start = datetime.combine(local_now.date(), clock, tz)
+        if start <= local_now:
+            start += timedelta(days=1)
+        return start.astimezone(timezone.utc), 1
+    return datetime.combine(day, clock, tz).astimezone(timezone.utc), 2
@@ -0,0 +1,438 @@
+"""GPU-hour accounting: completed claim intervals, utilization samples and reports.
+
+Every claim that ends (release, expiry, idle reclaim or hand-off) is
+appended to USAGE_FILE as one JSON line. The expiry scheduler appends the
+utilization of claimed local GPUs to USAGE_SAMPLES_FILE every
+USAGE_SAMPLE_SECONDS as fixed-size binary records, so a year of samples
+loads with a single numpy.fromfile(). Reports are aggregated column-wise
+with NumPy (optional: pip install numpy).
+
+Export with:
+    python -m utils.usage export <out.csv|out.parquet> [--since YYYY-MM-DD]
+"""
+import os
+import sys
+import csv
+import json
+import struct
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+from config import USAGE_FILE, USAGE_SAMPLE_SECONDS, USAGE_SAMPLES_FILE
+from utils.file_utils import file_lock
+from utils.shares import gpu_claims
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# One utilization sample: (POSIX time, local GPU index, utilization %)
+SAMPLE_FORMAT = '<dIf'
+SAMPLE_SIZE = struct.calcsize(SAMPLE_FORMAT)
+
+INTERVAL_FIELDS = ("gpu_id", "user_id", "user_name", "purpose", "start", "end")
+# Only on fractional claims: reserved MiB and the fraction of the GPU it is
+SHARE_FIELDS = ("memory_mb", "share")
+
+# Spacing between GPUs in the combined (gpu, time) sort key; larger than any timestamp
+_GPU_KEY_STRIDE = 1e11
+
+
+def _timestamp(value: str) -> float:
+    """Parse a stored ISO time (UTC) into a POSIX timestamp."""
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _local_index(gpu_id: str) -> int:
+    """Index of a local GPU, or -1 for fleet GPUs (which have no samples here)."""
+    return int(gpu_id) if gpu_id.isdigit() else -1
+
+
+def completed_claims(before: Dict[str, Any], after: Dict[str, Any],
+                     now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Find claims present in `before` that no longer exist in `after`.
+
+    A claim ends when its GPU becomes available or is claimed by someone
+    else (a waitlist hand-off); extending it keeps the same claim. Each
+    share of a shared GPU is a claim of its own, recorded with its
+    "memory_mb" and the "share" of the GPU it reserved.
+
+    Args:
+        before: Claimed (in-use or shared) records at the start of a transaction
+        after: Status at the end of the transaction
+        now: End time of the finished claims (defaults to now)
+
+    Returns:
+        List[Dict[str, Any]]: Interval records with INTERVAL_FIELDS
+    """
+    end = (now or datetime.now(timezone.utc)).isoformat()
+    intervals = []
+    for gpu_id, old in before.items():
+        current = {(claim.get('user_id'), claim.get('claim_time')) for claim in gpu_claims(after.get(gpu_id) or {})}
+        for claim in gpu_claims(old):
+            if (claim.get('user_id'), claim.get('claim_time')) in current or not claim.get('claim_time'):
+                continue
+            interval = {
+                "gpu_id": gpu_id,
+                "user_id": claim.get('user_id'),
+                "user_name": claim.get('user_name', 'Unknown'),
+                "purpose": claim.get('purpose', 'No purpose specified'),
+                "start": claim['claim_time'],
+                "end": end,
+            }
+            if 'memory_mb' in claim and old.get('memory_total_mb'):
+                interval["memory_mb"] = claim['memory_mb']
+                interval["share"] = round(min(1.0, claim['memory_mb'] / old['memory_total_mb']), 4)
+            intervals.append(interval)
+    return intervals
+
+
+def open_intervals(status: Dict[str, Any], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Intervals for claims that are still running, ending at `now`.
+
+    Args:
+        status: GPU status table
+        now: Time to end the open intervals at (defaults to now)
+
+    Returns:
+        List[Dict[str, Any]]: Interval records with INTERVAL_FIELDS
+    """
+    return completed_claims(
+        {gpu_id: info for gpu_id, info in status.items() if gpu_claims(info)}, {}, now
+    )
+
+
+class UsageLog:
+    """
+    Completed claim intervals (JSON lines) and utilization samples (binary).
+
+    Both files are append-only. Parsed intervals and loaded samples are
+    cached per process and extended with only the newly appended tail.
+    """
+
+    def __init__(self, path: str = USAGE_FILE, samples_path: str = USAGE_SAMPLES_FILE):
+        self.path = path
+        self.samples_path = samples_path
+        self.lock_path = f"{path}.lock"
+        self._lock = threading.Lock()
+        self._offset = 0
+        self._intervals: List[Dict[str, Any]] = []
+        self._columns: Optional[Tuple[int, Dict[str, Any]]] = None
+        self._samples_offset = 0
+        self._samples = None
+        self._sample_index: Optional[Tuple[int, Tuple[Any, Any]]] = None
+
+    def append(self, intervals: List[Dict[str, Any]]) -> None:
+        """Append finished claim intervals with a single fsync'd write."""
+        if not intervals:
+            return
+        data = "".join(json.dumps(interval) + "\n" for interval in intervals)
+        with file_lock(self.lock_path):
+            with open(self.path, 'a') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def append_samples(self, timestamp: float, utilization: Dict[int, float]) -> None:
+        """Append one utilization sample per local GPU index."""
+        if not utilization:
+            return
+        data = b"".join(struct.pack(SAMPLE_FORMAT, timestamp, index, value)
+                        for index, value in utilization.items())
+        with file_lock(self.lock_path):
+            with open(self.samples_path, 'ab') as f:
+                # Drop a torn record left by a crashed writer so records stay aligned
+                f.truncate(f.tell() - f.tell() % SAMPLE_SIZE)
+                f.write(data)
+
+    def intervals(self) -> List[Dict[str, Any]]:
+        """Return every recorded interval in log order; callers must not mutate them."""
+        with self._lock:
+            try:
+                with open(self.path, 'rb') as f:
+                    f.seek(self._offset)
+                    tail = f.read()
+            except FileNotFoundError:
+                tail = b''
+            # Only complete lines; a line being written is picked up next time
+            end = tail.rfind(b'\n') + 1
+            for line in tail[:end].splitlines():
+                if line.strip():
+                    self._intervals.append(json.loads(line))
+            self._offset += end
+            return self._intervals
+
+    def columns(self) -> Dict[str, Any]:
+        """Return the recorded intervals as NumPy columns (see to_columns())."""
+        intervals = self.intervals()
+        cached = self._columns
+        if cached is None or cached[0] != len(intervals):
+            cached = (len(intervals), to_columns(intervals))
+            self._columns = cached
+        return cached[1]
+
+    def samples(self):
+        """
+        Return all utilization samples as a structured array.
+
+        Returns:
+            numpy.ndarray: Fields "time", "gpu" and "util"
+        """
+        dtype = np.dtype([('time', '<f8'), ('gpu', '<u4'), ('util', '<f4')])
+        with self._lock:
+            if self._samples is None:
+                self._samples = np.empty(0, dtype=dtype)
+            try:
+                size = os.path.getsize(self.samples_path)
+            except OSError:
+                size = 0
+            count = (size - self._samples_offset) // SAMPLE_SIZE
+            if count > 0:
+                tail = np.fromfile(self.samples_path, dtype=dtype, count=count, offset=self._samples_offset)
+                self._samples = np.concatenate([self._samples, tail])
+                self._samples_offset += count * SAMPLE_SIZE
+            return self._samples
+
+    def sample_index(self) -> Tuple[Any, Any]:
+        """Return index_samples() of all samples, re-sorted only when new samples arrive."""
+        samples = self.samples()
+        cached = self._sample_index
+        if cached is None or cached[0] != len(samples):
+            cached = (len(samples), index_samples(samples))
+            self._sample_index = cached
+        return cached[1]
+
+
+_usage_log: Optional[UsageLog] = None
+
+
+def get_usage_log() -> UsageLog:
+    """Return the process-wide usage log."""
+    global _usage_log
+    if _usage_log is None:
+        _usage_log = UsageLog()
+    return _usage_log
+
+
+def record_completed(intervals: List[Dict[str, Any]]) -> None:
+    """Persist finished claims; failures are logged, never raised to the caller."""
+    try:
+        get_usage_log().append(intervals)
+    except (IOError, OSError) as e:
+        logger.error(f"Failed to record {len(intervals)} usage interval(s): {e}")
+
+
+def record_utilization(status: Dict[str, Any], snapshot) -> int:
+    """
+    Append the utilization of every claimed local GPU in a telemetry snapshot.
+
+    Args:
+        status: GPU status table
+        snapshot: Fresh TelemetrySnapshot for this host
+
+    Returns:
+        int: Number of samples written
+    """
+    utilization = {
+        int(gpu.index): gpu.utilization for gpu in snapshot.gpus
+        if gpu.utilization is not None and gpu.index.isdigit()
+        and status.get(gpu.index, {}).get('status') == 'in_use'
+    }
+    get_usage_log().append_samples(snapshot.taken_at, utilization)
+    return len(utilization)
+
+
+def to_columns(intervals: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert interval records into NumPy columns.
+
+    Returns:
+        Dict[str, Any]: "start"/"end" (POSIX seconds), "gpu" (local index or
+        -1), "share" (fraction of the GPU, 1 for whole-GPU claims) and
+        "user_id"/"user_name"/"purpose" (object arrays)
+    """
+    return {
+        "start": np.fromiter((_timestamp(i['start']) for i in intervals), dtype=float, count=len(intervals)),
+        "end": np.fromiter((_timestamp(i['end']) for i in intervals), dtype=float, count=len(intervals)),
+        "gpu": np.fromiter((_local_index(i['gpu_id']) for i in intervals), dtype=np.int64, count=len(intervals)),
+        "share": np.fromiter((i.get('share', 1.0) for i in intervals), dtype=float, count=len(intervals)),
+        "user_id": np.array([i.get('user_id') or '' for i in intervals], dtype=object),
+        "user_name": np.array([i.get('user_name') or 'Unknown' for i in intervals], dtype=object),
+        "purpose": np.array([i.get('purpose') or 'No purpose specified' for i in intervals], dtype=object),
+    }
+
+
+def concat_columns(*parts: Dict[str, Any]) -> Dict[str, Any]:
+    """Concatenate column dictionaries produced by to_columns()."""
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+class UsageReport(NamedTuple):
+    """GPU-hours for one window, overall and grouped."""
+    start: float
+    end: float
+    hours: float
+    weighted_hours: float  # measured hours × mean sampled utilization
+    measured_hours: float  # hours covered by utilization samples
+    by_user: List[Tuple[str, float, float]]  # (user name, hours, weighted hours)
+    by_project: List[Tuple[str, float, float]]  # (purpose, hours, weighted hours)
+
+
+def index_samples(samples) -> Tuple[Any, Any]:
+    """
+    Sort samples by a combined (gpu, time) key for interval lookups.
+
+    Args:
+        samples: Structured array from UsageLog.samples()
+
+    Returns:
+        Tuple of (sorted keys, cumulative utilization with a leading 0)
+    """
+    keys = samples['gpu'].astype(float) * _GPU_KEY_STRIDE + samples['time']
+    order = np.argsort(keys, kind='stable')
+    totals = np.concatenate([[0.0], np.cumsum(samples['util'][order], dtype=float)])
+    return keys[order], totals
+
+
+def _mean_utilization(gpu, start, end, sample_index):
+    """
+    Mean sampled utilization (0-1) and sample count of each interval on its GPU.
+
+    Each interval's samples are a contiguous slice of the sorted index,
+    found with two searchsorted calls; its mean comes from the cumulative
+    sum. Intervals without samples get NaN.
+    """
+    keys, totals = sample_index
+    if len(keys) == 0:
+        return np.full(len(gpu), np.nan), np.zeros(len(gpu), dtype=np.int64)
+    base = np.where(gpu >= 0, gpu, 0).astype(float) * _GPU_KEY_STRIDE
+    lo = np.searchsorted(keys, base + start, side='left')
+    hi = np.searchsorted(keys, base + end, side='left')
+    count = np.where(gpu >= 0, hi - lo, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (totals[hi] - totals[lo]) / count / 100.0
+    return np.where(count > 0, mean, np.nan), count
+
+
+def _group(keys, hours, weighted) -> List[Tuple[Any, float, float]]:
+    """Sum hours per key with bincount, largest first."""
+    if len(keys) == 0:
+        return []
+    labels, inverse = np.unique(keys, return_inverse=True)
+    hour_sums = np.bincount(inverse, weights=hours, minlength=len(labels))
+    weighted_sums = np.bincount(inverse, weights=weighted, minlength=len(labels))
+    order = np.argsort(-hour_sums, kind='stable')
+    return [(labels[i], float(hour_sums[i]), float(weighted_sums[i])) for i in order]
+
+
+def summarize(columns: Dict[str, Any], start: float, end: float, sample_index=None,
+              user: Optional[str] = None, sample_seconds: float = USAGE_SAMPLE_SECONDS) -> UsageReport:
+    """
+    Summarize GPU-hours in the window [start, end).
+
+    Intervals are clipped to the window, and fractional claims count their
+    share of the GPU (20 GB of an 80 GB card for 4 hours is 1 GPU-hour).
+    Shared GPUs are not sampled, since their utilization cannot be split
+    between the shares. Each sample stands for
+    `sample_seconds` of its interval, so an interval's measured hours are
+    bounded by its sample count, and its utilization-weighted hours are its
+    measured hours times the mean sampled utilization.
+
+    Args:
+        columns: Interval columns from to_columns()
+        start: Window start (POSIX seconds)
+        end: Window end (POSIX seconds)
+        sample_index: index_samples() output (UsageLog.sample_index()), if any
+        user: Only count this user ID or user name
+        sample_seconds: Spacing of the utilization samples
+
+    Returns:
+        UsageReport: Totals plus per-user and per-project breakdowns
+    """
+    clipped_start = np.maximum(columns["start"], start)
+    clipped_end = np.minimum(columns["end"], end)
+    mask = clipped_end > clipped_start
+    if user is not None:
+        mask &= (columns["user_id"] == user) | (columns["user_name"] == user)
+    clipped_start, clipped_end = clipped_start[mask], clipped_end[mask]
+    hours = (clipped_end - clipped_start) / 3600.0 * columns["share"][mask]
+
+    if sample_index is not None:
+        utilization, count = _mean_utilization(columns["gpu"][mask], clipped_start, clipped_end, sample_index)
+    else:
+        utilization, count = np.full(len(hours), np.nan), np.zeros(len(hours), dtype=np.int64)
+    measured = np.minimum(hours, count * sample_seconds / 3600.0)
+    weighted = measured * np.nan_to_num(utilization)
+
+    # Group users by ID so renames don't split their hours; label with the latest name
+    user_ids = columns["user_id"][mask]
+    names = dict(zip(user_ids, columns["user_name"][mask]))
+    by_user = [(names[user_id], total, weighted_total)
+               for user_id, total, weighted_total in _group(user_ids, hours, weighted)]
+    return UsageReport(
+        start=start,
+        end=end,
+        hours=float(hours.sum()),
+        weighted_hours=float(weighted.sum()),
+        measured_hours=float(measured.sum()),
+        by_user=by_user,
+        by_project=_group(columns["purpose"][mask], hours, weighted),
+    )
+
+
+def export(out_path: str, since: Optional[datetime] = None) -> int:
+    """
+    Export recorded intervals to CSV, or Parquet for *.parquet paths.
+
+    Parquet output requires pyarrow. Each row also carries its GPU-hours
+    (duration times its share of the GPU).
+
+    Args:
+        out_path: Destination file
+        since: Only export intervals ending after this time
+
+    Returns:
+        int: Number of rows written
+    """
+    rows = [dict(interval) for interval in get_usage_log().intervals()]
+    if since is not None:
+        cutoff = since.timestamp()
+        rows = [row for row in rows if _timestamp(row['end']) > cutoff]
+    for row in rows:
+        row['hours'] = round((_timestamp(row['end']) - _timestamp(row['start'])) / 3600.0 * row.get('share', 1.0), 4)
+    fields = list(INTERVAL_FIELDS) + list(SHARE_FIELDS) + ['hours']
+
+    if out_path.endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.table({field: [row.get(field) for row in rows] for field in fields})
+        pq.write_table(table, out_path)
+    else:
+        with open(out_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+    logger.info(f"Exported {len(rows)} usage intervals to {out_path}")
+    return len(rows)
+
+
+if __name__ == '__main__':
+    # Usage: python -m utils.usage export <out.csv|out.parquet> [--since YYYY-MM-DD]
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[1:]
+    if len(args) < 2 or args[0] != 'export':
+        sys.exit("Usage: python -m utils.usage export <out.csv|out.parquet> [--since YYYY-MM-DD]")
+    since_arg = None
+    if '--since' in args:
+        position = args.index('--since')
+        since_arg = datetime.fromisoformat(args[position + 1]).replace(tzinfo=timezone.utc)
+        del args[position:position + 2]
+    export(args[1], since_arg)
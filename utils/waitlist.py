@@ -0,0 +1,241 @@
+"""Persistent FIFO waitlist for busy GPUs, with hand-off on release."""
+import os
+import json
+import fcntl
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from config import INDIA_TZ, QUEUE_FILE
+from utils.file_utils import atomic_write, file_lock
+from utils.notifier import notify_user
+from utils.status_manager import gpu_transaction, status_transaction
+from utils.time_parser import parse_duration
+
+logger = logging.getLogger(__name__)
+
+# Queue entries targeting whichever GPU frees up first
+ANY_GPU = "any"
+
+
+def _empty_queue() -> Dict[str, Any]:
+    return {"next_id": 1, "entries": []}
+
+
+class Waitlist:
+    """
+    Queue entries stored in a single JSON file.
+
+    The file holds {"next_id": n, "entries": [...]} with entries in FIFO
+    order. Like the JSON status store, writers hold an flock on a sidecar
+    lock file and replace the file atomically, so readers need no lock.
+
+    Lock order: code that needs both the waitlist and the status must take
+    the waitlist lock first (see waitlist_transaction()).
+    """
+
+    def __init__(self, path: str = QUEUE_FILE):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+
+    def load(self) -> Dict[str, Any]:
+        """Read the queue without locking."""
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return _empty_queue()
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Return the queued entries in FIFO order."""
+        return self.load()["entries"]
+
+    @contextmanager
+    def transaction(self) -> Iterator[Dict[str, Any]]:
+        """Exclusive read-modify-write access; unchanged queues are not rewritten."""
+        with file_lock(self.lock_path):
+            queue = self.load()
+            original = json.dumps(queue, indent=2)
+            yield queue
+            serialized = json.dumps(queue, indent=2)
+            if serialized != original or not os.path.exists(self.path):
+                atomic_write(self.path, serialized)
+
+
+_waitlist: Optional[Waitlist] = None
+
+
+def get_waitlist() -> Waitlist:
+    """Return the process-wide waitlist."""
+    global _waitlist
+    if _waitlist is None:
+        _waitlist = Waitlist()
+    return _waitlist
+
+
+@contextmanager
+def waitlist_transaction(event: Optional[str] = None,
+                         gpu_ids: Optional[List[str]] = None) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Lock the waitlist and then the status, in the required order.
+
+    The status is written before the waitlist, so a failure in between
+    can at worst leave a satisfied entry queued, never lose a hand-off.
+
+    Args:
+        event: Passed through to status_transaction()
+        gpu_ids: Only lock (and yield) these GPUs' records, see gpu_transaction()
+
+    Yields:
+        Tuple of (queue, status), both mutable
+    """
+    with get_waitlist().transaction() as queue:
+        if gpu_ids is None:
+            with status_transaction(event) as status:
+                yield queue, status
+        else:
+            with gpu_transaction(gpu_ids, event) as status:
+                yield queue, status
+
+
+def _wanted(queue: Dict[str, Any], gpu_ids: List[str]) -> bool:
+    """Whether any queue entry could receive one of `gpu_ids`."""
+    wanted = set(gpu_ids) | {ANY_GPU}
+    return any(entry["gpu_id"] in wanted for entry in queue["entries"])
+
+
+@contextmanager
+def release_transaction(gpu_ids: List[str],
+                        event: Optional[str] = None) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Lock some GPUs for releasing, with the waitlist locked for hand_off().
+
+    When nobody is waiting for these GPUs, the waitlist is only locked
+    shared: releases of different GPUs then run in parallel, while
+    enqueues (which lock it exclusively) wait and so cannot miss a GPU
+    freed meanwhile. Otherwise this is waitlist_transaction(event, gpu_ids).
+
+    Args:
+        gpu_ids: GPUs to lock
+        event: Passed through to gpu_transaction()
+
+    Yields:
+        Tuple of (queue, records of the selected GPUs); the queue is only
+        persisted when someone was waiting
+    """
+    waitlist = get_waitlist()
+    with file_lock(waitlist.lock_path, fcntl.LOCK_SH):
+        queue = waitlist.load()
+        if not _wanted(queue, gpu_ids):
+            with gpu_transaction(gpu_ids, event) as status:
+                yield queue, status
+            return
+    with waitlist_transaction(event, gpu_ids) as (queue, status):
+        yield queue, status
+
+
+def enqueue(queue: Dict[str, Any], user_id: str, user_name: str, gpu_id: str,
+            purpose: str, duration: str, until: Optional[str] = None,
+            front: bool = False) -> Dict[str, Any]:
+    """
+    Add an entry to the queue.
+
+    Args:
+        queue: Queue from Waitlist.transaction()
+        user_id: Slack user ID
+        user_name: Slack user name
+        gpu_id: GPU ID, or ANY_GPU
+        purpose: Purpose for the eventual claim
+        duration: Duration string for the eventual claim (e.g. "2h")
+        until: Fixed release time (ISO, UTC) overriding the duration, used
+            for reservations whose slot has already started
+        front: Jump the queue instead of appending
+
+    Returns:
+        Dict[str, Any]: The new entry
+    """
+    entry = {
+        "id": queue["next_id"],
+        "user_id": user_id,
+        "user_name": user_name,
+        "gpu_id": gpu_id,
+        "purpose": purpose,
+        "duration": duration,
+        "queued_at": datetime.now(timezone.utc).isoformat()
+    }
+    if until is not None:
+        entry["until"] = until
+    queue["next_id"] += 1
+    if front:
+        queue["entries"].insert(0, entry)
+    else:
+        queue["entries"].append(entry)
+    return entry
+
+
+def claim_record(entry: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Build the status record for a queue entry that receives a GPU."""
+    now = now or datetime.now(timezone.utc)
+    if "until" in entry:
+        release_time = entry["until"]
+    else:
+        try:
+            duration = parse_duration(entry.get("duration", "1h"))
+        except ValueError:
+            duration = parse_duration("1h")
+        release_time = (now + duration).isoformat()
+    return {
+        "status": "in_use",
+        "user_id": entry["user_id"],
+        "user_name": entry["user_name"],
+        "purpose": entry["purpose"],
+        "claim_time": now.isoformat(),
+        "release_time": release_time
+    }
+
+
+def hand_off(queue: Dict[str, Any], status: Dict[str, Any], gpu_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Give freed GPUs to the first waiting entries that want them.
+
+    Must be called inside waitlist_transaction() or release_transaction().
+    Each entry receives at most one GPU; GPUs nobody is waiting for stay
+    available.
+
+    Args:
+        queue: Queue from the transaction
+        status: Status from the transaction
+        gpu_ids: GPUs that were just made available
+
+    Returns:
+        List[Dict[str, Any]]: Hand-offs as {"gpu_id", "entry", "record"}
+    """
+    hand_offs = []
+    now = datetime.now(timezone.utc)
+    # Reservation entries whose slot ended while waiting are dropped
+    queue["entries"] = [entry for entry in queue["entries"]
+                        if "until" not in entry or datetime.fromisoformat(entry["until"]) > now]
+    for gpu_id in gpu_ids:
+        if status.get(gpu_id, {}).get('status') != 'available':
+            continue
+        for position, entry in enumerate(queue["entries"]):
+            if entry["gpu_id"] in (gpu_id, ANY_GPU):
+                record = claim_record(entry, now)
+                status[gpu_id] = record
+                del queue["entries"][position]
+                hand_offs.append({"gpu_id": gpu_id, "entry": entry, "record": record})
+                logger.info(f"GPU {gpu_id} handed to {entry['user_name']} from the waitlist (entry #{entry['id']})")
+                break
+    return hand_offs
+
+
+def notify_hand_offs(hand_offs: List[Dict[str, Any]]) -> None:
+    """Tell each user who received a GPU from the waitlist (in the background)."""
+    for hand_off_info in hand_offs:
+        entry, record = hand_off_info["entry"], hand_off_info["record"]
+        release_time = datetime.fromisoformat(record["release_time"]).astimezone(INDIA_TZ).strftime('%I:%M %p IST')
+        text = (
+            f"🎉 GPU {hand_off_info['gpu_id']} is now yours from the waitlist!\n"
+            f"📝 Purpose: {entry['purpose']}\n🕒 Release Time: ~{release_time}"
+        )
+        notify_user(entry["user_id"], text)